@@ -16,7 +16,7 @@ binaries = [(f'drivers/lib/{arch_folder}/libzkfpcsharp.dll', '.')]
 
 hiddenimports = ['matplotlib', 'cv2', 'numpy', 'mediapipe', 'insightface', 'sklearn', 'skimage', 'pyzkfp', 'argon2', 'chime', 'reportlab', 'PIL', 'PySide6.QtCore', 'PySide6.QtWidgets', 'PySide6.QtGui', 'PySide6.QtCharts', 'PySide6.QtUiTools', 'pyqttoast', 'pygrabber', 'sqlite3', 'smtplib', 'email.mime.text', 'email.mime.multipart', 'email.mime.image', 'clr', 'System', 'System.IO', 'System.Reflection']
 
-hiddenimports += ['splash']
+hiddenimports += ['splash', 'face_matching']
 
 hiddenimports += ['pythonnet', 'clr', 'System.Runtime', 'System.Runtime.InteropServices']
 
@@ -0,0 +1,215 @@
+import os
+import numpy as np
+
+
+def normalize_embeddings(vectors):
+    """L2-normalize one embedding or a batch of embeddings as float32"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class FaceMatcher:
+    """Exact cosine search over an L2-normalized embedding matrix with one row per enrolled pose"""
+    def __init__(self, embeddings, employee_ids):
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        employee_ids = np.asarray(employee_ids, dtype=object)
+
+        # Group rows by employee so per-employee max-pooling is a single reduceat over contiguous columns
+        order = np.argsort(employee_ids.astype(str), kind='stable')
+        self.embeddings = np.ascontiguousarray(embeddings[order])
+        self.employee_ids = employee_ids[order]
+        if len(self.employee_ids):
+            is_start = np.r_[True, self.employee_ids[1:] != self.employee_ids[:-1]].astype(bool)
+            self.group_starts = np.flatnonzero(is_start)
+        else:
+            self.group_starts = np.empty(0, dtype=np.intp)
+        self.labels = self.employee_ids[self.group_starts]
+        group_ends = np.r_[self.group_starts[1:], len(self.employee_ids)]
+        self.employee_rows = {label: slice(start, end) for label, start, end in zip(self.labels, self.group_starts, group_ends)}
+
+    def __len__(self):
+        return len(self.employee_ids)
+
+    def similarities(self, queries):
+        """Cosine similarity of every query against every row, computed with one matrix product"""
+        queries = normalize_embeddings(np.atleast_2d(queries))
+        return queries @ self.embeddings.T
+
+    def pooled_similarities(self, queries):
+        """Best similarity per employee (max over that employee's poses), shape (queries, employees)"""
+        scores = self.similarities(queries)
+        if not len(self.employee_ids):
+            return scores
+        return np.maximum.reduceat(scores, self.group_starts, axis=1)
+
+    def top_k(self, queries, k=1, pool_by_employee=True, exclude=None):
+        """
+        Return the k best (employee_id, score) pairs, best first.
+        A single query returns one list; a batch of queries returns one list per query.
+        k=None returns every candidate. Employee ids in exclude are never returned.
+        """
+        single_query = np.asarray(queries).ndim == 1
+        if not len(self.employee_ids):
+            return [] if single_query else [[] for _ in range(len(queries))]
+
+        if pool_by_employee:
+            scores, labels = self.pooled_similarities(queries), self.labels
+        else:
+            scores, labels = self.similarities(queries), self.employee_ids
+
+        if exclude:
+            excluded = np.isin(labels.astype(str), [str(employee_id) for employee_id in exclude])
+            scores = np.where(excluded, -np.inf, scores)
+
+        k = scores.shape[1] if k is None else max(0, min(k, scores.shape[1]))
+        if k < scores.shape[1]:
+            candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k] if k else np.empty((len(scores), 0), dtype=np.intp)
+        else:
+            candidates = np.tile(np.arange(scores.shape[1]), (len(scores), 1))
+
+        results = []
+        for row_scores, row_candidates in zip(scores, candidates):
+            ranked = row_candidates[np.argsort(-row_scores[row_candidates], kind='stable')]
+            results.append([(labels[i], float(row_scores[i])) for i in ranked if np.isfinite(row_scores[i])])
+        return results[0] if single_query else results
+
+    def employee_score(self, query, employee_id):
+        """Best similarity between one query and the poses of a single employee"""
+        if employee_id not in self.employee_rows:
+            return 0.0
+        rows = self.embeddings[self.employee_rows[employee_id]]
+        return float(np.max(rows @ normalize_embeddings(np.asarray(query).reshape(-1))))
+
+
+class IVFIndex:
+    """
+    Approximate nearest-neighbour index for large galleries (inverted file over spherical k-means lists).
+    A query only visits the n_probe closest lists; the rows found there are re-ranked exactly with FaceMatcher.
+    """
+    def __init__(self, centroids, n_probe=8):
+        self.centroids = normalize_embeddings(centroids)
+        self.n_probe = n_probe
+        self.trained_size = 0
+        self.clear()
+
+    def __len__(self):
+        return sum(len(ids) for ids in self.list_employee_ids.values())
+
+    def clear(self):
+        self.list_embeddings = {}
+        self.list_employee_ids = {}
+        self.list_poses = {}
+        self.employee_lists = {}
+
+    @classmethod
+    def train(cls, embeddings, n_lists=None, n_probe=8, iterations=10, seed=0):
+        """Cluster the gallery into roughly sqrt(N) lists with spherical k-means"""
+        embeddings = normalize_embeddings(embeddings)
+        n_lists = n_lists or max(1, int(np.sqrt(len(embeddings))))
+        n_lists = min(n_lists, len(embeddings))
+        rng = np.random.default_rng(seed)
+        sample_size = min(len(embeddings), 40 * n_lists)
+        sample = embeddings[rng.choice(len(embeddings), sample_size, replace=False)]
+        centroids = sample[rng.choice(sample_size, n_lists, replace=False)]
+        for _ in range(iterations):
+            assignments = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, sample)
+            counts = np.bincount(assignments, minlength=n_lists)
+            # Empty lists keep their previous centroid
+            sums[counts == 0] = centroids[counts == 0]
+            centroids = normalize_embeddings(sums)
+        index = cls(centroids, n_probe=n_probe)
+        index.trained_size = len(embeddings)
+        return index
+
+    def assign(self, embeddings):
+        """Nearest list for each embedding"""
+        return np.argmax(normalize_embeddings(np.atleast_2d(embeddings)) @ self.centroids.T, axis=1)
+
+    def add(self, embeddings, employee_ids, poses, assignments=None):
+        """Insert rows into their nearest lists (or the given list ids) without retraining"""
+        embeddings = normalize_embeddings(np.atleast_2d(embeddings))
+        employee_ids = np.asarray(employee_ids, dtype=object)
+        poses = np.asarray(poses, dtype=object)
+        if not len(embeddings):
+            return
+        if assignments is None:
+            assignments = self.assign(embeddings)
+        for list_id in np.unique(assignments):
+            list_id = int(list_id)
+            rows = assignments == list_id
+            self.list_embeddings[list_id] = np.concatenate(
+                [self.list_embeddings.get(list_id, np.empty((0, embeddings.shape[1]), dtype=np.float32)), embeddings[rows]])
+            self.list_employee_ids[list_id] = np.concatenate(
+                [self.list_employee_ids.get(list_id, np.empty(0, dtype=object)), employee_ids[rows]])
+            self.list_poses[list_id] = np.concatenate(
+                [self.list_poses.get(list_id, np.empty(0, dtype=object)), poses[rows]])
+            for employee_id in set(employee_ids[rows]):
+                self.employee_lists.setdefault(employee_id, set()).add(list_id)
+
+    def remove(self, employee_id, pose=None):
+        """Delete all rows of an employee, or only one of their poses"""
+        for list_id in self.employee_lists.pop(employee_id, set()):
+            remove = self.list_employee_ids[list_id] == employee_id
+            if pose is not None:
+                remove &= self.list_poses[list_id] == pose
+            keep = ~remove
+            self.list_embeddings[list_id] = self.list_embeddings[list_id][keep]
+            self.list_employee_ids[list_id] = self.list_employee_ids[list_id][keep]
+            self.list_poses[list_id] = self.list_poses[list_id][keep]
+            if np.any(self.list_employee_ids[list_id] == employee_id):
+                self.employee_lists.setdefault(employee_id, set()).add(list_id)
+
+    def candidates(self, query):
+        """Rows stored in the n_probe lists closest to the query"""
+        list_scores = self.centroids @ query
+        n_probe = min(self.n_probe, len(list_scores))
+        probed = np.argpartition(-list_scores, n_probe - 1)[:n_probe]
+        probed = [int(list_id) for list_id in probed if int(list_id) in self.list_embeddings]
+        if not probed:
+            return np.empty((0, self.centroids.shape[1]), dtype=np.float32), np.empty(0, dtype=object)
+        return (np.concatenate([self.list_embeddings[list_id] for list_id in probed]),
+                np.concatenate([self.list_employee_ids[list_id] for list_id in probed]))
+
+    def top_k(self, queries, k=1, pool_by_employee=True, exclude=None):
+        """Same contract as FaceMatcher.top_k, searching only the probed lists"""
+        single_query = np.asarray(queries).ndim == 1
+        results = []
+        for query in normalize_embeddings(np.atleast_2d(queries)):
+            embeddings, employee_ids = self.candidates(query)
+            results.append(FaceMatcher(embeddings, employee_ids).top_k(query, k=k, pool_by_employee=pool_by_employee, exclude=exclude))
+        return results[0] if single_query else results
+
+    def save(self, path):
+        """Persist the centroids and list assignments; the embeddings themselves stay in the template files"""
+        employee_ids, poses, assignments = [], [], []
+        for list_id, list_ids in self.list_employee_ids.items():
+            employee_ids.extend(str(employee_id) for employee_id in list_ids)
+            poses.extend(str(pose) for pose in self.list_poses[list_id])
+            assignments.extend([list_id] * len(list_ids))
+        temp_path = f"{path}.tmp.npz"
+        np.savez(temp_path, centroids=self.centroids, n_probe=self.n_probe, trained_size=self.trained_size,
+                 employee_ids=np.array(employee_ids, dtype=str), poses=np.array(poses, dtype=str),
+                 assignments=np.array(assignments, dtype=np.int64))
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path, embeddings, employee_ids, poses):
+        """Restore a saved index and fill its lists from the gallery rows; new rows go to their nearest list"""
+        with np.load(path, allow_pickle=False) as data:
+            index = cls(data["centroids"], n_probe=int(data["n_probe"]))
+            index.trained_size = int(data["trained_size"])
+            saved = {(employee_id, pose): int(list_id) for employee_id, pose, list_id
+                     in zip(data["employee_ids"].tolist(), data["poses"].tolist(), data["assignments"].tolist())}
+        if index.centroids.shape[1] != np.asarray(embeddings).shape[1]:
+            raise ValueError("Saved face index does not match the embedding size")
+        assignments = index.assign(embeddings) if len(embeddings) else np.empty(0, dtype=np.int64)
+        for row, key in enumerate(zip(employee_ids, poses)):
+            list_id = saved.get((str(key[0]), str(key[1])))
+            if list_id is not None and list_id < len(index.centroids):
+                assignments[row] = list_id
+        index.add(embeddings, employee_ids, poses, assignments)
+        return index
@@ -3,18 +3,23 @@ import random
 import os
 import sqlite3
 import threading
+import queue
+import atexit
+from contextlib import contextmanager
+from collections import namedtuple
 import shutil
 import smtplib
 import socket
 import time
 import cv2
 from splash import EALS_SplashScreen
+from face_matching import FaceMatcher, IVFIndex, normalize_embeddings
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.image import MIMEImage 
 from PySide6.QtWidgets import QApplication,QMessageBox, QTableWidgetItem, QAbstractItemView, QFileDialog, QLineEdit,QVBoxLayout, QPushButton, QRadioButton, QWidget, QHBoxLayout, QLabel, QListWidget, QListWidgetItem  # add QListWidget, QListWidgetItem
 from PySide6.QtUiTools import QUiLoader
-from PySide6.QtCore import Qt, QDate, QCoreApplication, QProcess, QTimer, QRegularExpression, Signal, QObject
+from PySide6.QtCore import Qt, QDate, QCoreApplication, QProcess, QTimer, QRegularExpression, Signal, QObject, QAbstractTableModel, QModelIndex, QMetaObject, Q_ARG
 from PySide6.QtGui import QPixmap, QRegularExpressionValidator, QIcon, QColor, QPainter, QImage
 from datetime import datetime, timedelta
 from pyqttoast import Toast, ToastPreset, ToastPosition
@@ -47,6 +52,7 @@ import smtplib
 import socket
 import chime
 import insightface
+from insightface.app.common import Face
 from sklearn.metrics.pairwise import cosine_similarity
 from skimage.metrics import structural_similarity as ssim
 
@@ -66,19 +72,213 @@ def move_ui_and_resources_from_internal():
 
 PASSWORD_HASHER = argon2.PasswordHasher()
 
+# Hours from an employee's first Clock In to last Clock Out within one (employee_id, date) group, NULL without both.
+# Part of DAILY_ATTENDANCE_REBUILD_SQL and therefore of migration 2.
+# Whole seconds divided once, so a shift of exactly 8 h is 8.0 everywhere the hours are compared or summed.
+WORKED_HOURS_EXPRESSION = ("(strftime('%s', date || ' ' || MAX(CASE WHEN remarks = 'Clock Out' THEN time END))"
+                           " - strftime('%s', date || ' ' || MIN(CASE WHEN remarks = 'Clock In' THEN time END))) / 3600.0")
+
+# Recomputes the daily_attendance_summary rows of the dates selected by {dates}: non-HR employees only,
+# work hours from each employee's first Clock In to last Clock Out of the day.
+# Migration 2 runs this statement, so once it has shipped a change here also needs a new migration.
+DAILY_ATTENDANCE_REBUILD_SQL = f'''
+    INSERT INTO daily_attendance_summary (date, present_count, late_count, absent_count, worked_count, total_work_hours, updated_at)
+    SELECT d.date,
+        (SELECT COUNT(DISTINCT employee_id) FROM attendance_logs
+         WHERE date = d.date AND employee_id IN (SELECT employee_id FROM Employee WHERE is_hr = 0)),
+        (SELECT COUNT(DISTINCT employee_id) FROM attendance_logs
+         WHERE date = d.date AND is_late = 1 AND employee_id IN (SELECT employee_id FROM Employee WHERE is_hr = 0)),
+        (SELECT COUNT(*) FROM Employee WHERE is_hr = 0 AND status = 'Active'
+         AND employee_id NOT IN (SELECT DISTINCT employee_id FROM attendance_logs WHERE date = d.date)),
+        (SELECT COUNT(*) FROM (
+            SELECT {WORKED_HOURS_EXPRESSION} AS hours
+            FROM attendance_logs
+            WHERE date = d.date AND employee_id IN (SELECT employee_id FROM Employee WHERE is_hr = 0)
+            GROUP BY employee_id
+        ) WHERE hours > 0),
+        (SELECT COALESCE(SUM(hours), 0) FROM (
+            SELECT {WORKED_HOURS_EXPRESSION} AS hours
+            FROM attendance_logs
+            WHERE date = d.date AND employee_id IN (SELECT employee_id FROM Employee WHERE is_hr = 0)
+            GROUP BY employee_id
+        ) WHERE hours > 0),
+        CURRENT_TIMESTAMP
+    FROM ({{dates}}) d
+    WHERE true
+    ON CONFLICT (date) DO UPDATE SET
+        present_count = excluded.present_count, late_count = excluded.late_count,
+        absent_count = excluded.absent_count, worked_count = excluded.worked_count,
+        total_work_hours = excluded.total_work_hours, updated_at = excluded.updated_at
+'''
+
+class QueryResult:
+    """Rows of a query fetched up front, so the connection that ran it can go straight back to the pool"""
+    def __init__(self, cursor):
+        self.rows = cursor.fetchall() if cursor.description else []
+        self.lastrowid = cursor.lastrowid
+        self.rowcount = cursor.rowcount
+        self.position = 0
+
+    def fetchone(self):
+        if self.position >= len(self.rows):
+            return None
+        row = self.rows[self.position]
+        self.position += 1
+        return row
+
+    def fetchall(self):
+        rows = self.rows[self.position:]
+        self.position = len(self.rows)
+        return rows
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+class Transaction:
+    """Statements issued inside DatabaseConnection.transaction(), all on the writer connection and committed together"""
+    def __init__(self, cursor):
+        self.cursor = cursor
+
+    def execute(self, query, params=()):
+        return QueryResult(self.cursor.execute(query, params))
+
+    def executemany(self, query, seq_of_params):
+        self.cursor.executemany(query, seq_of_params)
+        return self.cursor.rowcount
+
+    def upsert(self, table, rows, conflict_columns):
+        """INSERT rows (dicts with the same keys) and update the other columns when conflict_columns already exist"""
+        rows = list(rows)
+        if not rows:
+            return 0
+        columns = list(rows[0])
+        updates = [column for column in columns if column not in conflict_columns]
+        query = (f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)}) "
+                 f"ON CONFLICT ({', '.join(conflict_columns)}) DO ")
+        if updates:
+            query += "UPDATE SET " + ", ".join(f"{column} = excluded.{column}" for column in updates)
+        else:
+            query += "NOTHING"
+        return self.executemany(query, [tuple(row[column] for column in columns) for row in rows])
+
 class DatabaseConnection:
-    def __init__(self, db_name="eals_database.db"):
+    # Applied to every connection in performance mode; journal_mode is stored in the database file itself
+    PERFORMANCE_PRAGMAS = (
+        "PRAGMA synchronous = NORMAL",
+        "PRAGMA cache_size = -16000",       # 16 MB page cache per connection
+        "PRAGMA mmap_size = 268435456",     # 256 MB memory-mapped reads
+        "PRAGMA temp_store = MEMORY",
+        "PRAGMA busy_timeout = 5000",
+    )
+
+    # Schema migrations as (user_version, statements), applied in order on top of create_tables.
+    # PRAGMA user_version records the last one applied; append new entries, never edit shipped ones.
+    MIGRATIONS = (
+        (1, (
+            "CREATE INDEX IF NOT EXISTS idx_attendance_logs_date_employee ON attendance_logs (date, employee_id)",
+            "CREATE INDEX IF NOT EXISTS idx_attendance_logs_employee_date_time ON attendance_logs (employee_id, date, time)",
+            "CREATE INDEX IF NOT EXISTS idx_employee_hr_status_schedule ON Employee (is_hr, status, schedule)",
+            "CREATE INDEX IF NOT EXISTS idx_fingerprints_employee ON fingerprints (employee_id)",
+            "CREATE INDEX IF NOT EXISTS idx_face_models_employee ON face_models (employee_id)",
+        )),
+        # Backfill daily_attendance_summary for the days logged before it existed
+        (2, (
+            DAILY_ATTENDANCE_REBUILD_SQL.format(dates="SELECT DISTINCT date FROM attendance_logs"),
+        )),
+        # Trigram full-text index for substring search over the attendance log table, kept in sync by triggers
+        (3, (
+            """CREATE VIRTUAL TABLE IF NOT EXISTS attendance_logs_fts USING fts5(
+                employee_id, remarks, date, time, content='attendance_logs', content_rowid='log_id', tokenize='trigram'
+            )""",
+            """CREATE TRIGGER IF NOT EXISTS attendance_logs_fts_insert AFTER INSERT ON attendance_logs BEGIN
+                INSERT INTO attendance_logs_fts (rowid, employee_id, remarks, date, time)
+                VALUES (new.log_id, new.employee_id, new.remarks, new.date, new.time);
+            END""",
+            """CREATE TRIGGER IF NOT EXISTS attendance_logs_fts_delete AFTER DELETE ON attendance_logs BEGIN
+                INSERT INTO attendance_logs_fts (attendance_logs_fts, rowid, employee_id, remarks, date, time)
+                VALUES ('delete', old.log_id, old.employee_id, old.remarks, old.date, old.time);
+            END""",
+            """CREATE TRIGGER IF NOT EXISTS attendance_logs_fts_update AFTER UPDATE ON attendance_logs BEGIN
+                INSERT INTO attendance_logs_fts (attendance_logs_fts, rowid, employee_id, remarks, date, time)
+                VALUES ('delete', old.log_id, old.employee_id, old.remarks, old.date, old.time);
+                INSERT INTO attendance_logs_fts (rowid, employee_id, remarks, date, time)
+                VALUES (new.log_id, new.employee_id, new.remarks, new.date, new.time);
+            END""",
+            "INSERT INTO attendance_logs_fts (attendance_logs_fts) VALUES ('rebuild')",
+        )),
+        # One index per sortable attendance log column; the implicit trailing log_id makes (column, log_id) keyset pages index ranges
+        (4, (
+            "CREATE INDEX IF NOT EXISTS idx_attendance_logs_employee ON attendance_logs (employee_id)",
+            "CREATE INDEX IF NOT EXISTS idx_attendance_logs_remarks ON attendance_logs (remarks)",
+            "CREATE INDEX IF NOT EXISTS idx_attendance_logs_date ON attendance_logs (date)",
+            "CREATE INDEX IF NOT EXISTS idx_attendance_logs_time ON attendance_logs (time)",
+        )),
+    )
+
+    # Hot attendance/dashboard queries that must be answered from an index; see tests/test_query_plans.py
+    HOT_QUERIES = (
+        ("SELECT COUNT(DISTINCT employee_id) FROM attendance_logs WHERE date = ? AND employee_id IN (SELECT employee_id FROM Employee WHERE is_hr = 0)", ("",)),
+        ("SELECT COUNT(*) FROM Employee WHERE is_hr = 0 AND status = 'Active' AND employee_id NOT IN (SELECT DISTINCT employee_id FROM attendance_logs WHERE date = ?)", ("",)),
+        ("SELECT time, remarks FROM attendance_logs WHERE employee_id = ? AND date = ? ORDER BY time ASC", ("", "")),
+        ("SELECT date, time, remarks, is_late, log_id FROM attendance_logs WHERE employee_id = ? AND (date, time, log_id) < (?, ?, ?) ORDER BY date DESC, time DESC, log_id DESC LIMIT ?", ("", "", "", 0, 1)),
+    ) + tuple(
+        # AttendanceLogModel pages after the first, per sort column
+        (f"SELECT log_id, employee_id, remarks, date, time FROM attendance_logs WHERE ({column}, log_id) > (?, ?) ORDER BY {column} ASC, log_id ASC LIMIT ?", ("", 0, 1))
+        for column in ("employee_id", "remarks", "date", "time")
+    )
+
+    def __init__(self, db_name="eals_database.db", performance_mode=True, read_pool_size=4):
         self.db_name = db_name
         self.connection = None
-        self.lock = threading.Lock()
+        # Reentrant so that helpers called inside transaction() can take it again on the same thread
+        self.lock = threading.RLock()
+        self.local = threading.local()
+
+        # In performance mode the database runs in WAL mode: SELECTs use a small pool of read connections
+        # and never wait on the writer, while every write goes through self.connection in an explicit transaction
+        self.performance_mode = performance_mode and db_name != ":memory:"
+        self.read_pool_size = read_pool_size if self.performance_mode else 0
+        self.read_pool = queue.LifoQueue()
+        self.read_connections = []
+        self.read_pool_lock = threading.Lock()
 
     def connect(self):
         try:
-            self.connection = sqlite3.connect(self.db_name, check_same_thread=False)
+            # isolation_level=None: transactions are opened and committed explicitly, never per statement
+            self.connection = sqlite3.connect(self.db_name, check_same_thread=False, isolation_level=None)
+            if self.performance_mode:
+                self.connection.execute("PRAGMA journal_mode = WAL")
+                self.apply_pragmas(self.connection)
             self.create_tables()
         except sqlite3.Error as e:
             print(f"Database connection error: {e}")
 
+    def apply_pragmas(self, connection):
+        for pragma in self.PERFORMANCE_PRAGMAS:
+            connection.execute(pragma)
+
+    def acquire_read_connection(self):
+        """A pooled read connection, opened on demand up to read_pool_size; waits when all of them are busy"""
+        try:
+            return self.read_pool.get_nowait()
+        except queue.Empty:
+            pass
+        with self.read_pool_lock:
+            if len(self.read_connections) < self.read_pool_size:
+                connection = sqlite3.connect(self.db_name, check_same_thread=False, isolation_level=None)
+                self.apply_pragmas(connection)
+                connection.execute("PRAGMA query_only = ON")
+                self.read_connections.append(connection)
+                return connection
+        return self.read_pool.get()
+
+    def release_read_connection(self, connection):
+        self.read_pool.put(connection)
+
+    @staticmethod
+    def is_read_query(query):
+        return query.lstrip().upper().startswith(("SELECT", "WITH"))
+
     def create_tables(self):
         try:
             with self.lock:
@@ -132,6 +332,19 @@ class DatabaseConnection:
                     FOREIGN KEY (employee_id) REFERENCES Employee(employee_id)
                 );
 
+                -- One row per enrolled pose: raw float32 ArcFace embedding and the 160x160 JPEG crop.
+                -- The UNIQUE (employee_id, pose) index also serves lookups by employee_id.
+                CREATE TABLE IF NOT EXISTS face_embeddings (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    employee_id VARCHAR(20) NOT NULL,
+                    pose VARCHAR(30) NOT NULL,
+                    embedding BLOB NOT NULL,
+                    thumbnail BLOB,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    UNIQUE (employee_id, pose),
+                    FOREIGN KEY (employee_id) REFERENCES Employee(employee_id)
+                );
+
                 CREATE TABLE IF NOT EXISTS attendance_logs (
                     log_id INTEGER PRIMARY KEY AUTOINCREMENT,
                     employee_id VARCHAR(20) NOT NULL,
@@ -142,6 +355,17 @@ class DatabaseConnection:
                     FOREIGN KEY (employee_id) REFERENCES Employee(employee_id)
                 );
 
+                -- Per-day attendance counters maintained by AttendanceSummary as attendance is logged
+                CREATE TABLE IF NOT EXISTS daily_attendance_summary (
+                    date DATE PRIMARY KEY,
+                    present_count INTEGER DEFAULT 0,
+                    late_count INTEGER DEFAULT 0,
+                    absent_count INTEGER DEFAULT 0,
+                    worked_count INTEGER DEFAULT 0,
+                    total_work_hours REAL DEFAULT 0,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                );
+
                 CREATE TABLE IF NOT EXISTS feedback (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     title VARCHAR(50) NOT NULL,
@@ -182,6 +406,8 @@ class DatabaseConnection:
                     last_modified_at TIMESTAMP,
                     is_faceid_on BOOLEAN DEFAULT FALSE,
                     is_fingerprintid_on BOOLEAN DEFAULT FALSE,
+                    faceid_det_size INTEGER DEFAULT 640,
+                    faceid_roi_enabled BOOLEAN DEFAULT FALSE,
                     FOREIGN KEY (created_by) REFERENCES Admin(admin_id),
                     FOREIGN KEY (last_modified_by) REFERENCES Admin(admin_id)
                 );
@@ -209,10 +435,43 @@ class DatabaseConnection:
                     FOREIGN KEY (stopped_to_the_entity) REFERENCES system_settings(id)
                 );
                 ''')
-                self.connection.commit()
+                self.add_missing_columns(cursor)
+                self.run_migrations(cursor)
         except sqlite3.Error as e:
             print(f"Error creating tables: {e}")
 
+    def add_missing_columns(self, cursor):
+        """Add columns introduced after a database was created, since CREATE TABLE IF NOT EXISTS leaves old tables as they are"""
+        new_columns = {
+            "system_settings": [
+                ("faceid_det_size", "INTEGER DEFAULT 640"),
+                ("faceid_roi_enabled", "BOOLEAN DEFAULT FALSE"),
+            ],
+        }
+        for table, columns in new_columns.items():
+            existing = {row[1] for row in cursor.execute(f"PRAGMA table_info({table})")}
+            for name, definition in columns:
+                if name not in existing:
+                    cursor.execute(f"ALTER TABLE {table} ADD COLUMN {name} {definition}")
+
+    def run_migrations(self, cursor):
+        """Apply the migrations newer than the database's user_version, each in its own transaction"""
+        version = cursor.execute("PRAGMA user_version").fetchone()[0]
+        for target_version, statements in self.MIGRATIONS:
+            if target_version <= version:
+                continue
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                for statement in statements:
+                    cursor.execute(statement)
+                cursor.execute(f"PRAGMA user_version = {int(target_version)}")
+                cursor.execute("COMMIT")
+            except sqlite3.Error:
+                self.connection.rollback()
+                raise
+            print(f"Database migrated to schema version {target_version}")
+            version = target_version
+
     def is_initial_setup(self):
         try:
             cursor = self.execute_query("SELECT COUNT(*) FROM Admin")
@@ -232,7 +491,6 @@ class DatabaseConnection:
                 INSERT INTO Admin (admin_id, password, default_pass, password_changed)
                 VALUES (?, ?, ?, FALSE)
             ''', (admin_id, hashed_password, hashed_default_pass))  # Store the hashed default password
-            self.connection.commit()
             system_logs = SystemLogs(self)
             system_logs.log_system_action(f"Initial admin account {admin_id} created", "Admin")
             return admin_id, admin_password
@@ -240,125 +498,623 @@ class DatabaseConnection:
             print(f"Database error during initial admin creation: {e}")
             return None, None
 
+    @contextmanager
+    def transaction(self):
+        """Run several statements as one atomic write with a single commit.
+
+        Usage: with db.transaction() as transaction: transaction.execute(...)
+        execute_query calls made on the same thread inside the block join the transaction, and a nested
+        transaction() joins the outer one. Any exception rolls everything back and is re-raised.
+        """
+        current = getattr(self.local, "transaction", None)
+        if current is not None:
+            yield current
+            return
+        with self.lock:
+            cursor = self.connection.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            self.local.transaction = Transaction(cursor)
+            try:
+                yield self.local.transaction
+                cursor.execute("COMMIT")
+            except BaseException:
+                self.connection.rollback()
+                raise
+            finally:
+                self.local.transaction = None
+
+    def executemany(self, query, seq_of_params):
+        """Run one statement for many parameter sets in a single transaction; returns the row count or None on error"""
+        try:
+            with self.transaction() as transaction:
+                return transaction.executemany(query, seq_of_params)
+        except sqlite3.Error as e:
+            print(f"Database query error: {e}")
+            return None
+
+    def upsert(self, table, rows, conflict_columns):
+        """Insert-or-update many rows in a single transaction; returns the row count or None on error"""
+        try:
+            with self.transaction() as transaction:
+                return transaction.upsert(table, rows, conflict_columns)
+        except sqlite3.Error as e:
+            print(f"Database query error: {e}")
+            return None
+
     def execute_query(self, query, params=()):
+        current = getattr(self.local, "transaction", None)
+        if current is not None:
+            # Part of an open transaction: errors propagate so the whole transaction rolls back
+            return current.execute(query, params)
+        if self.read_pool_size and self.is_read_query(query):
+            return self.execute_read(query, params)
         try:
             with self.lock:
                 cursor = self.connection.cursor()
-                cursor.execute(query, params)
-                self.connection.commit()
-                return cursor
+                if self.is_read_query(query):
+                    return QueryResult(cursor.execute(query, params))
+                cursor.execute("BEGIN IMMEDIATE")
+                try:
+                    cursor.execute(query, params)
+                    result = QueryResult(cursor)
+                    cursor.execute("COMMIT")
+                except sqlite3.Error:
+                    self.connection.rollback()
+                    raise
+                return result
+        except sqlite3.Error as e:
+            print(f"Database query error: {e}")
+            return None
+
+    def execute_read(self, query, params=()):
+        """Run a SELECT on a pooled read connection; no lock and no commit"""
+        try:
+            connection = self.acquire_read_connection()
+        except sqlite3.Error as e:
+            print(f"Database connection error: {e}")
+            return None
+        try:
+            return QueryResult(connection.execute(query, params))
         except sqlite3.Error as e:
             print(f"Database query error: {e}")
             return None
+        finally:
+            self.release_read_connection(connection)
+
+    def backup_to(self, backup_path):
+        """Copy a consistent snapshot of the database, including commits still held in the WAL, to backup_path"""
+        with self.lock:
+            target = sqlite3.connect(backup_path)
+            try:
+                self.connection.backup(target)
+            finally:
+                target.close()
+
+    def restore_from(self, backup_path):
+        """Replace the database file with backup_path; every connection is closed first and is unusable afterwards"""
+        with self.lock:
+            self.close()
+            self.connection = None
+            # A leftover WAL from the replaced database would be replayed onto the restored one
+            for suffix in ("-wal", "-shm"):
+                if os.path.exists(self.db_name + suffix):
+                    os.remove(self.db_name + suffix)
+            shutil.copy(backup_path, self.db_name)
 
     def close(self):
+        with self.read_pool_lock:
+            for connection in self.read_connections:
+                connection.close()
+            self.read_connections = []
+            self.read_pool = queue.LifoQueue()
         if self.connection:
             self.connection.close()
 
+class AppEvents(QObject):
+    """In-process event bus: writers emit after their transaction commits, dashboards connect to what they display"""
+    attendance_logged = Signal(str, str, str, str, bool)  # employee_id, date, time, remarks, is_late
+    employee_changed = Signal(str, str)  # employee_id, "added" / "updated" / "status" / "deleted"
+    biometric_enrolled = Signal(str, str)  # employee_id, "fingerprint" / "face"
+
+APP_EVENTS = AppEvents()
+
+# An Employee row without the password hash and attendance counters
+EmployeeRecord = namedtuple("EmployeeRecord", (
+    "employee_id", "first_name", "last_name", "middle_initial", "birthday", "gender", "department",
+    "position", "schedule", "is_hr", "status", "password_changed", "profile_picture", "email"
+))
+
+class EmployeeRepository:
+    """Employee profiles as EmployeeRecords, cached by employee_id until APP_EVENTS reports the employee changed"""
+    SELECT_SQL = f"SELECT {', '.join(EmployeeRecord._fields)} FROM Employee"
+
+    shared_instances = {}
+    shared_lock = threading.Lock()
+
+    @classmethod
+    def shared(cls, db):
+        """The instance for this database, so every window reads through one cache"""
+        with cls.shared_lock:
+            if id(db) not in cls.shared_instances:
+                cls.shared_instances[id(db)] = cls(db)
+            return cls.shared_instances[id(db)]
+
+    def __init__(self, db):
+        self.db = db
+        self.lock = threading.Lock()
+        self.cache = {}
+        APP_EVENTS.employee_changed.connect(self.invalidate)
+
+    def invalidate(self, employee_id=None, change=None):
+        """Forget one employee, or everyone when no id is given"""
+        with self.lock:
+            if employee_id is None:
+                self.cache.clear()
+            else:
+                self.cache.pop(employee_id, None)
+
+    def get(self, employee_id):
+        """The EmployeeRecord for an id, or None when there is no such employee"""
+        with self.lock:
+            if employee_id in self.cache:
+                return self.cache[employee_id]
+        cursor = self.db.execute_query(f"{self.SELECT_SQL} WHERE employee_id = ?", (employee_id,))
+        row = cursor.fetchone() if cursor else None
+        if row is None:
+            return None
+        record = EmployeeRecord(*row)
+        with self.lock:
+            self.cache[employee_id] = record
+        return record
+
+    def list(self, is_hr):
+        """Every HR (is_hr=True) or non-HR employee, in table order"""
+        cursor = self.db.execute_query(f"{self.SELECT_SQL} WHERE is_hr = ?", (int(is_hr),))
+        records = [EmployeeRecord(*row) for row in (cursor.fetchall() if cursor else [])]
+        with self.lock:
+            self.cache.update((record.employee_id, record) for record in records)
+        return records
+
+    def password_hash(self, employee_id):
+        """Read only when verifying a password; never cached"""
+        cursor = self.db.execute_query("SELECT password FROM Employee WHERE employee_id = ?", (employee_id,))
+        row = cursor.fetchone() if cursor else None
+        return row[0] if row else None
+
+class AttendanceDayCache:
+    """Each employee's (time, remarks) logs per day, read once and then kept current from APP_EVENTS,
+    so the clock-in checks after a biometric match are answered from memory"""
+    shared_instances = {}
+    shared_lock = threading.Lock()
+
+    @classmethod
+    def shared(cls, db):
+        """The instance for this database, so every window reads through one cache"""
+        with cls.shared_lock:
+            if id(db) not in cls.shared_instances:
+                cls.shared_instances[id(db)] = cls(db)
+            return cls.shared_instances[id(db)]
+
+    def __init__(self, db):
+        self.db = db
+        self.lock = threading.Lock()
+        self.days = {}  # (employee_id, date) -> [(time, remarks)] sorted by time
+        APP_EVENTS.attendance_logged.connect(self.record_log)
+        APP_EVENTS.employee_changed.connect(self.forget_employee)
+
+    def logs(self, employee_id, date_str):
+        """The employee's logs on date_str, earliest first"""
+        key = (employee_id, date_str)
+        with self.lock:
+            if key in self.days:
+                return list(self.days[key])
+        cursor = self.db.execute_query(
+            "SELECT time, remarks FROM attendance_logs WHERE employee_id = ? AND date = ? ORDER BY time", key
+        )
+        day_logs = [tuple(row) for row in (cursor.fetchall() if cursor else [])]
+        oldest_kept = (datetime.strptime(date_str, "%Y-%m-%d") - timedelta(days=1)).strftime("%Y-%m-%d")
+        with self.lock:
+            # Only today and yesterday are ever asked for (yesterday by the night shift)
+            for stale in [cached for cached in self.days if cached[1] < oldest_kept]:
+                del self.days[stale]
+            self.days[key] = day_logs
+        return list(day_logs)
+
+    def record_log(self, employee_id, date_str, time_str, remarks, is_late):
+        with self.lock:
+            day_logs = self.days.get((employee_id, date_str))
+            if day_logs is not None:
+                day_logs.append((time_str, remarks))
+                day_logs.sort()
+
+    def forget_employee(self, employee_id, change=None):
+        with self.lock:
+            for key in [key for key in self.days if key[0] == employee_id]:
+                del self.days[key]
+
+class AttendanceSummary:
+    """Per-day attendance counters in daily_attendance_summary, kept up to date as attendance is logged"""
+    def __init__(self, db):
+        self.db = db
+
+    def rebuild(self, date_str):
+        """Recompute one day, e.g. after employees were added, deleted or (de)activated"""
+        self.db.execute_query(DAILY_ATTENDANCE_REBUILD_SQL.format(dates="SELECT ? AS date"), (date_str,))
+
+    def get(self, date_str):
+        """(present, absent, late, average work hours) for a day, building the row on first use"""
+        query = '''
+            SELECT present_count, absent_count, late_count,
+                   CASE WHEN worked_count > 0 THEN ROUND(total_work_hours / worked_count, 2) ELSE 0 END
+            FROM daily_attendance_summary WHERE date = ?
+        '''
+        cursor = self.db.execute_query(query, (date_str,))
+        row = cursor.fetchone() if cursor else None
+        if row is None:
+            self.rebuild(date_str)
+            cursor = self.db.execute_query(query, (date_str,))
+            row = cursor.fetchone() if cursor else None
+        return row if row else (0, 0, 0, 0)
+
+    @staticmethod
+    def employee_day(transaction, employee_id, date_str):
+        """(has a log, has a late log, worked hours or None) of one employee on one day, from the (employee_id, date, time) index"""
+        row = transaction.execute(f'''
+            SELECT COUNT(*), MAX(is_late = 1), {WORKED_HOURS_EXPRESSION}
+            FROM attendance_logs WHERE employee_id = ? AND date = ?
+        ''', (employee_id, date_str)).fetchone()
+        hours = row[2] if row[2] is not None and row[2] > 0 else None
+        return row[0] > 0, bool(row[1]), hours
+
+    def insert_log(self, transaction, employee_id, date_str, time_str, remarks, is_late):
+        """Insert an attendance log and apply its effect on the day's counters in the same transaction"""
+        employee = transaction.execute("SELECT is_hr, status FROM Employee WHERE employee_id = ?", (employee_id,)).fetchone()
+        counted = employee is not None and not employee[0]
+        if counted:
+            had_log, was_late, old_hours = self.employee_day(transaction, employee_id, date_str)
+
+        result = transaction.execute(
+            "INSERT INTO attendance_logs (employee_id, date, time, remarks, is_late) VALUES (?, ?, ?, ?, ?)",
+            (employee_id, date_str, time_str, remarks, is_late)
+        )
+        if not counted:
+            return result
+
+        exists = transaction.execute("SELECT 1 FROM daily_attendance_summary WHERE date = ?", (date_str,)).fetchone()
+        if not exists:
+            # First log of the day: build the row from scratch, which already includes this log
+            transaction.execute(DAILY_ATTENDANCE_REBUILD_SQL.format(dates="SELECT ? AS date"), (date_str,))
+            return result
+
+        has_log, is_late_now, new_hours = self.employee_day(transaction, employee_id, date_str)
+        newly_present = int(has_log) - int(had_log)
+        transaction.execute('''
+            UPDATE daily_attendance_summary
+            SET present_count = present_count + ?,
+                late_count = late_count + ?,
+                absent_count = MAX(absent_count - ?, 0),
+                worked_count = worked_count + ?,
+                total_work_hours = total_work_hours + ?,
+                updated_at = CURRENT_TIMESTAMP
+            WHERE date = ?
+        ''', (
+            newly_present,
+            int(is_late_now) - int(was_late),
+            newly_present if employee[1] == 'Active' else 0,
+            int(new_hours is not None) - int(old_hours is not None),
+            (new_hours or 0) - (old_hours or 0),
+            date_str
+        ))
+        return result
+
+class AttendanceAnalytics:
+    """Worked-hours figures computed with one grouped query instead of one query per employee"""
+    # Per non-HR employee and day: first Clock In to last Clock Out, in hours (NULL without both)
+    WORKED_HOURS_SQL = f'''
+        SELECT employee_id, date, {WORKED_HOURS_EXPRESSION} AS hours
+        FROM attendance_logs
+        WHERE date BETWEEN ? AND ? AND employee_id IN (SELECT employee_id FROM Employee WHERE is_hr = 0)
+        GROUP BY employee_id, date
+        HAVING hours IS NOT NULL
+    '''
+
+    def __init__(self, db):
+        self.db = db
+
+    def worked_hours(self, start_date, end_date=None):
+        """[(employee_id, date, hours)] for a date or an inclusive date range"""
+        cursor = self.db.execute_query(self.WORKED_HOURS_SQL, (start_date, end_date or start_date))
+        return cursor.fetchall() if cursor else []
+
+    def average_work_hours(self, start_date, end_date=None):
+        """Mean worked hours over the employees (and days) with a positive clock-in to clock-out span"""
+        hours = [row[2] for row in self.worked_hours(start_date, end_date) if row[2] > 0]
+        return round(sum(hours) / len(hours), 2) if hours else 0
+
+    def average_overtime(self, start_date, end_date=None, shift_hours=8):
+        """Mean hours beyond shift_hours over the employees (and days) that worked overtime"""
+        overtime = [row[2] - shift_hours for row in self.worked_hours(start_date, end_date) if row[2] > shift_hours]
+        return round(sum(overtime) / len(overtime), 2) if overtime else 0
+
+class DashboardMetrics:
+    """Dashboard KPIs shared by the Admin and HR dashboards: two queries per refresh, cached for ttl seconds
+    and kept live in between by applying APP_EVENTS attendance deltas"""
+    SHIFTS = {"morning": "6am to 2pm", "afternoon": "2pm to 10pm", "night": "10pm to 6am"}
+
+    # One row per schedule with every count as a conditional aggregate over Employee joined to today's logs
+    METRICS_SQL = '''
+        WITH today AS (
+            SELECT employee_id, MAX(is_late = 1) AS late, MAX(remarks = 'Clock In') AS clocked_in
+            FROM attendance_logs WHERE date = ? GROUP BY employee_id
+        )
+        SELECT e.schedule,
+               COUNT(*),
+               SUM(e.status = 'Active'),
+               SUM(e.is_hr = 0 AND t.employee_id IS NOT NULL),
+               SUM(e.is_hr = 0 AND t.late = 1),
+               SUM(e.is_hr = 0 AND e.status = 'Active' AND t.employee_id IS NULL),
+               SUM(e.is_hr = 0 AND e.status = 'Active'),
+               SUM(e.is_hr = 0 AND e.status = 'Active' AND t.clocked_in = 1)
+        FROM Employee e LEFT JOIN today t ON t.employee_id = e.employee_id
+        GROUP BY e.schedule
+    '''
+
+    # The logging employee and their logs today, including the one just committed
+    EMPLOYEE_DAY_SQL = '''
+        SELECT e.is_hr, e.status, e.schedule, COUNT(a.employee_id),
+               COALESCE(SUM(a.is_late = 1), 0), COALESCE(SUM(a.remarks = 'Clock In'), 0)
+        FROM Employee e LEFT JOIN attendance_logs a ON a.employee_id = e.employee_id AND a.date = ?
+        WHERE e.employee_id = ?
+        GROUP BY e.employee_id
+    '''
+
+    shared_instances = {}
+    shared_lock = threading.Lock()
+
+    @classmethod
+    def shared(cls, db):
+        """The instance for this database, so every dashboard and the attendance write path use one cache"""
+        with cls.shared_lock:
+            if id(db) not in cls.shared_instances:
+                cls.shared_instances[id(db)] = cls(db)
+            return cls.shared_instances[id(db)]
+
+    def __init__(self, db, ttl=60):
+        self.db = db
+        self.ttl = ttl
+        self.analytics = AttendanceAnalytics(db)
+        self.lock = threading.Lock()
+        self.cached = None
+        self.cached_at = 0
+        self.cached_date = None
+        # Connected before any dashboard slot, so dashboards reading get() in their own slot see the delta
+        APP_EVENTS.attendance_logged.connect(self.apply_attendance_logged)
+        APP_EVENTS.employee_changed.connect(self.invalidate)
+
+    def invalidate(self, *event):
+        with self.lock:
+            self.cached = None
+
+    def apply_attendance_logged(self, employee_id, date_str, time_str, remarks, is_late):
+        """Update the cached KPIs for one committed attendance log with a single indexed lookup"""
+        with self.lock:
+            if self.cached is None or self.cached_date != date_str:
+                return
+        cursor = self.db.execute_query(self.EMPLOYEE_DAY_SQL, (date_str, employee_id))
+        row = cursor.fetchone() if cursor else None
+        if row is None or row[0]:
+            return
+        _, status, schedule, log_count, late_count, clock_in_count = row
+        overtime = self.analytics.average_overtime(date_str) if remarks == "Clock Out" else None
+
+        with self.lock:
+            if self.cached is None or self.cached_date != date_str:
+                return
+            metrics = dict(self.cached)
+            if log_count == 1:
+                metrics["logged_employees"] += 1
+                if status == 'Active':
+                    metrics["absent_employees"] = max(metrics["absent_employees"] - 1, 0)
+            if is_late and late_count == 1:
+                metrics["late_employees"] += 1
+            if remarks == "Clock In" and clock_in_count == 1 and status == 'Active':
+                for shift, shift_schedule in self.SHIFTS.items():
+                    if schedule == shift_schedule:
+                        metrics[f"{shift}_present"] += 1
+            if overtime is not None:
+                metrics["ave_overtime"] = overtime
+            self.cached = metrics
+
+    def get(self):
+        """Dict of today's KPIs; recomputed when older than ttl, on a new day or after invalidate()"""
+        today = datetime.now().strftime("%Y-%m-%d")
+        with self.lock:
+            if self.cached is not None and self.cached_date == today and time.time() - self.cached_at < self.ttl:
+                return self.cached
+
+        metrics = {
+            "total_employees": 0, "active_employees": 0, "logged_employees": 0,
+            "late_employees": 0, "absent_employees": 0,
+        }
+        for shift in self.SHIFTS:
+            metrics[f"{shift}_total"] = 0
+            metrics[f"{shift}_present"] = 0
+
+        cursor = self.db.execute_query(self.METRICS_SQL, (today,))
+        for schedule, total, active, logged, late, absent, shift_total, shift_present in (cursor.fetchall() if cursor else []):
+            metrics["total_employees"] += total or 0
+            metrics["active_employees"] += active or 0
+            metrics["logged_employees"] += logged or 0
+            metrics["late_employees"] += late or 0
+            metrics["absent_employees"] += absent or 0
+            for shift, shift_schedule in self.SHIFTS.items():
+                if schedule == shift_schedule:
+                    metrics[f"{shift}_total"] = shift_total or 0
+                    metrics[f"{shift}_present"] = shift_present or 0
+        metrics["ave_overtime"] = self.analytics.average_overtime(today)
+
+        with self.lock:
+            self.cached = metrics
+            self.cached_at = time.time()
+            self.cached_date = today
+        return metrics
+
+class AuditLogWriter:
+    """Background sink for the daily text audit log and the system_logs counter updates.
+
+    Callers only enqueue; one daemon thread appends the lines in batches to an open handle on
+    resources/logs/YYYYMMDD.txt (reopened when the day changes) and runs the queued database tasks.
+    """
+    def __init__(self, log_dir="resources/logs", batch_size=200, flush_interval=0.5):
+        self.log_dir = log_dir
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue()
+        self.file = None
+        self.file_path = None
+        self.thread = None
+        self.start_lock = threading.Lock()
+        self.closed = False
+
+    def path_for(self, timestamp):
+        return os.path.join(self.log_dir, f"{timestamp.strftime('%Y%m%d')}.txt")
+
+    def ensure_started(self):
+        if self.thread is None:
+            with self.start_lock:
+                if self.thread is None:
+                    self.thread = threading.Thread(target=self._run, name="AuditLogWriter", daemon=True)
+                    self.thread.start()
+
+    def write(self, timestamp, action):
+        """Queue one audit line stamped with the time of the action"""
+        if self.closed:
+            return
+        self.ensure_started()
+        self.queue.put(("line", timestamp, action))
+
+    def submit(self, task):
+        """Queue a callable to run on the writer thread after the lines queued before it"""
+        if self.closed:
+            return
+        self.ensure_started()
+        self.queue.put(("task", task, None))
+
+    def _open_for(self, timestamp):
+        path = self.path_for(timestamp)
+        if path != self.file_path:
+            if self.file:
+                self.file.close()
+            os.makedirs(self.log_dir, exist_ok=True)
+            self.file = open(path, "a")
+            self.file_path = path
+        return self.file
+
+    def _process(self, batch):
+        for kind, payload, action in batch:
+            try:
+                if kind == "line":
+                    self._open_for(payload).write(f"{payload.strftime('%Y-%m-%d %H:%M:%S')} - {action}\n")
+                else:
+                    if self.file:
+                        self.file.flush()
+                    payload()
+            except Exception as e:
+                print(f"Error writing audit log: {e}")
+        if self.file:
+            self.file.flush()
+
+    def _run(self):
+        running = True
+        while running:
+            try:
+                batch = [self.queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            if ("stop", None, None) in batch:
+                batch = [item for item in batch if item[0] != "stop"]
+                running = False
+            self._process(batch)
+        if self.file:
+            self.file.close()
+            self.file = None
+            self.file_path = None
+
+    def close(self, timeout=5):
+        """Flush everything queued so far and stop the writer thread; called at interpreter exit"""
+        if self.closed:
+            return
+        self.closed = True
+        if self.thread is not None:
+            self.queue.put(("stop", None, None))
+            self.thread.join(timeout)
+
+AUDIT_LOG = AuditLogWriter()
+atexit.register(AUDIT_LOG.close)
+
 class SystemLogs:
     def __init__(self, db):
         self.db = db
+        self.attendance_summary = AttendanceSummary(db)
+        self.attendance_analytics = AttendanceAnalytics(db)
 
     def get_average_work_hours(self, date_str):
         try:
-            cursor = self.db.execute_query(
-                '''
-                SELECT employee_id FROM attendance_logs
-                WHERE date = ? AND remarks = 'Clock In'
-                AND employee_id IN (SELECT employee_id FROM Employee WHERE is_hr = 0)
-                ''', (date_str,)
-            )
-            employee_ids = [row[0] for row in cursor.fetchall()] if cursor else []
-            total_hours = 0
-            count = 0
-            for emp_id in employee_ids:
-                cur = self.db.execute_query(
-                    '''
-                    SELECT time, remarks FROM attendance_logs
-                    WHERE employee_id = ? AND date = ?
-                    ORDER BY time ASC
-                    ''', (emp_id, date_str)
-                )
-                logs = cur.fetchall() if cur else []
-                clock_in_time = None
-                clock_out_time = None
-                for log in logs:
-                    if log[1] == "Clock In" and not clock_in_time:
-                        clock_in_time = log[0]
-                    elif log[1] == "Clock Out":
-                        clock_out_time = log[0]
-                if clock_in_time and clock_out_time:
-                    try:
-                        t1 = datetime.strptime(f"{date_str} {clock_in_time}", "%Y-%m-%d %H:%M:%S")
-                        t2 = datetime.strptime(f"{date_str} {clock_out_time}", "%Y-%m-%d %H:%M:%S")
-                        hours = (t2 - t1).total_seconds() / 3600
-                        if hours > 0:
-                            total_hours += hours
-                            count += 1
-                    except Exception:
-                        continue
-            return round(total_hours / count, 2) if count > 0 else 0
+            return self.attendance_analytics.average_work_hours(date_str)
         except Exception as e:
             print(f"Error calculating average work hours: {e}")
             return 0
 
     def log_system_action(self, action, entity_type):
+        """Queue the audit line and the counter update on AUDIT_LOG; never touches the disk on the caller's thread"""
         try:
-            log_dir = "resources/logs"
-            if not os.path.exists(log_dir):
-                os.makedirs(log_dir)
-
-            log_file = os.path.join(log_dir, f"{datetime.now().strftime('%Y%m%d')}.txt")
-            current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-
-            with open(log_file, "a") as file:
-                file.write(f"{current_time} - {action}\n")
+            now = datetime.now()
+            AUDIT_LOG.write(now, action)
 
             entity_id = None
             if entity_type == "Employee" and hasattr(self, "employee_data"):
                 entity_id = self.employee_data.get("employee_id")
             elif entity_type == "Admin" and hasattr(self, "admin_id"):
                 entity_id = self.admin_id
-            elif entity_type == "Feedback":
-                cursor = self.db.execute_query("SELECT id FROM feedback ORDER BY created_at DESC LIMIT 1")
-                result = cursor.fetchone()
-                entity_id = result[0] if result else None
-            elif entity_type == "AttendanceLog":
-                cursor = self.db.execute_query("SELECT log_id FROM attendance_logs ORDER BY date DESC, time DESC LIMIT 1")
-                result = cursor.fetchone()
-                entity_id = result[0] if result else None
-            elif entity_type == "SystemSettings":
-                cursor = self.db.execute_query("SELECT id FROM system_settings ORDER BY last_modified_at DESC LIMIT 1")
-                result = cursor.fetchone()
-                entity_id = result[0] if result else None
+            AUDIT_LOG.submit(lambda: self.update_system_log(now, entity_type, entity_id))
+        except Exception as e:
+            print(f"Error logging system action: {e}")
+
+    def update_system_log(self, now, entity_type, entity_id=None):
+        """Upsert today's system_logs row with the current attendance counters; runs on the audit log thread"""
+        try:
+            log_file = AUDIT_LOG.path_for(now)
+            current_time = now.strftime('%Y-%m-%d %H:%M:%S')
+
+            if entity_id is None:
+                if entity_type == "Feedback":
+                    cursor = self.db.execute_query("SELECT id FROM feedback ORDER BY created_at DESC LIMIT 1")
+                    result = cursor.fetchone()
+                    entity_id = result[0] if result else None
+                elif entity_type == "AttendanceLog":
+                    cursor = self.db.execute_query("SELECT log_id FROM attendance_logs ORDER BY date DESC, time DESC LIMIT 1")
+                    result = cursor.fetchone()
+                    entity_id = result[0] if result else None
+                elif entity_type == "SystemSettings":
+                    cursor = self.db.execute_query("SELECT id FROM system_settings ORDER BY last_modified_at DESC LIMIT 1")
+                    result = cursor.fetchone()
+                    entity_id = result[0] if result else None
 
             if entity_id is None:
                 entity_id = entity_type
 
-            today = datetime.now().strftime('%Y-%m-%d')
+            today = now.strftime('%Y-%m-%d')
             present_count = 0
             absent_count = 0
             late_count = 0
+            average_work_hours = 0
             try:
-                cursor = self.db.execute_query(
-                    "SELECT COUNT(DISTINCT employee_id) FROM attendance_logs WHERE date = ? AND employee_id IN (SELECT employee_id FROM Employee WHERE is_hr = 0)",
-                    (today,)
-                )
-                present_count = cursor.fetchone()[0] if cursor else 0
-
-                cursor = self.db.execute_query(
-                    "SELECT COUNT(DISTINCT employee_id) FROM attendance_logs WHERE date = ? AND is_late = 1 AND employee_id IN (SELECT employee_id FROM Employee WHERE is_hr = 0)",
-                    (today,)
-                )
-                late_count = cursor.fetchone()[0] if cursor else 0
-
-                cursor = self.db.execute_query(
-                    "SELECT COUNT(*) FROM Employee WHERE is_hr = 0 AND status = 'Active' AND employee_id NOT IN (SELECT DISTINCT employee_id FROM attendance_logs WHERE date = ?)",
-                    (today,)
-                )
-                absent_count = cursor.fetchone()[0] if cursor else 0
-                
-                average_work_hours = self.get_average_work_hours(today)
+                present_count, absent_count, late_count, average_work_hours = self.attendance_summary.get(today)
             except Exception as e:
                 print(f"Error computing attendance counts for system logs: {e}")
 
@@ -400,6 +1156,211 @@ class FingerprintSignals(QObject):
     update_status = Signal(str)
     restart_scan = Signal()
 
+class FingerprintGallery:
+    """Registered fingerprint templates, read from disk once and mirrored into the ZKFP SDK's in-memory 1:N database"""
+    def __init__(self, db, zkfp, match_threshold=50):
+        self.db = db
+        self.zkfp = zkfp
+        self.match_threshold = match_threshold
+        self.lock = threading.Lock()
+
+        # fingerprints.id -> (employee_id, template bytes). The row id doubles as the SDK's fid.
+        self.templates = {}
+        self.loaded = False
+        # The SDK database lives inside the driver and is emptied on every Init/Terminate
+        self.device_db_ready = False
+
+    def __len__(self):
+        return len(self.templates)
+
+    def read_templates(self, employee_id=None):
+        """Read the registered .tpl files, optionally only for one employee"""
+        query = "SELECT id, employee_id, template_path FROM fingerprints WHERE template_path != '' AND template_path IS NOT NULL"
+        params = ()
+        if employee_id is not None:
+            query += " AND employee_id = ?"
+            params = (employee_id,)
+        cursor = self.db.execute_query(query, params)
+        records = cursor.fetchall() if cursor else []
+
+        templates = {}
+        for fingerprint_id, emp_id, template_path in records:
+            if not os.path.exists(template_path):
+                continue
+            try:
+                with open(template_path, "rb") as tpl_file:
+                    templates[fingerprint_id] = (str(emp_id), tpl_file.read())
+            except Exception as e:
+                print(f"Error loading fingerprint template {template_path}: {e}")
+        return templates
+
+    def load(self):
+        """Read every registered template on first use; afterwards only refill the SDK database"""
+        if not self.loaded:
+            templates = self.read_templates()
+            with self.lock:
+                self.templates = templates
+                self.loaded = True
+            print(f"Fingerprint gallery loaded: {len(templates)} templates")
+        self.sync_device_db()
+
+    def sync_device_db(self):
+        """Copy the cached templates into the SDK database after the device has been initialized"""
+        with self.lock:
+            self.device_db_ready = False
+            try:
+                self.zkfp.DBClear()
+                for fingerprint_id, (_, template) in self.templates.items():
+                    self.zkfp.DBAdd(fingerprint_id, template)
+                self.device_db_ready = True
+            except Exception as e:
+                print(f"Error filling the fingerprint device database, falling back to DBMatch: {e}")
+
+    def device_closed(self):
+        self.device_db_ready = False
+
+    def _device_db_add(self, fingerprint_id, template):
+        if not self.device_db_ready:
+            return
+        try:
+            self.zkfp.DBDel(fingerprint_id)
+        except Exception:
+            pass
+        try:
+            self.zkfp.DBAdd(fingerprint_id, template)
+        except Exception as e:
+            print(f"Error adding fingerprint {fingerprint_id} to the device database: {e}")
+            self.device_db_ready = False
+
+    def _device_db_delete(self, fingerprint_id):
+        if not self.device_db_ready:
+            return
+        try:
+            self.zkfp.DBDel(fingerprint_id)
+        except Exception as e:
+            print(f"Error removing fingerprint {fingerprint_id} from the device database: {e}")
+            self.device_db_ready = False
+
+    def add_template(self, fingerprint_id, employee_id, template):
+        """Add a freshly registered template without re-reading the directory"""
+        if not self.loaded:
+            return
+        template = bytes(template)
+        with self.lock:
+            templates = dict(self.templates)
+            templates[fingerprint_id] = (str(employee_id), template)
+            self.templates = templates
+            self._device_db_add(fingerprint_id, template)
+
+    def refresh_employee(self, employee_id):
+        """Reload one employee's template after re-enrollment"""
+        if not self.loaded:
+            return
+        fresh = self.read_templates(employee_id)
+        with self.lock:
+            templates = {fid: entry for fid, entry in self.templates.items() if entry[0] != str(employee_id)}
+            for fingerprint_id in set(self.templates) - set(templates) - set(fresh):
+                self._device_db_delete(fingerprint_id)
+            for fingerprint_id, (emp_id, template) in fresh.items():
+                templates[fingerprint_id] = (emp_id, template)
+                self._device_db_add(fingerprint_id, template)
+            self.templates = templates
+
+    def remove_employee(self, employee_id):
+        """Drop the templates of a deleted employee"""
+        if not self.loaded:
+            return
+        with self.lock:
+            removed = [fid for fid, entry in self.templates.items() if entry[0] == str(employee_id)]
+            templates = dict(self.templates)
+            for fingerprint_id in removed:
+                templates.pop(fingerprint_id, None)
+                self._device_db_delete(fingerprint_id)
+            self.templates = templates
+
+    def device_identify(self, template, exclude_employee_id=None):
+        """Best (employee_id, score) from the SDK database, or None when it is not available.
+
+        The templates of exclude_employee_id are taken out of the SDK database for the search and put back afterwards.
+        """
+        with self.lock:
+            if not self.device_db_ready:
+                return None
+            excluded = [(fid, entry[1]) for fid, entry in self.templates.items()
+                        if exclude_employee_id is not None and entry[0] == str(exclude_employee_id)]
+            try:
+                for fingerprint_id, _ in excluded:
+                    self.zkfp.DBDel(fingerprint_id)
+                fingerprint_id, score = self.zkfp.DBIdentify(template)
+            except Exception as e:
+                print(f"Error identifying fingerprint in the device database, falling back to DBMatch: {e}")
+                return None
+            finally:
+                for excluded_id, excluded_template in excluded:
+                    self._device_db_add(excluded_id, excluded_template)
+            entry = self.templates.get(fingerprint_id)
+            return (entry[0] if entry else None), score
+
+    def match(self, template, stored_template):
+        """1:1 DBMatch score; the SDK handle is shared, so calls are serialized with the rest of its use"""
+        with self.lock:
+            return self.zkfp.DBMatch(template, stored_template)
+
+    def identify(self, template):
+        """1:N identification of a captured template, as (employee_id, score); employee_id is None without a match"""
+        device_result = self.device_identify(template)
+        if device_result is not None:
+            employee_id, score = device_result
+            if employee_id is not None and score >= self.match_threshold:
+                return employee_id, score
+            return None, score
+
+        best_score = -1
+        matched_employee_id = None
+        for employee_id, stored_template in self.templates.values():
+            score = self.match(template, stored_template)
+            if score >= self.match_threshold and score > best_score:
+                best_score = score
+                matched_employee_id = employee_id
+        return matched_employee_id, best_score
+
+class FingerprintDuplicateChecker:
+    """Checks a new template against the other employees' cached templates, in chunks that report progress"""
+    def __init__(self, gallery, threshold=35, chunk_size=200):
+        self.gallery = gallery
+        self.threshold = threshold
+        self.chunk_size = chunk_size
+
+    def find_duplicate(self, template, current_employee_id=None, progress_callback=None):
+        """Employee id whose registered fingerprint matches the template, or None"""
+        current_employee_id = str(current_employee_id or "")
+
+        # The SDK's 1:N search over everyone but the enrolling employee settles it in one call
+        device_result = self.gallery.device_identify(template, exclude_employee_id=current_employee_id or None)
+        if device_result is not None:
+            employee_id, score = device_result
+            if employee_id is not None and employee_id != current_employee_id and score >= self.threshold:
+                print(f"Fingerprint duplicate of {employee_id}: score {score}")
+                return employee_id
+            return None
+
+        candidates = [(employee_id, stored_template) for employee_id, stored_template in self.gallery.templates.values()
+                      if employee_id != current_employee_id]
+        total = (len(candidates) + self.chunk_size - 1) // self.chunk_size
+        for done, start in enumerate(range(0, len(candidates), self.chunk_size), start=1):
+            for employee_id, stored_template in candidates[start:start + self.chunk_size]:
+                try:
+                    score = self.gallery.match(template, stored_template)
+                except Exception as e:
+                    print(f"Error comparing fingerprints: {e}")
+                    continue
+                if score >= self.threshold:
+                    print(f"Fingerprint duplicate of {employee_id}: score {score}")
+                    return employee_id
+            if progress_callback:
+                progress_callback(done, total)
+        return None
+
 class FingerprintLogic:
     def __init__(self, db):
         self.zkfp = ZKFP2()
@@ -413,8 +1374,11 @@ class FingerprintLogic:
         self.enrollment_completed = False
         self.employee_id_being_enrolled = None
         self.scanning_active = False 
+        # Loaded when the device opens for scanning; a probe passes load_gallery=False and reads no templates
+        self.gallery = FingerprintGallery(db, self.zkfp)
+        self.duplicate_checker = FingerprintDuplicateChecker(self.gallery)
 
-    def initialize_device(self):
+    def initialize_device(self, load_gallery=True):
         try:
             if self.device_open:
                 try:
@@ -428,6 +1392,8 @@ class FingerprintLogic:
                 self.zkfp.OpenDevice(0)
                 self.device_open = True
                 print(f"Device initialized. {count} device(s) found.")
+                if load_gallery:
+                    self.gallery.load()
                 self.zkfp.Light('white')
                 return True
             else:
@@ -455,10 +1421,12 @@ class FingerprintLogic:
                     print(f"Error during ZKFP CloseDevice: {e}")
             self.zkfp.Terminate()
             self.device_open = False
+            self.gallery.device_closed()
             print("Device terminated successfully.")
         except Exception as e:
             print(f"Error during device termination: {e}")
             self.device_open = False
+            self.gallery.device_closed()
             raise
 
     def register_fingerprint(self, employee_id, fp_image_lbl, fp_enrollment_note_lbl):
@@ -493,7 +1461,7 @@ class FingerprintLogic:
                     if capture:
                         tmp, image_data = capture
                         
-                        if self.is_fingerprint_already_used(tmp, employee_id):
+                        if self.is_fingerprint_already_used(tmp, employee_id, fp_enrollment_note_lbl):
                             fp_enrollment_note_lbl.setText("This fingerprint is already registered to another employee. Try a different finger.")
                             time.sleep(2)
                             continue
@@ -508,7 +1476,7 @@ class FingerprintLogic:
             reg_temp, _ = self.zkfp.DBMerge(*templates)
             reg_temp_bytes = bytes(reg_temp)
             
-            if self.is_fingerprint_already_used(reg_temp, employee_id):
+            if self.is_fingerprint_already_used(reg_temp, employee_id, fp_enrollment_note_lbl):
                 fp_enrollment_note_lbl.setText("This fingerprint matches one already in the system. Registration failed.")
                 self.enrollment_in_progress = False
                 return
@@ -521,6 +1489,8 @@ class FingerprintLogic:
                 tpl_file.write(reg_temp_bytes)
 
             self.db.execute_query("UPDATE fingerprints SET template_path = ? WHERE id = ?", (template_path, fingerprint_id))
+            self.gallery.add_template(fingerprint_id, employee_id, reg_temp_bytes)
+            APP_EVENTS.biometric_enrolled.emit(employee_id, "fingerprint")
             
             fp_image_lbl.setStyleSheet("background-color: rgb(8, 132, 60); color: white; font-weight: bold; border-radius: 5px;")
             fp_image_lbl.setText("SUCCESSFUL ENROLLMENT")
@@ -534,27 +1504,17 @@ class FingerprintLogic:
             print(f"Error registering fingerprint: {e}")
             self.enrollment_in_progress = False
             
-    def is_fingerprint_already_used(self, new_template, current_employee_id=None):
+    def is_fingerprint_already_used(self, new_template, current_employee_id=None, fp_enrollment_note_lbl=None):
         try:
-            cursor = self.db.execute_query(
-                "SELECT employee_id, template_path FROM fingerprints WHERE employee_id != ?", 
-                (current_employee_id or "",)
-            )
-            records = cursor.fetchall() if cursor else []
-            for employee_id, template_path in records:
-                if not os.path.exists(template_path):
-                    continue
-                try:
-                    with open(template_path, "rb") as f:
-                        existing_template = f.read()
-                    match_score = self.zkfp.DBMatch(new_template, existing_template)
-                    print(f"Fingerprint match check with {employee_id}: score {match_score}")
-                    if match_score >= 35:
-                        return True
-                except Exception as e:
-                    print(f"Error comparing fingerprints: {e}")
-                    continue
-            return False
+            if not self.gallery.loaded:
+                self.gallery.load()
+            progress_callback = None
+            if fp_enrollment_note_lbl is not None:
+                def progress_callback(done, total):
+                    # Called on the registration worker thread: queue the update to the label's GUI thread
+                    QMetaObject.invokeMethod(fp_enrollment_note_lbl, "setText", Qt.QueuedConnection,
+                                             Q_ARG(str, f"Checking for duplicate fingerprints... {done * 100 // total}%"))
+            return self.duplicate_checker.find_duplicate(new_template, current_employee_id, progress_callback) is not None
         except Exception as e:
             print(f"Error checking fingerprint duplication: {e}")
             return False
@@ -626,21 +1586,9 @@ class FingerprintLogic:
             callback(None)
             return
         try:
-            cursor = self.db.execute_query("SELECT id, employee_id, template_path FROM fingerprints")
-            records = cursor.fetchall() if cursor else []
-            best_score = -1
-            matched_employee_id = None
-            for record_id, employee_id, template_path in records:
-                if os.path.exists(template_path):
-                    with open(template_path, "rb") as tpl_file:
-                        db_template = tpl_file.read()
-                    result = self.zkfp.DBMatch(captured_template, db_template)
-                    print(f"Match result: {result}")
-                    threshold = 50
-                    if result >= threshold and result > best_score:
-                        best_score = result
-                        matched_employee_id = employee_id
-            if best_score > 0:
+            matched_employee_id, best_score = self.gallery.identify(captured_template)
+            print(f"Match result: {best_score}")
+            if matched_employee_id:
                 try:
                     self.zkfp.Light('green')
                 except Exception as e:
@@ -700,7 +1648,7 @@ class FingerprintLogic:
             reg_temp, _ = self.zkfp.DBMerge(*templates)
             reg_temp_bytes = bytes(reg_temp)
             
-            if self.is_fingerprint_already_used(reg_temp, employee_id):
+            if self.is_fingerprint_already_used(reg_temp, employee_id, fp_enrollment_note_lbl):
                 fp_enrollment_note_lbl.setText("This fingerprint matches one already in the system. Re-enrollment failed.")
                 self.enrollment_in_progress = False
                 completion_callback(False)
@@ -730,15 +1678,412 @@ class FingerprintLogic:
             print(f"Error re-enrolling fingerprint: {e}")
             self.enrollment_in_progress = False
             completion_callback(False)
-            
+
+class FaceTemplateStore:
+    """Face templates in the face_embeddings table, the only place enrolled poses are written"""
+    def __init__(self, db, embedding_size=512):
+        self.db = db
+        self.embedding_size = embedding_size
+
+    def load(self, employee_id=None):
+        """All templates (or one employee's) with a single SELECT, as (rows, thumbnails) like FaceGallery.read_templates"""
+        query = "SELECT employee_id, pose, embedding, thumbnail FROM face_embeddings"
+        params = ()
+        if employee_id is not None:
+            query += " WHERE employee_id = ?"
+            params = (employee_id,)
+        cursor = self.db.execute_query(query + " ORDER BY employee_id, pose", params)
+        records = cursor.fetchall() if cursor else []
+
+        row_bytes = self.embedding_size * 4
+        valid = [record for record in records if len(record[2]) == row_bytes]
+        if len(valid) != len(records):
+            print(f"Skipping {len(records) - len(valid)} face embeddings with an unexpected size")
+        embeddings = np.frombuffer(b"".join(record[2] for record in valid), dtype=np.float32).reshape(-1, self.embedding_size)
+
+        rows = [(str(record[0]), record[1], embedding) for record, embedding in zip(valid, embeddings)]
+        thumbnails = {}
+        for record in valid:
+            if record[3]:
+                gray = cv2.imdecode(np.frombuffer(record[3], dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+                if gray is not None:
+                    thumbnails.setdefault(str(record[0]), {})[record[1]] = gray
+        return rows, thumbnails
+
+    UPSERT_SQL = '''
+        INSERT INTO face_embeddings (employee_id, pose, embedding, thumbnail)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT (employee_id, pose) DO UPDATE SET
+            embedding = excluded.embedding, thumbnail = excluded.thumbnail, created_at = CURRENT_TIMESTAMP
+    '''
+
+    @staticmethod
+    def encode_record(employee_id, pose, embedding, face_image=None):
+        """Row values for one pose: float32 embedding bytes and a JPEG-encoded thumbnail"""
+        thumbnail = None
+        if face_image is not None:
+            ok, encoded = cv2.imencode('.jpg', face_image)
+            thumbnail = encoded.tobytes() if ok else None
+        return (employee_id, pose, np.asarray(embedding, dtype=np.float32).reshape(-1).tobytes(), thumbnail)
+
+    def save_template(self, employee_id, pose, embedding, face_image=None):
+        """Insert or replace one pose of an employee"""
+        self.db.execute_query(self.UPSERT_SQL, self.encode_record(employee_id, pose, embedding, face_image))
+
+    def replace_employee(self, transaction, employee_id, templates):
+        """Swap all of an employee's poses for templates [(pose, embedding, face_image)] inside the caller's transaction.
+
+        Database errors propagate, so that the whole transaction rolls back.
+        """
+        transaction.execute("DELETE FROM face_embeddings WHERE employee_id = ?", (employee_id,))
+        transaction.executemany(self.UPSERT_SQL, [self.encode_record(employee_id, pose, embedding, face_image)
+                                                  for pose, embedding, face_image in templates])
+
+    def delete_employee(self, employee_id):
+        self.db.execute_query("DELETE FROM face_embeddings WHERE employee_id = ?", (employee_id,))
+
+    def count(self, employee_id=None):
+        """Number of stored poses, overall or for one employee"""
+        if employee_id is None:
+            cursor = self.db.execute_query("SELECT COUNT(*) FROM face_embeddings")
+        else:
+            cursor = self.db.execute_query("SELECT COUNT(*) FROM face_embeddings WHERE employee_id = ?", (employee_id,))
+        result = cursor.fetchone() if cursor else None
+        return result[0] if result else 0
+
+    @staticmethod
+    def parse_template_filename(filename):
+        """Split '{employee_id}_{pose}.npy/.jpg' into its parts; temporary re-enrollment files are skipped"""
+        name, ext = os.path.splitext(filename)
+        ext = ext.lower()
+        if ext not in ('.npy', '.jpg') or filename.startswith('temp_') or '_' not in name:
+            return None, None, None
+        employee_id, pose = name.split('_', 1)
+        return employee_id, pose, ext
+
+    def import_files(self, templates_dir):
+        """Copy the {employee_id}_{pose}.npy/.jpg files of earlier versions into the table"""
+        templates = {}
+        if os.path.exists(templates_dir):
+            for filename in os.listdir(templates_dir):
+                emp_id, pose, ext = self.parse_template_filename(filename)
+                if emp_id is None:
+                    continue
+                path = os.path.join(templates_dir, filename)
+                try:
+                    entry = templates.setdefault((emp_id, pose), {})
+                    if ext == '.npy':
+                        embedding = np.load(path, allow_pickle=True).astype(np.float32).reshape(-1)
+                        if embedding.size == self.embedding_size:
+                            entry['embedding'] = embedding.tobytes()
+                    else:
+                        with open(path, 'rb') as f:
+                            entry['thumbnail'] = f.read()
+                except Exception as e:
+                    print(f"Error importing face template {filename}: {e}")
+
+        records = [(emp_id, pose, entry['embedding'], entry.get('thumbnail'))
+                   for (emp_id, pose), entry in templates.items() if 'embedding' in entry]
+        try:
+            with self.db.transaction() as transaction:
+                transaction.executemany(self.UPSERT_SQL, records)
+        except sqlite3.Error as e:
+            print(f"Error importing face templates: {e}")
+            return 0
+        return len(records)
+
+    def migrate_files(self, templates_dir):
+        """One-time import of the template files of an existing installation into an empty table"""
+        if self.count() == 0:
+            imported = self.import_files(templates_dir)
+            if imported:
+                print(f"Imported {imported} face templates from {templates_dir} into the database")
+
+class FaceGallery:
+    """In-memory gallery of enrolled face templates, loaded once from the face_embeddings table"""
+    def __init__(self, templates_dir, store, embedding_size=512, ann_min_gallery_size=20000):
+        self.templates_dir = templates_dir
+        self.store = store
+        self.embedding_size = embedding_size
+        self.lock = threading.Lock()
+
+        # Approximate index, only built once the gallery has at least ann_min_gallery_size rows.
+        # Below that an exact matrix product is already fast enough.
+        self.ann_min_gallery_size = ann_min_gallery_size
+        self.ann_index_path = os.path.join(os.path.dirname(templates_dir), "face_templates_ivf.npz")
+        self.ann_index = None
+        # Set when poses were added to the index since it was last written; see save_ann_index
+        self.ann_index_dirty = False
+
+        # One row per enrolled pose: L2-normalized float32 matrix with parallel employee id / pose arrays.
+        # Updates replace the arrays instead of mutating them, so readers never see a half-written gallery.
+        self.embeddings = np.empty((0, embedding_size), dtype=np.float32)
+        self.employee_ids = np.empty(0, dtype=object)
+        self.poses = np.empty(0, dtype=object)
+        self.matcher = FaceMatcher(self.embeddings, self.employee_ids)
+
+        # Grayscale 160x160 template images per employee keyed by pose, and their histograms, used by the visual verifiers
+        self.thumbnails = {}
+        self.histograms = {}
+
+        self.load()
+
+    def __len__(self):
+        return len(self.employee_ids)
+
+    @staticmethod
+    def template_histogram(gray):
+        """Normalized 256-bin grayscale histogram of a face image"""
+        hist = cv2.calcHist([gray], [0], None, [256], [0, 256])
+        return cv2.normalize(hist, hist).flatten()
+
+    def read_templates(self, employee_id=None):
+        """Read templates from the store, optionally only for one employee"""
+        return self.store.load(employee_id)
+
+    def load(self):
+        """Load every enrolled template into memory"""
+        self.store.migrate_files(self.templates_dir)
+        rows, thumbnails = self.read_templates()
+        with self.lock:
+            self.embeddings = np.empty((0, self.embedding_size), dtype=np.float32)
+            self.employee_ids = np.empty(0, dtype=object)
+            self.poses = np.empty(0, dtype=object)
+            self._append_rows(rows)
+            self._rebuild_matcher()
+            self._set_images(thumbnails)
+            self.ann_index = None
+            self._sync_ann_index()
+        print(f"Face gallery loaded: {len(rows)} embeddings for {len(set(r[0] for r in rows))} employees")
+
+    def _append_rows(self, rows):
+        if not rows:
+            return
+        new_embeddings = normalize_embeddings(np.stack([row[2] for row in rows]))
+        self.embeddings = np.ascontiguousarray(np.concatenate([self.embeddings, new_embeddings]))
+        self.employee_ids = np.concatenate([self.employee_ids, np.array([row[0] for row in rows], dtype=object)])
+        self.poses = np.concatenate([self.poses, np.array([row[1] for row in rows], dtype=object)])
+
+    def _keep_rows(self, keep):
+        self.embeddings = np.ascontiguousarray(self.embeddings[keep])
+        self.employee_ids = self.employee_ids[keep]
+        self.poses = self.poses[keep]
+
+    def _rebuild_matcher(self):
+        self.matcher = FaceMatcher(self.embeddings, self.employee_ids)
+
+    def _set_images(self, thumbnails, changed_employees=None):
+        """Swap in new thumbnails and recompute the histograms of the employees that changed (all when None)"""
+        histograms = {} if changed_employees is None else dict(self.histograms)
+        for employee_id in (thumbnails if changed_employees is None else changed_employees):
+            if employee_id in thumbnails:
+                histograms[employee_id] = [self.template_histogram(gray) for gray in thumbnails[employee_id].values()]
+            else:
+                histograms.pop(employee_id, None)
+        self.thumbnails = thumbnails
+        self.histograms = histograms
+
+    def _build_ann_index(self):
+        """Reuse the saved index when it still fits the gallery, otherwise train a new one"""
+        if os.path.exists(self.ann_index_path):
+            try:
+                index = IVFIndex.load(self.ann_index_path, self.embeddings, self.employee_ids, self.poses)
+                if len(self.employee_ids) <= 2 * index.trained_size:
+                    return index
+            except Exception as e:
+                print(f"Error loading face index, rebuilding: {e}")
+        print(f"Training face index for {len(self.employee_ids)} embeddings")
+        index = IVFIndex.train(self.embeddings)
+        index.add(self.embeddings, self.employee_ids, self.poses)
+        return index
+
+    def _sync_ann_index(self, employee_id=None, pose=None):
+        """Keep the ANN index in step with the gallery after a load or a change to one employee"""
+        if len(self.employee_ids) < self.ann_min_gallery_size:
+            self.ann_index = None
+            return
+        try:
+            index = self.ann_index
+            # Retrain once the gallery has doubled since the lists were clustered
+            if index is None or employee_id is None or len(self.employee_ids) > 2 * index.trained_size:
+                index = self._build_ann_index()
+                index.save(self.ann_index_path)
+                self.ann_index_dirty = False
+            else:
+                index.remove(employee_id, pose)
+                changed = self.employee_ids == employee_id
+                if pose is not None:
+                    changed &= self.poses == pose
+                index.add(self.embeddings[changed], self.employee_ids[changed], self.poses[changed])
+                # Written once per enrollment or change by save_ann_index, not after every captured pose
+                self.ann_index_dirty = True
+            self.ann_index = index
+        except Exception as e:
+            print(f"Error updating face index, falling back to exact search: {e}")
+            self.ann_index = None
+
+    def save_ann_index(self):
+        """Write the ANN index if it changed since the last save. A missed save only means the rows added since
+        are reassigned to their nearest lists on the next load."""
+        with self.lock:
+            if self.ann_index is None or not self.ann_index_dirty:
+                return
+            try:
+                self.ann_index.save(self.ann_index_path)
+                self.ann_index_dirty = False
+            except Exception as e:
+                print(f"Error saving face index: {e}")
+
+    def add_template(self, employee_id, pose, embedding, face_image=None):
+        """Add or replace a single freshly captured pose without re-reading the table"""
+        self.store.save_template(employee_id, pose, embedding, face_image)
+        with self.lock:
+            self._keep_rows(~((self.employee_ids == employee_id) & (self.poses == pose)))
+            self._append_rows([(employee_id, pose, np.asarray(embedding, dtype=np.float32).reshape(-1))])
+            self._rebuild_matcher()
+            self._sync_ann_index(employee_id, pose)
+            if face_image is not None:
+                thumbnails = dict(self.thumbnails)
+                gray = face_image if face_image.ndim == 2 else cv2.cvtColor(face_image, cv2.COLOR_BGR2GRAY)
+                # A re-captured pose replaces its old image instead of adding a stale one
+                thumbnails[employee_id] = {**thumbnails.get(employee_id, {}), pose: gray}
+                self._set_images(thumbnails, [employee_id])
+
+    def refresh_employee(self, employee_id):
+        """Reload one employee's templates from the table after enrollment or re-enrollment"""
+        rows, thumbnails = self.read_templates(employee_id)
+        with self.lock:
+            self._keep_rows(self.employee_ids != employee_id)
+            self._append_rows(rows)
+            self._rebuild_matcher()
+            self._sync_ann_index(employee_id)
+            updated_thumbnails = dict(self.thumbnails)
+            updated_thumbnails.pop(employee_id, None)
+            if employee_id in thumbnails:
+                updated_thumbnails[employee_id] = thumbnails[employee_id]
+            self._set_images(updated_thumbnails, [employee_id])
+        self.save_ann_index()
+
+    def remove_employee(self, employee_id, from_store=True):
+        """Drop all templates of a deleted employee; from_store=False when the caller already deleted the rows"""
+        if from_store:
+            self.store.delete_employee(employee_id)
+        with self.lock:
+            self._keep_rows(self.employee_ids != employee_id)
+            self._rebuild_matcher()
+            self._sync_ann_index(employee_id)
+            if employee_id in self.thumbnails:
+                thumbnails = dict(self.thumbnails)
+                thumbnails.pop(employee_id, None)
+                self._set_images(thumbnails, [employee_id])
+        self.save_ann_index()
+
+    def top_k(self, embeddings, k=1, exclude=None):
+        """Top-k (employee_id, score) pairs for one embedding or a batch, max-pooled over each employee's poses"""
+        ann_index = self.ann_index
+        if ann_index is not None:
+            return ann_index.top_k(embeddings, k=k, exclude=exclude)
+        return self.matcher.top_k(embeddings, k=k, exclude=exclude)
+
+    def employee_score(self, embedding, employee_id):
+        """Best cosine similarity between an embedding and one employee's poses"""
+        return self.matcher.employee_score(embedding, employee_id)
+
+class VisualVerifier:
+    """Optional second check of a face crop against one employee's stored template images"""
+    def __init__(self, gallery):
+        self.gallery = gallery
+
+    def prepare(self, face_roi):
+        """Features of the live crop, computed once per frame and reused for every candidate"""
+        return cv2.cvtColor(face_roi, cv2.COLOR_BGR2GRAY)
+
+    def score(self, features, employee_id):
+        return 0.0
+
+class SSIMVerifier(VisualVerifier):
+    """Best SSIM between the crop and the employee's 160x160 template images"""
+    def prepare(self, face_roi):
+        return cv2.cvtColor(cv2.resize(face_roi, (160, 160)), cv2.COLOR_BGR2GRAY)
+
+    def score(self, gray_face, employee_id):
+        best_score = 0.0
+        for gray_stored in self.gallery.thumbnails.get(employee_id, {}).values():
+            try:
+                best_score = max(best_score, ssim(gray_face, gray_stored))
+            except Exception as e:
+                print(f"Error comparing template image for {employee_id}: {e}")
+        return best_score
+
+class HistogramVerifier(VisualVerifier):
+    """Best grayscale histogram correlation between the crop and the employee's template images"""
+    def prepare(self, face_roi):
+        gray = cv2.cvtColor(cv2.resize(face_roi, (100, 100)), cv2.COLOR_BGR2GRAY)
+        return FaceGallery.template_histogram(gray)
+
+    def score(self, hist, employee_id):
+        best_score = 0.0
+        for stored_hist in self.gallery.histograms.get(employee_id, []):
+            best_score = max(best_score, cv2.compareHist(hist, stored_hist, cv2.HISTCMP_CORREL))
+        return best_score
+
+class FaceFrameResult:
+    """Everything computed for one camera frame: pose, ArcFace detection, embedding and match"""
+    def __init__(self, pose="Unknown", landmarks=None):
+        self.pose = pose
+        self.landmarks = landmarks
+        self.face = None            # First ArcFace face, or None
+        self.embedding = None
+        self.boxes = []             # Smoothed (x, y, w, h, name) boxes, as returned by detect_face
+        self.employee_id = ""
+        self.score = 0.0            # Combined embedding + visual score of the match
+        self.embedding_score = 0.0  # Cosine similarity to the matched employee, shown as the confidence
+        self.verified_employee = "" # Set by the kiosk's secondary check when the match should log attendance
+        self.latency_ms = 0.0       # Capture to result time when produced by FaceRecognitionPipeline
+        self.track_id = None
+        self.tracked = False        # True when the box came from the tracker instead of a full detection
+
+    @property
+    def confidence(self):
+        return int(self.embedding_score * 100)
+
+class FaceTrack:
+    """A face followed between full detections, with its cached recognition result"""
+    def __init__(self, track_id, box):
+        self.track_id = track_id
+        self.box = box
+        self.template = None
+        self.scale = 1.0
+        self.frames_since_detection = 0
+        self.employee_id = ""
+        self.score = 0.0
+        self.embedding_score = 0.0
+        self.embedding = None
+        self.recognized_at = 0.0
+
 class FaceIdLogic:
-    def __init__(self, success_callback=None):
+    def __init__(self, success_callback=None, db=None):
         self.cap = None
         self.face_templates_dir = os.path.join("resources", "face_templates")
-        
+
         # Create directories
         os.makedirs(self.face_templates_dir, exist_ok=True)
-        
+
+        # Enrolled templates are kept in memory instead of being re-read on every frame
+        self.face_gallery = FaceGallery(self.face_templates_dir, FaceTemplateStore(db))
+
+        # Optional visual check, only run on the best visual_top_k embedding candidates.
+        # Set visual_verifier to None to match on the embedding score alone.
+        self.visual_verifier = SSIMVerifier(self.face_gallery)
+        self.visual_weight = 0.3
+        self.visual_top_k = 3
+
+        # Detection settings: square detector input size, and optionally only searching the central kiosk zone
+        self.det_size = 640
+        self.roi_enabled = False
+        self.roi_fraction = 0.6
+        self.average_detection_ms = 0.0
+
         # Initialize ArcFace model
         self.face_app = None
         self.initialize_arcface_model()
@@ -753,7 +2098,21 @@ class FaceIdLogic:
         # Face tracking and smoothing
         self.prev_boxes = []
         self.smooth_factor = 0.7
+
+        # Tracking mode: full ArcFace detection every detection_interval frames or when the track drifts,
+        # template matching in between. A recognized track reuses its result for track_recognition_ttl seconds,
+        # but every full detection is still embedded and must score track_confirm_similarity against that employee.
+        self.tracking_enabled = True
+        self.detection_interval = 5
+        self.track_min_similarity = 0.6
+        self.track_template_width = 48
+        self.track_recognition_ttl = 2.0
+        self.track_confirm_similarity = 0.5
+        self.track = None
+        self.next_track_id = 0
         self.enrolled_faces = []
+        # (pose, embedding, face image) captured during a re-enrollment, until the Admin page writes them
+        self.staged_templates = []
         self.person_name = ""
         self.current_pose = "Unknown"
         self.enrollment_state()
@@ -774,6 +2133,7 @@ class FaceIdLogic:
         }
         self.enroll_timer_count = 0
         self.success_callback = success_callback
+        self.last_frame_result = None
 
     def initialize_arcface_model(self):
         """Initialize ArcFace model for face recognition"""
@@ -783,12 +2143,33 @@ class FaceIdLogic:
                 name='buffalo_sc',  # Explicitly specify the model
                 providers=['CPUExecutionProvider']
             )
-            self.face_app.prepare(ctx_id=0, det_size=(640, 640))
+            self.face_app.prepare(ctx_id=0, det_size=(self.det_size, self.det_size))
             print("ArcFace model initialized successfully")
         except Exception as e:
             print(f"Error initializing ArcFace model: {e}")
             self.face_app = None
 
+    def apply_detection_settings(self, det_size=640, roi_enabled=False):
+        """Change the detector input size and ROI mode; call while no frame is being processed"""
+        self.roi_enabled = bool(roi_enabled)
+        det_size = int(det_size or 640)
+        if det_size != self.det_size:
+            self.det_size = det_size
+            self.average_detection_ms = 0.0
+            if self.face_app is not None:
+                try:
+                    self.face_app.prepare(ctx_id=0, det_size=(det_size, det_size))
+                except Exception as e:
+                    print(f"Error changing detection size: {e}")
+        print(f"Face detection settings - size: {self.det_size}, ROI: {self.roi_enabled}")
+
+    def detection_roi(self, frame_shape):
+        """Central kiosk zone (x1, y1, x2, y2) searched when ROI mode is on"""
+        h, w = frame_shape[:2]
+        margin_x = int(w * (1 - self.roi_fraction) / 2)
+        margin_y = int(h * (1 - self.roi_fraction) / 2)
+        return margin_x, margin_y, w - margin_x, h - margin_y
+
     def get_camera_name(self, index=0):
         try:
             graph = FilterGraph()
@@ -819,6 +2200,8 @@ class FaceIdLogic:
         if self.face_mesh:
             self.face_mesh.close()
             self.face_mesh = None
+        # Also covers an enrollment that was cancelled before its last pose
+        self.face_gallery.save_ann_index()
 
     def detect_face_pose(self, frame):
         if self.face_mesh is None:
@@ -896,110 +2279,198 @@ class FaceIdLogic:
         return smooth_boxes
 
     def detect_face(self, frame):
+        return self.analyze_frame(frame).boxes
+
+    def analyze_frame(self, frame, recognize=True):
+        """Run pose estimation, ArcFace and matching once for a frame and return a FaceFrameResult"""
         results = []
         face_landmarks, pose_text = self.detect_face_pose(frame)
         self.current_pose = pose_text
+        frame_result = FaceFrameResult(pose_text, face_landmarks)
+        self.last_frame_result = frame_result
 
         if self.face_app is None:
-            return results
+            return frame_result
 
         try:
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            faces = self.face_app.get(rgb_frame)
-            h, w = frame.shape[:2]
-
-            if faces:  # Only process the first detected face
-                face = faces[0]
-                x1, y1, x2, y2 = [int(v) for v in face.bbox]
-                x = max(0, x1)
-                y = max(0, y1)
-                w_box = min(w - x, x2 - x1)
-                h_box = min(h - y, y2 - y1)
+            # Enrollment needs a fresh box and embedding on every frame, so only recognition is tracked
+            use_tracking = recognize and self.tracking_enabled
+            track = self.track if use_tracking else None
+            box = None
+            cached = False
+
+            if track is not None and track.frames_since_detection + 1 < self.detection_interval:
+                box = self.track_face(frame, track)
+                if box is None:
+                    # Drifted: detect again and don't trust the cached recognition
+                    track.recognized_at = 0.0
+
+            if box is not None:
+                track.box = box
+                track.frames_since_detection += 1
+                frame_result.tracked = True
+            else:
+                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                faces = self.detect_faces(rgb_frame)
+                h, w = frame.shape[:2]
+
+                if faces:  # Only process the first detected face
+                    face = faces[0]
+                    frame_result.face = face
+                    x1, y1, x2, y2 = [int(v) for v in face.bbox]
+                    x = max(0, x1)
+                    y = max(0, y1)
+                    w_box = min(w - x, x2 - x1)
+                    h_box = min(h - y, y2 - y1)
+                    box = (x, y, w_box, h_box)
+                    track = self.update_track(frame, box) if use_tracking else None
+                    frame_result.embedding = self.embed_face(rgb_frame, face)
+
+                    # A recognized track keeps its result until it expires, and only while the fresh embedding still
+                    # matches that employee: someone else stepping into the same spot gets a full match of their own
+                    cached = (track is not None and bool(track.employee_id)
+                              and time.time() - track.recognized_at <= self.track_recognition_ttl
+                              and self.face_gallery.employee_score(frame_result.embedding, track.employee_id) >= self.track_confirm_similarity)
+                    if cached:
+                        track.embedding = frame_result.embedding
+                    else:
+                        if track is not None:
+                            # Never carry the previous identity over to a face that no longer confirms it
+                            track.employee_id = ""
+                        # Enrollment only needs the box and embedding, not a match against the gallery
+                        if recognize and w_box > 0 and h_box > 0:
+                            face_roi = frame[y:y+h_box, x:x+w_box]
+                            if face_roi.size > 0:
+                                employee_id, score, embedding_score = self.match_face(face_roi, frame_result.embedding)
+                                frame_result.employee_id = employee_id
+                                frame_result.score = score
+                                frame_result.embedding_score = embedding_score
+                                if track is not None:
+                                    track.employee_id = employee_id
+                                    track.score = score
+                                    track.embedding_score = embedding_score
+                                    track.embedding = frame_result.embedding
+                                    track.recognized_at = time.time()
+                else:
+                    self.track = None
 
-                name = ""
-                confidence = 0
+            if track is not None and box is not None:
+                frame_result.track_id = track.track_id
+                if frame_result.tracked or cached:
+                    frame_result.employee_id = track.employee_id
+                    frame_result.score = track.score
+                    frame_result.embedding_score = track.embedding_score
+                    frame_result.embedding = track.embedding
 
-                if w_box > 0 and h_box > 0:
-                    face_roi = frame[y:y+h_box, x:x+w_box]
-                    if face_roi.size > 0:
-                        # Get all enrolled employee IDs
-                        enrolled_employees = set()
-                        for f in os.listdir(self.face_templates_dir):
-                            if f.endswith('.npy') or f.lower().endswith('.jpg'):
-                                emp_id = f.split('_')[0]
-                                enrolled_employees.add(emp_id)
-
-                        best_score = 0.0
-                        best_employee = ""
-                        current_embedding = face.embedding
-                        input_embedding = current_embedding.reshape(1, -1)
-
-                        for emp_id in enrolled_employees:
-                            embedding_score = 0.0
-                            visual_score = 0.0
-
-                            embedding_files = [f for f in os.listdir(self.face_templates_dir)
-                                            if f.startswith(f"{emp_id}_") and f.endswith('.npy')]
-
-                            if embedding_files:
-                                best_embedding_score = 0.0
-                                for emb_file in embedding_files:
-                                    try:
-                                        stored_embedding = np.load(os.path.join(self.face_templates_dir, emb_file), allow_pickle=True)
-                                        from sklearn.metrics.pairwise import cosine_similarity
-                                        score = cosine_similarity(input_embedding, stored_embedding.reshape(1, -1))[0][0]
-                                        best_embedding_score = max(best_embedding_score, score)
-                                    except Exception as e:
-                                        print(f"Error loading embedding {emb_file}: {e}")
-                                embedding_score = best_embedding_score
-
-                            image_files = [f for f in os.listdir(self.face_templates_dir)
-                                        if f.startswith(f"{emp_id}_") and f.lower().endswith('.jpg')]
-
-                            if image_files and face_roi.size > 0:
-                                best_visual_score = 0.0
-                                face_resized = cv2.resize(face_roi, (160, 160))
-                                for img_file in image_files:
-                                    try:
-                                        stored_img = cv2.imread(os.path.join(self.face_templates_dir, img_file))
-                                        if stored_img is not None:
-                                            gray_current = cv2.cvtColor(face_resized, cv2.COLOR_BGR2GRAY)
-                                            gray_stored = cv2.cvtColor(stored_img, cv2.COLOR_BGR2GRAY)
-                                            try:
-                                                from skimage.metrics import structural_similarity as ssim
-                                                visual_score_single = ssim(gray_current, gray_stored)
-                                            except ImportError:
-                                                result = cv2.matchTemplate(gray_current, gray_stored, cv2.TM_CCOEFF_NORMED)
-                                                visual_score_single = np.max(result)
-                                            best_visual_score = max(best_visual_score, visual_score_single)
-                                    except Exception as e:
-                                        print(f"Error loading image {img_file}: {e}")
-                                visual_score = best_visual_score
-
-                            combined_score = (embedding_score * 1.0) + (visual_score * 0.3)
-                            final_score = combined_score
-
-                            print(f"Employee {emp_id}: final_score={final_score:.3f}, embedding={embedding_score:.3f}, visual={visual_score:.3f}")
-
-                            if final_score > best_score and final_score > 0.60:
-                                best_score = final_score
-                                best_employee = emp_id
-
-                        if best_employee and best_score >= 0.65:
-                            name = best_employee
-                            confidence = best_score * 100
-                        else:
-                            best_employee = None
-                            best_score = 0
-
-                results.append((x, y, w_box, h_box, name))
-                # Only process the first face
-                return self.smooth_bounding_boxes(results)
+            if box is not None:
+                results.append(box + (frame_result.employee_id,))
 
         except Exception as e:
             print(f"ArcFace detection error: {str(e)}")
 
-        return self.smooth_bounding_boxes(results)
+        # Only the first face is processed
+        frame_result.boxes = self.smooth_bounding_boxes(results)
+        return frame_result
+
+    def detect_faces(self, rgb_frame):
+        """ArcFace detection only; embeddings are computed by embed_face when they are needed"""
+        # The detector resizes its input to det_size itself, so boxes and keypoints come back in frame
+        # coordinates and embed_face aligns the crop from the full-resolution frame
+        offset_x = offset_y = 0
+        search = rgb_frame
+        if self.roi_enabled:
+            offset_x, offset_y, x2, y2 = self.detection_roi(rgb_frame.shape)
+            search = rgb_frame[offset_y:y2, offset_x:x2]
+
+        start = time.perf_counter()
+        bboxes, kpss = self.face_app.det_model.detect(search, max_num=0, metric='default')
+        detection_ms = (time.perf_counter() - start) * 1000
+        self.average_detection_ms += (detection_ms - self.average_detection_ms) * 0.1
+
+        if offset_x or offset_y:
+            bboxes[:, 0:4] += (offset_x, offset_y, offset_x, offset_y)
+            if kpss is not None:
+                kpss += (offset_x, offset_y)
+        return [Face(bbox=bboxes[i, 0:4], kps=kpss[i] if kpss is not None else None, det_score=bboxes[i, 4])
+                for i in range(bboxes.shape[0])]
+
+    def embed_face(self, rgb_frame, face):
+        """Run the recognition model on a detected face (same as the second half of FaceAnalysis.get)"""
+        for taskname, model in self.face_app.models.items():
+            if taskname != 'detection':
+                model.get(rgb_frame, face)
+        return face.embedding
+
+    def match_face(self, face_roi, embedding):
+        """Match an embedding and its face crop against the gallery, returns (employee_id, score, embedding_score)"""
+        verifier = self.visual_verifier
+        candidates = self.face_gallery.top_k(embedding, k=self.visual_top_k if verifier else 1)
+        features = verifier.prepare(face_roi) if verifier and candidates else None
+
+        best_score = 0.0
+        best_employee = ""
+        best_embedding_score = 0.0
+
+        for emp_id, embedding_score in candidates:
+            embedding_score = max(0.0, embedding_score)
+            visual_score = verifier.score(features, emp_id) if features is not None else 0.0
+
+            combined_score = (embedding_score * 1.0) + (visual_score * self.visual_weight)
+            final_score = combined_score
+
+            print(f"Employee {emp_id}: final_score={final_score:.3f}, embedding={embedding_score:.3f}, visual={visual_score:.3f}")
+
+            if final_score > best_score and final_score > 0.60:
+                best_score = final_score
+                best_employee = emp_id
+                best_embedding_score = embedding_score
+
+        if best_employee and best_score >= 0.65:
+            return best_employee, best_score, best_embedding_score
+        return "", 0.0, 0.0
+
+    def update_track(self, frame, box):
+        """Continue the current track with a detected box (same centroid rule as smooth_bounding_boxes) or start a new one"""
+        x, y, w_box, h_box = box
+        track = self.track
+        if track is not None:
+            px, py, pw, ph = track.box
+            dist = (x + w_box/2 - px - pw/2)**2 + (y + h_box/2 - py - ph/2)**2
+            if dist >= 10000:
+                track = None
+        if track is None:
+            self.next_track_id += 1
+            track = FaceTrack(self.next_track_id, box)
+
+        track.box = box
+        track.frames_since_detection = 0
+        track.template = None
+        if w_box > 0 and h_box > 0:
+            # Small grayscale template keeps matchTemplate cheap
+            track.scale = min(1.0, self.track_template_width / w_box)
+            gray = cv2.cvtColor(frame[y:y+h_box, x:x+w_box], cv2.COLOR_BGR2GRAY)
+            track.template = cv2.resize(gray, None, fx=track.scale, fy=track.scale, interpolation=cv2.INTER_AREA)
+        self.track = track
+        return track
+
+    def track_face(self, frame, track):
+        """Find the track's template near its last box; returns the new box, or None when it has drifted"""
+        if track.template is None:
+            return None
+        x, y, w_box, h_box = track.box
+        h, w = frame.shape[:2]
+        sx1, sy1 = max(0, x - w_box // 2), max(0, y - h_box // 2)
+        sx2, sy2 = min(w, x + w_box + w_box // 2), min(h, y + h_box + h_box // 2)
+        search = cv2.cvtColor(frame[sy1:sy2, sx1:sx2], cv2.COLOR_BGR2GRAY)
+        search = cv2.resize(search, None, fx=track.scale, fy=track.scale, interpolation=cv2.INTER_AREA)
+        th, tw = track.template.shape
+        if search.shape[0] < th or search.shape[1] < tw:
+            return None
+        scores = cv2.matchTemplate(search, track.template, cv2.TM_CCOEFF_NORMED)
+        _, max_score, _, max_loc = cv2.minMaxLoc(scores)
+        if max_score < self.track_min_similarity:
+            return None
+        return (sx1 + int(max_loc[0] / track.scale), sy1 + int(max_loc[1] / track.scale), w_box, h_box)
 
     def update_frame(self):
         if not self.cap or not self.cap.isOpened():
@@ -1007,8 +2478,17 @@ class FaceIdLogic:
         ret, frame = self.cap.read()
         if not ret:
             return None, []
-        
-        faces = self.detect_face(frame)
+        frame, faces, frame_result = self.process_frame(frame)
+        return frame, faces
+
+    def process_frame(self, frame):
+        """Recognize faces in a captured frame and draw the boxes and confidence overlay on it"""
+        frame_result = self.analyze_frame(frame)
+        faces = frame_result.boxes
+        if self.roi_enabled:
+            # Show the zone where faces are searched
+            x1, y1, x2, y2 = self.detection_roi(frame.shape)
+            cv2.rectangle(frame, (x1, y1), (x2, y2), (200, 200, 200), 1, cv2.LINE_AA)
         for (x, y, w_box, h_box, name) in faces:
             # Draw bounding box - Green for recognized, Red for unrecognized
             if name and name.strip():  # Make sure name is not empty or just whitespace
@@ -1019,46 +2499,15 @@ class FaceIdLogic:
             cv2.rectangle(frame, (x, y), (x + w_box, y + h_box), color, 2, cv2.LINE_AA)
             
             if name:
-                # Calculate confidence for display - simplified approach
+                # Confidence comes from this frame's match; a name carried over by smoothing falls back to the default
                 confidence = 75  # Default confidence value
-                
-                # Try to get a more accurate confidence from the detection results
-                face_roi = frame[y:y+h_box, x:x+w_box] if h_box > 0 and w_box > 0 else None
-                if face_roi is not None and face_roi.size > 0:
-                    # Get all enrolled employee IDs
-                    enrolled_employees = set()
-                    for f in os.listdir(self.face_templates_dir):
-                        if f.endswith('.npy') or f.lower().endswith('.jpg'):
-                            emp_id = f.split('_')[0]
-                            enrolled_employees.add(emp_id)
-                    
-                    # Use the embedding from ArcFace directly for confidence calculation
-                    try:
-                        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                        arcface_faces = self.face_app.get(rgb_frame)
-                        if arcface_faces:
-                            current_embedding = arcface_faces[0].embedding
-                            input_embedding = current_embedding.reshape(1, -1)
-                            
-                            best_score = 0.0
-                            # Check stored embeddings for this employee
-                            embedding_files = [f for f in os.listdir(self.face_templates_dir) 
-                                            if f.startswith(f"{name}_") and f.endswith('.npy')]
-                            
-                            for emb_file in embedding_files:
-                                try:
-                                    stored_embedding = np.load(os.path.join(self.face_templates_dir, emb_file), allow_pickle=True)
-                                    from sklearn.metrics.pairwise import cosine_similarity
-                                    score = cosine_similarity(input_embedding, stored_embedding.reshape(1, -1))[0][0]
-                                    best_score = max(best_score, score)
-                                except Exception as e:
-                                    print(f"Error calculating confidence: {e}")
-                            
-                            if best_score > 0:
-                                confidence = int(best_score * 100)
-                    except Exception as e:
-                        print(f"Error in confidence calculation: {e}")
-                
+                if frame_result.employee_id == name and frame_result.embedding_score > 0:
+                    confidence = frame_result.confidence
+                elif frame_result.embedding is not None:
+                    best_score = self.face_gallery.employee_score(frame_result.embedding, name)
+                    if best_score > 0:
+                        confidence = int(best_score * 100)
+
                 # Display name and confidence
                 text = f"{name} ({confidence}%)"
                 text_size = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, 0.7, 2)[0]
@@ -1067,7 +2516,7 @@ class FaceIdLogic:
                 cv2.putText(frame, text, (x, y - 10), 
                             cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2, cv2.LINE_AA)
         
-        return frame, faces
+        return frame, faces, frame_result
 
     def enrollment_state(self):
         self.enroll_active = False
@@ -1088,6 +2537,7 @@ class FaceIdLogic:
         self.person_name = person_name.strip()
         self.enroll_index = 0
         self.enroll_captured = 0
+        self.staged_templates = []
         self.enroll_active = True
 
     def enroll_update_frame(self, webcam_enrollment_note_lbl=None):
@@ -1098,9 +2548,10 @@ class FaceIdLogic:
         if not ret:
             return None, []
         
-        face_landmarks, pose_text = self.detect_face_pose(frame)
-        faces_data = self.detect_face(frame)
-        
+        # One pose + ArcFace pass per frame; the embedding is reused if this frame is captured
+        frame_result = self.analyze_frame(frame, recognize=False)
+        faces_data = frame_result.boxes
+
         if len(faces_data) > 0:
             x, y, w, h_box = faces_data[0][:4]
             cv2.rectangle(frame, (x, y), (x + w, y + h_box), (0, 255, 0), 2)
@@ -1110,10 +2561,10 @@ class FaceIdLogic:
                 cv2.putText(frame, f"Required: {required_pose}", (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
                 if self.current_pose == required_pose and self.capture_ready:
                     self.capture_ready = False
-                    self.capture_enroll_image(frame, faces_data[0], webcam_enrollment_note_lbl)
+                    self.capture_enroll_image(frame, faces_data[0], webcam_enrollment_note_lbl, frame_result.embedding)
         return frame, faces_data
 
-    def capture_enroll_image(self, frame, face=None, webcam_enrollment_note_lbl=None):
+    def capture_enroll_image(self, frame, face=None, webcam_enrollment_note_lbl=None, embedding=None):
         if not self.enroll_active or self.enroll_index >= self.enroll_max:
             self.finish_enrollment()
             return
@@ -1141,6 +2592,8 @@ class FaceIdLogic:
             arcface_face = faces[0]
             x1, y1, x2, y2 = [int(v) for v in arcface_face.bbox]
             face_img = frame[y1:y2, x1:x2]
+            if embedding is None:
+                embedding = arcface_face.embedding
 
         if face_img.size == 0:
             print("Invalid face crop, skipping...")
@@ -1150,54 +2603,31 @@ class FaceIdLogic:
         face_resized = cv2.resize(face_img, (160, 160))
         self.enrolled_faces.append(face_resized)
 
-        # Get face embedding using ArcFace
-        if face is None or len(face) < 4:
-            # Re-detect face to get embedding
+        # Get face embedding using ArcFace, unless the caller already has it for this frame
+        if embedding is None:
             rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
             faces = self.face_app.get(rgb_frame)
             if len(faces) == 0:
                 print("No face detected for embedding extraction")
                 return
-            arcface_face = faces[0]
-        else:
-            # Use the original frame to get embedding from the detected region
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            faces = self.face_app.get(rgb_frame)
-            if len(faces) == 0:
-                print("No face detected for embedding extraction")
-                return
-            arcface_face = faces[0]
-
-        # Save both embedding and image in face_templates directory with matching names
-        base_filename = f"{self.person_name}_{pose_name}"
-
-        # 1. Save face embedding
-        embedding = arcface_face.embedding
+            embedding = faces[0].embedding
 
         # --- DUPLICATE CHECK: Prevent enrolling a face already enrolled by another employee ---
-        for fname in os.listdir(self.face_templates_dir):
-            if fname.endswith('.npy'):
-                emp_id = fname.split('_')[0]
-                if emp_id == self.person_name:
-                    continue  # Skip current employee
-                emb_path = os.path.join(self.face_templates_dir, fname)
-                try:
-                    existing_emb = np.load(emb_path, allow_pickle=True)
-                    score = cosine_similarity(embedding.reshape(1, -1), existing_emb.reshape(1, -1))[0][0]
-                    if score > 0.65:  # Threshold, adjust as needed
-                        print(f"Duplicate face detected with employee {emp_id}, score={score:.3f}")
-                        webcam_enrollment_note_lbl.setText("Duplicate face detected. This face is already enrolled for another employee.")
-                        return  # Abort saving
-                except Exception as e:
-                    print(f"Error checking duplicate face: {e}")
+        # Re-enrollment captures are saved as "temp_{employee_id}", which still belong to that employee
+        owner_id = self.person_name[len("temp_"):] if self.person_name.startswith("temp_") else self.person_name
+        for emp_id, score in self.face_gallery.top_k(embedding, k=1, exclude={owner_id}):
+            if score > 0.65:  # Threshold, adjust as needed
+                print(f"Duplicate face detected with employee {emp_id}, score={score:.3f}")
+                if webcam_enrollment_note_lbl:
+                    webcam_enrollment_note_lbl.setText("Duplicate face detected. This face is already enrolled for another employee.")
+                return  # Abort saving
         # --- END DUPLICATE CHECK ---
 
-        embedding_path = os.path.join(self.face_templates_dir, f"{base_filename}.npy")
-        np.save(embedding_path, embedding)
-
-        # 2. Save face image in face_templates directory
-        image_path = os.path.join(self.face_templates_dir, f"{base_filename}.jpg")
-        cv2.imwrite(image_path, face_resized)
+        # Re-enrollment captures are held back and written with the rest of the re-enrollment in one transaction
+        if self.person_name.startswith("temp_"):
+            self.staged_templates.append((pose_name, embedding, face_resized))
+        else:
+            self.face_gallery.add_template(self.person_name, pose_name, embedding, face_resized)
 
         self.enroll_captured += 1
         if self.success_callback:
@@ -1209,6 +2639,131 @@ class FaceIdLogic:
 
     def finish_enrollment(self):
         self.enroll_active = False
+        self.face_gallery.save_ann_index()
+
+class FaceIdSignals(QObject):
+    frame_ready = Signal(QImage, object)
+    stats_ready = Signal(dict)  # FaceRecognitionPipeline.stats(), every stats_interval seconds and on stop
+
+class FaceRecognitionPipeline:
+    """
+    Producer/consumer camera pipeline for the kiosk.
+    The capture thread keeps only the latest frame; the inference thread recognizes it at its own rate
+    and emits a ready-to-draw QImage with its FaceFrameResult, so the GUI thread never runs the models.
+    """
+    def __init__(self, faceid_logic, signals, verify_callback=None, stats_interval=60):
+        self.faceid_logic = faceid_logic
+        self.signals = signals
+        self.stats_interval = stats_interval
+        self.stats_emitted_at = 0.0
+        # Optional extra check run on the inference thread, returns the employee id to log or None
+        self.verify_callback = verify_callback
+        self.condition = threading.Condition()
+        self.running = False
+        self.latest_frame = None
+        self.capture_thread = None
+        self.inference_thread = None
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.frames_captured = 0
+        self.frames_processed = 0
+        self.frames_dropped = 0
+        self.last_latency_ms = 0.0
+        self.average_latency_ms = 0.0
+
+    def stats(self):
+        return {
+            "captured": self.frames_captured,
+            "processed": self.frames_processed,
+            "dropped": self.frames_dropped,
+            "last_latency_ms": round(self.last_latency_ms, 1),
+            "average_latency_ms": round(self.average_latency_ms, 1),
+            "average_detection_ms": round(self.faceid_logic.average_detection_ms, 1),
+            "det_size": self.faceid_logic.det_size,
+            "roi": self.faceid_logic.roi_enabled,
+        }
+
+    def is_running(self):
+        return self.running
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.latest_frame = None
+        self.reset_stats()
+        self.stats_emitted_at = time.monotonic()
+        self.capture_thread = threading.Thread(target=self._capture_loop, daemon=True)
+        self.inference_thread = threading.Thread(target=self._inference_loop, daemon=True)
+        self.capture_thread.start()
+        self.inference_thread.start()
+
+    def stop(self):
+        """Stop both threads; must be called before the camera or models are released"""
+        if not self.running:
+            return
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        for thread in (self.capture_thread, self.inference_thread):
+            if thread and thread is not threading.current_thread():
+                thread.join(timeout=2)
+        self.capture_thread = None
+        self.inference_thread = None
+        self.signals.stats_ready.emit(self.stats())
+
+    def _capture_loop(self):
+        while self.running:
+            cap = self.faceid_logic.cap
+            if not cap or not cap.isOpened():
+                time.sleep(0.05)
+                continue
+            ret, frame = cap.read()
+            if not ret:
+                time.sleep(0.01)
+                continue
+            with self.condition:
+                self.frames_captured += 1
+                # An unprocessed frame is replaced by the newer one
+                if self.latest_frame is not None:
+                    self.frames_dropped += 1
+                self.latest_frame = (frame, time.perf_counter())
+                self.condition.notify()
+
+    def _inference_loop(self):
+        while True:
+            with self.condition:
+                while self.running and self.latest_frame is None:
+                    self.condition.wait(timeout=0.5)
+                if not self.running:
+                    return
+                frame, captured_at = self.latest_frame
+                self.latest_frame = None
+
+            try:
+                frame, faces, frame_result = self.faceid_logic.process_frame(frame)
+                if self.verify_callback and faces:
+                    frame_result.verified_employee = self.verify_callback(frame, faces) or ""
+
+                rgb_image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                h, w, ch = rgb_image.shape
+                # copy() so the image owns its buffer once it crosses to the GUI thread
+                qt_image = QImage(rgb_image.data, w, h, ch * w, QImage.Format_RGB888).copy()
+
+                frame_result.latency_ms = (time.perf_counter() - captured_at) * 1000
+                self.frames_processed += 1
+                self.last_latency_ms = frame_result.latency_ms
+                self.average_latency_ms += (frame_result.latency_ms - self.average_latency_ms) / min(self.frames_processed, 30)
+            except Exception as e:
+                print(f"FaceID pipeline error: {e}")
+                continue
+
+            if self.running:
+                self.signals.frame_ready.emit(qt_image, frame_result)
+                if time.monotonic() - self.stats_emitted_at >= self.stats_interval:
+                    self.stats_emitted_at = time.monotonic()
+                    self.signals.stats_ready.emit(self.stats())
             
 class EALS:
     def __init__(self):
@@ -1364,6 +2919,147 @@ class Feedback:
         toast.setPosition(ToastPosition.TOP_RIGHT)  
         toast.show()  
 
+class DebouncedSearch:
+    """Calls callback(text) once typing in a search box pauses for delay_ms, instead of on every keystroke"""
+    def __init__(self, search_box, callback, delay_ms=250):
+        self.search_box = search_box
+        self.callback = callback
+        self.timer = QTimer(search_box)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(delay_ms)
+        self.timer.timeout.connect(self.run)
+        search_box.textChanged.connect(lambda text: self.timer.start())
+
+    def run(self):
+        self.callback(self.search_box.text())
+
+class TableFilter:
+    """Debounced row filter for a QTableWidget; each row's text is read once per table change, not per keystroke"""
+    def __init__(self, table, search_box, skip_columns=(), delay_ms=250):
+        self.table = table
+        self.skip_columns = skip_columns
+        self.row_texts = None
+        self.search = DebouncedSearch(search_box, self.apply, delay_ms)
+        model = table.model()
+        for signal in (model.rowsInserted, model.rowsRemoved, model.dataChanged, model.modelReset, model.layoutChanged):
+            signal.connect(self.table_changed)
+
+    def table_changed(self, *args):
+        self.row_texts = None
+        if self.search.search_box.text():
+            self.search.timer.start()
+
+    def apply(self, text):
+        search_text = text.lower()
+        if self.row_texts is None:
+            columns = [col for col in range(self.table.columnCount()) if col not in self.skip_columns]
+            self.row_texts = []
+            for row in range(self.table.rowCount()):
+                cells = (self.table.item(row, col) for col in columns)
+                self.row_texts.append("\n".join(item.text().lower() for item in cells if item))
+        for row, row_text in enumerate(self.row_texts):
+            hidden = search_text not in row_text
+            if self.table.isRowHidden(row) != hidden:
+                self.table.setRowHidden(row, hidden)
+
+class AttendanceLogModel(QAbstractTableModel):
+    """Attendance logs for a QTableView, read page_size rows at a time (keyset pagination) as the view scrolls"""
+    HEADERS = ("Account ID:", "Remarks:", "Date:", "Time:")
+    COLUMNS = ("employee_id", "remarks", "date", "time")
+    SORT_OPTIONS = {"By Account ID:": 0, "By Remarks:": 1, "By Date:": 2, "By Time:": 3}
+
+    def __init__(self, db, exclude_hr=False, page_size=200, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.exclude_hr = exclude_hr  # Only logs of non-HR employees
+        self.page_size = page_size
+        self.search_text = ""
+        cursor = db.execute_query("SELECT 1 FROM sqlite_master WHERE name = 'attendance_logs_fts'")
+        self.use_fts = bool(cursor and cursor.fetchone())
+        self.sort_column = None  # None: newest first by log_id
+        self.sort_order = Qt.AscendingOrder
+        self.rows = []  # (log_id, employee_id, remarks, date, time)
+        self.exhausted = False
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and index.isValid():
+            return self.rows[index.row()][index.column() + 1]
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def page_query(self):
+        """SQL and parameters for the page after the last loaded row"""
+        conditions, params = [], []
+        if self.exclude_hr:
+            # Correlated, so the planner keeps walking the sort index instead of driving the query from Employee
+            conditions.append("EXISTS (SELECT 1 FROM Employee e WHERE e.employee_id = attendance_logs.employee_id AND e.is_hr = 0)")
+        if self.search_text and self.use_fts and len(self.search_text) >= 3:
+            # Trigram index: a quoted phrase matches as a case-insensitive substring of a column
+            conditions.append("log_id IN (SELECT rowid FROM attendance_logs_fts WHERE attendance_logs_fts MATCH ?)")
+            params.append('"' + self.search_text.replace('"', '""') + '"')
+        elif self.search_text:
+            pattern = "%" + self.search_text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            conditions.append("(" + " OR ".join(f"{column} LIKE ? ESCAPE '\\'" for column in self.COLUMNS) + ")")
+            params.extend([pattern] * len(self.COLUMNS))
+
+        if self.sort_column is None:
+            if self.rows:
+                conditions.append("log_id < ?")
+                params.append(self.rows[-1][0])
+            order = "log_id DESC"
+        else:
+            column = self.COLUMNS[self.sort_column]
+            direction, comparison = ("ASC", ">") if self.sort_order == Qt.AscendingOrder else ("DESC", "<")
+            if self.rows:
+                conditions.append(f"({column}, log_id) {comparison} (?, ?)")
+                params.extend([self.rows[-1][self.sort_column + 1], self.rows[-1][0]])
+            order = f"{column} {direction}, log_id {direction}"
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        query = f"SELECT log_id, employee_id, remarks, date, time FROM attendance_logs {where} ORDER BY {order} LIMIT ?"
+        return query, params + [self.page_size]
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self.exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self.exhausted:
+            return
+        cursor = self.db.execute_query(*self.page_query())
+        page = cursor.fetchall() if cursor else []
+        self.exhausted = len(page) < self.page_size
+        if page:
+            self.beginInsertRows(QModelIndex(), len(self.rows), len(self.rows) + len(page) - 1)
+            self.rows.extend(page)
+            self.endInsertRows()
+
+    def reload(self):
+        """Drop the loaded pages and read the first page again"""
+        self.beginResetModel()
+        self.rows = []
+        self.exhausted = False
+        self.endResetModel()
+        self.fetchMore()
+
+    def set_search_text(self, text):
+        self.search_text = text.strip()
+        self.reload()
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.sort_column = column
+        self.sort_order = order
+        self.reload()
+
 class HR:
     def __init__(self, db, hr_data):
         self.db = db
@@ -1377,17 +3073,19 @@ class HR:
         self.hr_ui.hr_employee_sc_pages.setCurrentWidget(self.hr_ui.hr_employee_dashboard_page)
         self.hr_ui.hr_employee_tbl.setSelectionBehavior(QAbstractItemView.SelectRows)
         self.hr_ui.hr_employee_tbl.setSelectionMode(QAbstractItemView.SingleSelection)
-        self.hr_ui.hr_employee_search_box.textChanged.connect(self.filter_hr_employee_table)
+        self.hr_employee_filter = TableFilter(self.hr_ui.hr_employee_tbl, self.hr_ui.hr_employee_search_box)
         self.hr_ui.hr_employee_sort_box.currentIndexChanged.connect(self.sort_hr_employee_table)
         self.hr_ui.hr_employee_view_back.clicked.connect(self.goto_hr_dashboard)
         self.hr_ui.hr_logout_btn.clicked.connect(self.handle_logout)
         self.hr_ui.hr_employee_view_btn.clicked.connect(self.goto_hr_employee_view)
         self.hr_ui.send_feedback_btn.clicked.connect(self.show_feedback_form)
 
+        self.hr_attendance_logs_model = AttendanceLogModel(db, exclude_hr=True, parent=self.hr_ui.hr_attedance_logs_tbl)
+        self.hr_ui.hr_attedance_logs_tbl.setModel(self.hr_attendance_logs_model)
         self.hr_ui.hr_attedance_logs_tbl.setSelectionBehavior(QAbstractItemView.SelectRows)
         self.hr_ui.hr_attedance_logs_tbl.setSelectionMode(QAbstractItemView.SingleSelection)
 
-        self.hr_ui.hr_attedance_logs_search.textChanged.connect(self.filter_hr_attendance_logs_table)
+        self.hr_attendance_logs_search = DebouncedSearch(self.hr_ui.hr_attedance_logs_search, self.hr_attendance_logs_model.set_search_text)
         self.hr_ui.hr_attedance_logs_sort.currentIndexChanged.connect(self.sort_hr_attendance_logs_table)
 
         self.hr_ui.hr_employee_logs_tbl.setSelectionBehavior(QAbstractItemView.SelectRows)
@@ -1419,6 +3117,11 @@ class HR:
         if hasattr(self.hr_ui, "chart_layout3") and self.pie_chart_view:
             self.hr_ui.chart_layout3.addWidget(self.pie_chart_view, 0, 0)
 
+        # Live KPIs: the shared DashboardMetrics connects first, so these slots redraw from its updated cache
+        DashboardMetrics.shared(self.db)
+        APP_EVENTS.attendance_logged.connect(self.on_attendance_logged)
+        APP_EVENTS.employee_changed.connect(self.on_employee_changed)
+
         self.top_present_chart_view = None
         self.setup_top_present_bar_chart()
         if hasattr(self.hr_ui, "chart_layout4") and self.top_present_chart_view:
@@ -1524,10 +3227,10 @@ class HR:
         try:
             cursor = self.db.execute_query(
                 """
-                SELECT date(created_at) as log_date, present_count, absent_count
-                FROM system_logs
-                WHERE date(created_at) >= date('now', '-6 days')
-                ORDER BY date(created_at)
+                SELECT date, present_count, absent_count
+                FROM daily_attendance_summary
+                WHERE date >= date('now', '-6 days')
+                ORDER BY date
                 """
             )
             data = cursor.fetchall() if cursor else []
@@ -1631,10 +3334,10 @@ class HR:
         try:
             cursor = self.db.execute_query(
                 """
-                SELECT date(created_at) as log_date, average_work_hours
-                FROM system_logs
-                WHERE date(created_at) >= date('now', '-6 days')
-                ORDER BY date(created_at)
+                SELECT date, CASE WHEN worked_count > 0 THEN ROUND(total_work_hours / worked_count, 2) ELSE 0 END
+                FROM daily_attendance_summary
+                WHERE date >= date('now', '-6 days')
+                ORDER BY date
                 """
             )
             data = cursor.fetchall() if cursor else []
@@ -1694,18 +3397,9 @@ class HR:
     def update_attendance_pie_chart(self):
         self.pie_series.clear()
         try:
-            today_date = datetime.now().strftime("%Y-%m-%d")
-            cursor = self.db.execute_query(
-                "SELECT COUNT(DISTINCT employee_id) FROM attendance_logs WHERE date = ? AND employee_id IN (SELECT employee_id FROM Employee WHERE is_hr = 0)",
-                (today_date,)
-            )
-            present = cursor.fetchone()[0] if cursor else 0
-
-            cursor = self.db.execute_query(
-                "SELECT COUNT(*) FROM Employee WHERE is_hr = 0 AND status = 'Active' AND employee_id NOT IN (SELECT DISTINCT employee_id FROM attendance_logs WHERE date = ?)",
-                (today_date,)
-            )
-            absent = cursor.fetchone()[0] if cursor else 0
+            metrics = DashboardMetrics.shared(self.db).get()
+            present = metrics["logged_employees"]
+            absent = metrics["absent_employees"]
 
             total = present + absent
             if total == 0:
@@ -1841,126 +3535,32 @@ class HR:
         self.feedback = Feedback(self.db, self.hr_data)
         self.feedback.feedback_ui.show()
         
-    def update_hr_dashboard_labels(self):
-        try:
-            cursor = self.db.execute_query("SELECT COUNT(*) FROM Employee")
-            total_employees = cursor.fetchone()[0] if cursor else 0
-
-            cursor = self.db.execute_query("SELECT COUNT(*) FROM Employee WHERE status = 'Active'")
-            active_employees = cursor.fetchone()[0] if cursor else 0
-
-            today_date = datetime.now().strftime("%Y-%m-%d")
-            cursor = self.db.execute_query(
-                "SELECT COUNT(DISTINCT employee_id) FROM attendance_logs "
-                "WHERE date = ? AND employee_id IN (SELECT employee_id FROM Employee WHERE is_hr = 0)", 
-                (today_date,)
-            )
-            logged_employees = cursor.fetchone()[0] if cursor else 0
-
-            cursor = self.db.execute_query(
-                "SELECT COUNT(DISTINCT employee_id) FROM attendance_logs "
-                "WHERE date = ? AND is_late = 1 AND employee_id IN (SELECT employee_id FROM Employee WHERE is_hr = 0)", 
-                (today_date,)
-            )
-            late_employees = cursor.fetchone()[0] if cursor else 0
-
-            cursor = self.db.execute_query(
-                "SELECT COUNT(*) FROM Employee WHERE is_hr = 0 AND status = 'Active' AND employee_id NOT IN ("
-                "SELECT DISTINCT employee_id FROM attendance_logs WHERE date = ?)", 
-                (today_date,)
-            )
-            absent_employees = cursor.fetchone()[0] if cursor else 0
-
-            # --- NEW: Shift and overtime labels (copied from Admin) ---
-            # Morning shift
-            cursor = self.db.execute_query(
-                "SELECT COUNT(*) FROM Employee WHERE is_hr = 0 AND status = 'Active' AND schedule = '6am to 2pm'"
-            )
-            morning_total = cursor.fetchone()[0] if cursor else 0
-            cursor = self.db.execute_query(
-                "SELECT COUNT(DISTINCT e.employee_id) FROM Employee e "
-                "JOIN attendance_logs a ON e.employee_id = a.employee_id "
-                "WHERE e.is_hr = 0 AND e.status = 'Active' AND e.schedule = '6am to 2pm' AND a.date = ? AND a.remarks = 'Clock In'",
-                (today_date,)
-            )
-            morning_present = cursor.fetchone()[0] if cursor else 0
-
-            # Afternoon shift
-            cursor = self.db.execute_query(
-                "SELECT COUNT(*) FROM Employee WHERE is_hr = 0 AND status = 'Active' AND schedule = '2pm to 10pm'"
-            )
-            afternoon_total = cursor.fetchone()[0] if cursor else 0
-            cursor = self.db.execute_query(
-                "SELECT COUNT(DISTINCT e.employee_id) FROM Employee e "
-                "JOIN attendance_logs a ON e.employee_id = a.employee_id "
-                "WHERE e.is_hr = 0 AND e.status = 'Active' AND e.schedule = '2pm to 10pm' AND a.date = ? AND a.remarks = 'Clock In'",
-                (today_date,)
-            )
-            afternoon_present = cursor.fetchone()[0] if cursor else 0
+    def on_attendance_logged(self, employee_id, date_str, time_str, remarks, is_late):
+        self.update_hr_dashboard_labels()
+        self.update_attendance_pie_chart()
+        self.update_attendance_area_chart()
+        if remarks == "Clock Out":
+            self.update_avg_work_hours_line_chart()
 
-            # Night shift
-            cursor = self.db.execute_query(
-                "SELECT COUNT(*) FROM Employee WHERE is_hr = 0 AND status = 'Active' AND schedule = '10pm to 6am'"
-            )
-            night_total = cursor.fetchone()[0] if cursor else 0
-            cursor = self.db.execute_query(
-                "SELECT COUNT(DISTINCT e.employee_id) FROM Employee e "
-                "JOIN attendance_logs a ON e.employee_id = a.employee_id "
-                "WHERE e.is_hr = 0 AND e.status = 'Active' AND e.schedule = '10pm to 6am' AND a.date = ? AND a.remarks = 'Clock In'",
-                (today_date,)
-            )
-            night_present = cursor.fetchone()[0] if cursor else 0
+    def on_employee_changed(self, employee_id, change):
+        self.update_hr_dashboard_labels()
+        self.update_attendance_pie_chart()
+        self.update_attendance_area_chart()
 
-            # --- NEW: Average overtime calculation ---
-            cursor = self.db.execute_query(
-                "SELECT employee_id FROM attendance_logs WHERE date = ? AND remarks = 'Clock In' AND employee_id IN (SELECT employee_id FROM Employee WHERE is_hr = 0)",
-                (today_date,)
-            )
-            employee_ids = [row[0] for row in cursor.fetchall()] if cursor else []
-            total_overtime = 0
-            overtime_count = 0
-            for emp_id in employee_ids:
-                cur = self.db.execute_query(
-                    "SELECT time, remarks FROM attendance_logs WHERE employee_id = ? AND date = ? ORDER BY time ASC",
-                    (emp_id, today_date)
-                )
-                logs = cur.fetchall() if cur else []
-                clock_in_time = None
-                clock_out_time = None
-                for log in logs:
-                    if log[1] == "Clock In" and not clock_in_time:
-                        clock_in_time = log[0]
-                    elif log[1] == "Clock Out":
-                        clock_out_time = log[0]
-                if clock_in_time and clock_out_time:
-                    try:
-                        t1 = datetime.strptime(f"{today_date} {clock_in_time}", "%Y-%m-%d %H:%M:%S")
-                        t2 = datetime.strptime(f"{today_date} {clock_out_time}", "%Y-%m-%d %H:%M:%S")
-                        worked_hours = (t2 - t1).total_seconds() / 3600
-                        overtime = worked_hours - 8
-                        if overtime > 0:
-                            total_overtime += overtime
-                            overtime_count += 1
-                    except Exception:
-                        continue
-            ave_overtime = round(total_overtime / overtime_count, 2) if overtime_count > 0 else 0
-
-            # --- Set HR dashboard labels ---
-            self.hr_ui.hr_total_employee_lbl.setText(f"{total_employees}/{total_employees}")
-            self.hr_ui.hr_active_employee_lbl.setText(str(active_employees))
-            self.hr_ui.hr_logged_employee_lbl.setText(str(logged_employees))
-            self.hr_ui.hr_late_employee_lbl.setText(str(late_employees))
-            self.hr_ui.hr_absent_employee_lbl.setText(str(absent_employees))
-
-            # --- Set new shift and overtime labels ---
-            if hasattr(self.hr_ui, "morning_shift_lbl"):
-                self.hr_ui.morning_shift_lbl.setText(f"{morning_present}/{morning_total}")
-            if hasattr(self.hr_ui, "afternoon_shift_lbl"):
-                self.hr_ui.afternoon_shift_lbl.setText(f"{afternoon_present}/{afternoon_total}")
-            if hasattr(self.hr_ui, "night_shift_lbl"):
-                self.hr_ui.night_shift_lbl.setText(f"{night_present}/{night_total}")
+    def update_hr_dashboard_labels(self):
+        try:
+            metrics = DashboardMetrics.shared(self.db).get()
+            self.hr_ui.hr_total_employee_lbl.setText(f"{metrics['total_employees']}/{metrics['total_employees']}")
+            self.hr_ui.hr_active_employee_lbl.setText(str(metrics['active_employees']))
+            self.hr_ui.hr_logged_employee_lbl.setText(str(metrics['logged_employees']))
+            self.hr_ui.hr_late_employee_lbl.setText(str(metrics['late_employees']))
+            self.hr_ui.hr_absent_employee_lbl.setText(str(metrics['absent_employees']))
+
+            for shift in DashboardMetrics.SHIFTS:
+                if hasattr(self.hr_ui, f"{shift}_shift_lbl"):
+                    getattr(self.hr_ui, f"{shift}_shift_lbl").setText(f"{metrics[shift + '_present']}/{metrics[shift + '_total']}")
             if hasattr(self.hr_ui, "ave_overtime_lbl"):
-                self.hr_ui.ave_overtime_lbl.setText(str(ave_overtime))
+                self.hr_ui.ave_overtime_lbl.setText(str(metrics['ave_overtime']))
 
         except sqlite3.Error as e:
             print(f"Database error while updating HR dashboard labels: {e}")
@@ -1973,25 +3573,15 @@ class HR:
     def load_hr_employee_table(self):
         self.system_logs.log_system_action("Load employees into the HR employee table.", "Employee")
         try:
-            cursor = self.db.execute_query("SELECT * FROM Employee WHERE is_hr = 0")
-            employees = cursor.fetchall() if cursor else []
+            employees = EmployeeRepository.shared(self.db).list(is_hr=False)
 
             self.hr_employees = []
             self.hr_ui.hr_employee_tbl.setRowCount(0)
             for employee in employees:
-                employee_data = {
-                    "employee_id": employee[0],
-                    "first_name": employee[1],
-                    "last_name": employee[2],
-                    "middle_initial": employee[3],
-                    "department": employee[6],
-                    "position": employee[7],
-                    "status": employee[10],
-                    "profile_picture": employee[13]
-                }
+                employee_data = employee._asdict()
                 self.hr_employees.append(employee_data)
                 self.add_hr_employee_to_table(employee_data)
-                self.update_hr_dashboard_labels()
+            self.update_hr_dashboard_labels()
         except sqlite3.Error as e:
             self.system_logs.log_system_action(f"Database error while loading HR employees: {e}", "Employee")
 
@@ -2016,23 +3606,6 @@ class HR:
 
         self.hr_ui.hr_employee_tbl.resizeColumnsToContents()
 
-    def filter_hr_employee_table(self):
-        search_text = self.hr_ui.hr_employee_search_box.text().lower()
-        for row in range(self.hr_ui.hr_employee_tbl.rowCount()):
-            self.hr_ui.hr_employee_tbl.setRowHidden(row, False)
-
-        if not search_text:
-            return
-
-        for row in range(self.hr_ui.hr_employee_tbl.rowCount()):
-            match_found = False
-            for col in range(self.hr_ui.hr_employee_tbl.columnCount()):
-                item = self.hr_ui.hr_employee_tbl.item(row, col)
-                if item and search_text in item.text().lower():
-                    match_found = True
-                    break
-            self.hr_ui.hr_employee_tbl.setRowHidden(row, not match_found)
-
     def sort_hr_employee_table(self):
         sort_option = self.hr_ui.hr_employee_sort_box.currentText()
         if sort_option == "By Name:":
@@ -2088,6 +3661,7 @@ class HR:
         current_date = current_time.strftime("%Y-%m-%d")
         self.db.execute_query("INSERT INTO attendance_logs (employee_id, date, time, remarks) VALUES (?, ?, ?, ?)",
                               (self.hr_data["employee_id"], current_date, current_time.strftime("%H:%M:%S"), "Clock Out"))
+        APP_EVENTS.attendance_logged.emit(self.hr_data["employee_id"], current_date, current_time.strftime("%H:%M:%S"), "Clock Out", False)
         self.system_logs.log_system_action("The HR logged out. Restarting application.", "HR")
         from PySide6.QtCore import QProcess, QCoreApplication
         QProcess.startDetached(sys.executable, sys.argv)
@@ -2096,79 +3670,15 @@ class HR:
     def load_hr_attendance_logs_table(self):
         self.system_logs.log_system_action("Load all attendance logs for employees only into the table.", "AttendanceLog")
         try:
-            cursor = self.db.execute_query(
-                "SELECT employee_id, remarks, date, time FROM attendance_logs WHERE employee_id IN (SELECT employee_id FROM Employee WHERE is_hr = 0)"
-            )
-            logs = cursor.fetchall() if cursor else []
-
-            self.hr_ui.hr_attedance_logs_tbl.setRowCount(0)
-            for log in logs:
-                self.add_attendance_log_to_table(self.hr_ui.hr_attedance_logs_tbl, log)
+            self.hr_attendance_logs_model.reload()
+            self.hr_ui.hr_attedance_logs_tbl.resizeColumnsToContents()
         except sqlite3.Error as e:
             self.system_logs.log_system_action(f"Database error while loading HR attendance logs: {e}", "AttendanceLog")
             print(f"Database error while loading HR attendance logs: {e}")
 
-    def add_attendance_log_to_table(self, table, log):
-        row_position = table.rowCount()
-        table.insertRow(row_position)
-
-        account_id_item = QTableWidgetItem(log[0])
-        remarks_item = QTableWidgetItem(log[1])
-        date_item = QTableWidgetItem(log[2])
-        time_item = QTableWidgetItem(log[3])
-
-        account_id_item.setFlags(account_id_item.flags() & ~Qt.ItemIsEditable)
-        remarks_item.setFlags(remarks_item.flags() & ~Qt.ItemIsEditable)
-        date_item.setFlags(date_item.flags() & ~Qt.ItemIsEditable)
-        time_item.setFlags(time_item.flags() & ~Qt.ItemIsEditable)
-
-        table.setItem(row_position, 0, account_id_item)
-        table.setItem(row_position, 1, remarks_item)
-        table.setItem(row_position, 2, date_item)
-        table.setItem(row_position, 3, time_item)
-
-        table.resizeColumnsToContents()
-
-    def filter_hr_attendance_logs_table(self):
-        search_text = self.hr_ui.hr_attedance_logs_search.text().lower()
-        for row in range(self.hr_ui.hr_attedance_logs_tbl.rowCount()):
-            self.hr_ui.hr_attedance_logs_tbl.setRowHidden(row, False)
-
-        if not search_text:
-            return
-
-        for row in range(self.hr_ui.hr_attedance_logs_tbl.rowCount()):
-            match_found = False
-            for col in range(self.hr_ui.hr_attedance_logs_tbl.columnCount()):
-                item = self.hr_ui.hr_attedance_logs_tbl.item(row, col)
-                if item and search_text in item.text().lower():
-                    match_found = True
-                    break
-            self.hr_ui.hr_attedance_logs_tbl.setRowHidden(row, not match_found)
-
     def sort_hr_attendance_logs_table(self):
         sort_option = self.hr_ui.hr_attedance_logs_sort.currentText()
-
-        logs = []
-        for row in range(self.hr_ui.hr_attedance_logs_tbl.rowCount()):
-            log = [
-                self.hr_ui.hr_attedance_logs_tbl.item(row, col).text()
-                for col in range(self.hr_ui.hr_attedance_logs_tbl.columnCount())
-            ]
-            logs.append(log)
-
-        if sort_option == "By Date:":
-            logs.sort(key=lambda x: x[2]) 
-        elif sort_option == "By Time:":
-            logs.sort(key=lambda x: x[3]) 
-        elif sort_option == "By Account ID:":
-            logs.sort(key=lambda x: x[0])  
-        elif sort_option == "By Remarks:":
-            logs.sort(key=lambda x: x[1])  
-
-        self.hr_ui.hr_attedance_logs_tbl.setRowCount(0)
-        for log in logs:
-            self.add_attendance_log_to_table(self.hr_ui.hr_attedance_logs_tbl, log)
+        self.hr_attendance_logs_model.sort(AttendanceLogModel.SORT_OPTIONS.get(sort_option))
 
     def load_hr_employee_attendance_logs(self, employee_id):
         self.system_logs.log_system_action("Load attendance logs for the selected employee.", "AttendanceLog")
@@ -2379,6 +3889,8 @@ class ChangePassword(QObject):
                 "UPDATE {} SET password = ?, password_changed = TRUE WHERE {} = ?".format(table, id_field),
                 (hashed_password, self.user_id)
             )
+            if self.user_type == "employee":
+                APP_EVENTS.employee_changed.emit(self.user_id, "password")
 
             self.system_logs.log_system_action(f"The {self.user_type} password has been changed.", "Admin" if self.user_type == "admin" else "Employee")
             chime.theme('chime')
@@ -2395,28 +3907,9 @@ class ChangePassword(QObject):
             toast.show()
 
             if self.user_type == "employee":
-                cursor = self.db.execute_query("""
-                    SELECT * FROM Employee WHERE employee_id = ?
-                """, (self.user_id,))
-                if cursor:
-                    employee = cursor.fetchone()
-                    if employee:
-                        employee_data = {
-                            "employee_id": employee[0],
-                            "first_name": employee[1],
-                            "last_name": employee[2],
-                            "middle_initial": employee[3],
-                            "birthday": employee[4],
-                            "gender": employee[5],
-                            "department": employee[6],
-                            "position": employee[7],
-                            "schedule": employee[8],
-                            "is_hr": employee[9],
-                            "password_changed": True,  # Now changed
-                            "profile_picture": employee[13],
-                            "email": employee[14]
-                        }
-                        self.passwordChanged.emit(employee_data)
+                employee = EmployeeRepository.shared(self.db).get(self.user_id)
+                if employee:
+                    self.passwordChanged.emit(employee._asdict())
 
             self.change_pass_ui.close()
 
@@ -2494,25 +3987,21 @@ class ForgotPassword:
             return
 
         try:
-            cursor = self.db.execute_query(
-                "SELECT * FROM Employee WHERE employee_id = ?", 
-                (account_id,)
-            )
-            employee = cursor.fetchone()
+            employee = EmployeeRepository.shared(self.db).get(account_id)
 
             if not employee:
                 self.forgot_pass_ui.fp_page1_note.setText("Warning: The provided Account ID does not exist.")
                 self.forgot_pass_ui.fp_page1_note.setStyleSheet("color: black; background-color: rgb(255, 249, 245); border: 1px solid rgb(138, 55, 7);")
                 return
 
-            if employee[4] != birthday or employee[14] != email:
+            if employee.birthday != birthday or employee.email != email:
                 self.forgot_pass_ui.fp_page1_note.setText("Warning: The provided information does not match our records. Please check your inputs.")
                 self.forgot_pass_ui.fp_page1_note.setStyleSheet("color: black; background-color: rgb(255, 249, 245); border: 1px solid rgb(138, 55, 7);")
                 return
 
             self.current_employee = {
-                "employee_id": employee[0],
-                "email": employee[14]
+                "employee_id": employee.employee_id,
+                "email": employee.email
             }
             
             self.verification_code = ''.join([str(secrets.randbelow(10)) for _ in range(4)])
@@ -2690,6 +4179,7 @@ class ForgotPassword:
                 "UPDATE Employee SET password = ?, password_changed = TRUE WHERE employee_id = ?",
                 (hashed_password, self.current_employee["employee_id"])
             )
+            APP_EVENTS.employee_changed.emit(self.current_employee["employee_id"], "password")
             self.change_pass_ui.close()
             
             
@@ -2720,11 +4210,16 @@ class Home:
     password_changed = False
     failed_attempts = 0 
     faceid_last_attendance_times = {}
+    # Attendance history rows per page on the clock-in result page
+    RESULT_HISTORY_PAGE = 30
     def __init__(self, db):
         self.db = db
         self.system_logs = SystemLogs(db)
         self.loader = QUiLoader()
         self.home_ui = self.loader.load("ui/home.ui")
+        self.result_history_employee = None
+        self.result_history_cursor = None  # (date, time, log_id) of the last history row shown; None when all are shown
+        self.home_ui.result_employee_attendance_tbl.verticalScrollBar().valueChanged.connect(self.handle_result_history_scroll)
         self.home_ui.setWindowIcon(QIcon('resources/logo.ico'))
         self.home_ui.setWindowTitle("EALS")
         self.fp_signals = FingerprintSignals()
@@ -2736,8 +4231,12 @@ class Home:
         self.fp_logic.signals = self.fp_signals
 
         # --- FaceID integration ---
-        self.faceid_logic = FaceIdLogic()
-        self.faceid_timer = None
+        self.faceid_logic = FaceIdLogic(db=self.db)
+        self.faceid_signals = FaceIdSignals()
+        self.faceid_signals.frame_ready.connect(self.update_faceid_frame)
+        self.faceid_signals.stats_ready.connect(self.log_faceid_stats)
+        self.faceid_pipeline = FaceRecognitionPipeline(self.faceid_logic, self.faceid_signals, self.verify_faceid_candidate)
+        self.faceid_histogram_verifier = HistogramVerifier(self.faceid_logic.face_gallery)
         self.faceid_active = False
         self.faceid_last_match = None
 
@@ -2748,6 +4247,8 @@ class Home:
 
         # Add peripheral settings
         self.peripheral_settings = self.load_peripheral_settings()
+        self.faceid_logic.apply_detection_settings(
+            self.peripheral_settings['faceid_det_size'], self.peripheral_settings['faceid_roi_enabled'])
 
         self.home_ui.home_login_btn.clicked.connect(self.handle_login)
         self.last_mode_switch_time = 0
@@ -2774,25 +4275,31 @@ class Home:
         """Load peripheral settings from database"""
         try:
             cursor = self.db.execute_query(
-                "SELECT is_faceid_on, is_fingerprintid_on FROM system_settings LIMIT 1"
+                "SELECT is_faceid_on, is_fingerprintid_on, faceid_det_size, faceid_roi_enabled FROM system_settings LIMIT 1"
             )
             result = cursor.fetchone()
             if result:
                 return {
                     'is_faceid_on': bool(result[0]),
-                    'is_fingerprintid_on': bool(result[1])
+                    'is_fingerprintid_on': bool(result[1]),
+                    'faceid_det_size': result[2] or 640,
+                    'faceid_roi_enabled': bool(result[3])
                 }
             else:
                 # Default settings if no configuration exists
                 return {
                     'is_faceid_on': True,
-                    'is_fingerprintid_on': True
+                    'is_fingerprintid_on': True,
+                    'faceid_det_size': 640,
+                    'faceid_roi_enabled': False
                 }
         except Exception as e:
             print(f"Error loading peripheral settings: {e}")
             return {
                 'is_faceid_on': True,
-                'is_fingerprintid_on': True
+                'is_fingerprintid_on': True,
+                'faceid_det_size': 640,
+                'faceid_roi_enabled': False
             }
 
     def set_initial_page(self):
@@ -2903,35 +4410,41 @@ class Home:
             return False
 
     def terminate_faceid(self):
+        # Stop the camera threads before the device and models are released
+        self.faceid_pipeline.stop()
         try:
             self.faceid_logic.terminate_device()
         except Exception:
             pass
         self.faceid_active = False
-        if self.faceid_timer:
-            self.faceid_timer.stop()
-            self.faceid_timer = None
 
     def start_faceid_scanning(self):
-        if self.faceid_timer:
-            self.faceid_timer.stop()
-        self.faceid_timer = QTimer()
-        self.faceid_timer.timeout.connect(self.update_faceid_frame)
-        self.faceid_timer.start(30)
+        self.faceid_pipeline.start()
+
+    def log_faceid_stats(self, stats):
+        """Pipeline throughput into the daily audit log, so frame drops and latency can be followed on a running kiosk"""
+        AUDIT_LOG.write(datetime.now(), "FaceID pipeline: " + ", ".join(f"{key}={value}" for key, value in stats.items()))
 
-    def update_faceid_frame(self):
+    def update_faceid_frame(self, qt_image, frame_result):
+        """Draw a frame from the recognition pipeline and act on its match (GUI thread)"""
         if not self.faceid_active:
             return
-        frame, faces = self.faceid_logic.update_frame()
-        if frame is not None:
-            rgb_image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            h, w, ch = rgb_image.shape
-            bytes_per_line = ch * w
-            qt_image = QImage(rgb_image.data, w, h, bytes_per_line, QImage.Format_RGB888)
-            pixmap = QPixmap.fromImage(qt_image)
-            pixmap = pixmap.scaled(self.home_ui.biometric_display_lbl.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            self.home_ui.biometric_display_lbl.setPixmap(pixmap)
+        pixmap = QPixmap.fromImage(qt_image)
+        pixmap = pixmap.scaled(self.home_ui.biometric_display_lbl.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        self.home_ui.biometric_display_lbl.setPixmap(pixmap)
         # --- FaceID match logic ---
+        emp_id = frame_result.verified_employee
+        if emp_id:
+            self.faceid_last_recognized_time = time.time()
+            self.faceid_last_recognized_employee = emp_id
+            if self.faceid_last_match != emp_id:
+                self.faceid_last_match = emp_id
+                self.handle_faceid_match(emp_id)
+            return
+        self.faceid_last_match = None
+
+    def verify_faceid_candidate(self, frame, faces):
+        """Histogram check of a recognized face against that employee's templates; runs on the recognition thread"""
         if faces:
             current_time = time.time()
             for (x, y, w_box, h_box, name) in faces:
@@ -2944,77 +4457,38 @@ class Home:
                     likeliness = 0
                     face_roi = frame[max(0, y):min(y + h_box, frame.shape[0]), max(0, x):min(x + w_box, frame.shape[1])]
                     if face_roi.size > 0:
-                        input_face = cv2.resize(face_roi, (100, 100))
-                        input_gray = cv2.cvtColor(input_face, cv2.COLOR_BGR2GRAY)
-                        input_hist = cv2.calcHist([input_gray], [0], None, [256], [0, 256])
-                        input_hist = cv2.normalize(input_hist, input_hist).flatten()
-                        best_score = 0.0
-                        best_file = ""
-                        template_files = [f for f in os.listdir(self.faceid_logic.face_templates_dir) if f.lower().endswith(('.png', '.jpg', '.jpeg'))]
-                        for template_file in template_files:
-                            template_path = os.path.join(self.faceid_logic.face_templates_dir, template_file)
-                            template_img = cv2.imread(template_path)
-                            if template_img is None:
-                                continue
-                            template_gray = cv2.cvtColor(template_img, cv2.COLOR_BGR2GRAY)
-                            template_hist = cv2.calcHist([template_gray], [0], None, [256], [0, 256])
-                            template_hist = cv2.normalize(template_hist, template_hist).flatten()
-                            score = cv2.compareHist(input_hist, template_hist, cv2.HISTCMP_CORREL)
-                            if score > best_score:
-                                best_score = score
-                                best_file = template_file
+                        # Template histograms are precomputed by the gallery; only the recognized employee is checked
+                        verifier = self.faceid_histogram_verifier
+                        best_score = verifier.score(verifier.prepare(face_roi), name)
                         likeliness = int(max(0, min(1, best_score)) * 100)
                         if likeliness >= 70:
-                            emp_id = best_file.split("_")[0]
-                            self.faceid_last_recognized_time = current_time
-                            self.faceid_last_recognized_employee = emp_id
-                            
-                            if self.faceid_last_match != emp_id:
-                                self.faceid_last_match = emp_id
-                                self.handle_faceid_match(emp_id)
-                            return
-        self.faceid_last_match = None
+                            return name
+        return None
 
     def handle_faceid_match(self, employee_id):
         # Fetch employee data and proceed as with fingerprint
-        cursor = self.db.execute_query("SELECT * FROM Employee WHERE employee_id = ?", (employee_id,))
-        if cursor:
-            result = cursor.fetchone()
-            if result:
-                if result[10] == "Inactive":
-                    self.show_error("Access Denied", "Your account is inactive. Please contact HR.")
-                    return
-                self.employee_data = {
-                    "employee_id": result[0],
-                    "first_name": result[1],
-                    "last_name": result[2],
-                    "middle_initial": result[3],
-                    "birthday": result[4],
-                    "gender": result[5],
-                    "department": result[6],
-                    "position": result[7],
-                    "schedule": result[8],
-                    "is_hr": result[9],
-                    "password_changed": result[12],
-                    "profile_picture": result[13],
-                    "email": result[14]
-                }
-                self.update_bio_page_info()
-                QTimer.singleShot(2000, self.clear_bio_page_employee_info)
-                if self.employee_data["is_hr"]:
-                    if self.validate_hr_attendance(self.employee_data):
-                        self.terminate_faceid()
-                        self.goto_hr_ui(self.employee_data)
+        employee = EmployeeRepository.shared(self.db).get(employee_id)
+        if employee:
+            if employee.status == "Inactive":
+                self.show_error("Access Denied", "Your account is inactive. Please contact HR.")
+                return
+            self.employee_data = employee._asdict()
+            self.update_bio_page_info()
+            QTimer.singleShot(2000, self.clear_bio_page_employee_info)
+            if self.employee_data["is_hr"]:
+                if self.validate_hr_attendance(self.employee_data):
+                    self.terminate_faceid()
+                    self.goto_hr_ui(self.employee_data)
+            else:
+                self.source_page = "bio_page"
+                if self.validate_attendance():
+                    self.system_logs.log_system_action("A user is logged in as an employee (FaceID)", "Employee")
+                    self.terminate_faceid()
+                    self.goto_result_prompt()
                 else:
-                    self.source_page = "bio_page"
-                    if self.validate_attendance():
-                        self.system_logs.log_system_action("A user is logged in as an employee (FaceID)", "Employee")
-                        self.terminate_faceid()
-                        self.goto_result_prompt()
-                    else:
-                        # Re-enable webcam feed if validation fails
-                        self.home_ui.bio_note_lbl.setText("Face not recognized or not allowed. Please try again.")
-                        self.faceid_last_match = None
+                    # Re-enable webcam feed if validation fails
+                    self.home_ui.bio_note_lbl.setText("Face not recognized or not allowed. Please try again.")
+                    self.faceid_last_match = None
 
     def start_fingerprint_scanning(self):
         def scan_result_callback(matched_employee_id):
@@ -3043,50 +4517,31 @@ class Home:
     def handle_fingerprint_match(self, employee_id):
         # On fingerprint match, stop webcam feed and proceed
         self.terminate_faceid()
-        cursor = self.db.execute_query("""
-            SELECT * FROM Employee WHERE employee_id = ?
-        """, (employee_id,))
-        if cursor:
-            result = cursor.fetchone()
-            if result:
-                if result[10] == "Inactive":
-                    self.show_error("Access Denied", "Your account is inactive. Please contact HR.")
-                    return
-                self.employee_data = {
-                    "employee_id": result[0],
-                    "first_name": result[1],
-                    "last_name": result[2],
-                    "middle_initial": result[3],
-                    "birthday": result[4],
-                    "gender": result[5],
-                    "department": result[6],
-                    "position": result[7],
-                    "schedule": result[8],
-                    "is_hr": result[9],
-                    "password_changed": result[12],
-                    "profile_picture": result[13],
-                    "email": result[14]
-                }
-                self.update_bio_page_info()
-                if self.employee_data["is_hr"]:
-                    if self.validate_hr_attendance(self.employee_data):
-                        self.goto_hr_ui(self.employee_data)
+        employee = EmployeeRepository.shared(self.db).get(employee_id)
+        if employee:
+            if employee.status == "Inactive":
+                self.show_error("Access Denied", "Your account is inactive. Please contact HR.")
+                return
+            self.employee_data = employee._asdict()
+            self.update_bio_page_info()
+            if self.employee_data["is_hr"]:
+                if self.validate_hr_attendance(self.employee_data):
+                    self.goto_hr_ui(self.employee_data)
+            else:
+                self.source_page = "bio_page"
+                if self.validate_attendance():
+                    self.system_logs.log_system_action("A user is logged in as an employee", "Employee")
+                    self.goto_result_prompt()
                 else:
-                    self.source_page = "bio_page"
-                    if self.validate_attendance():
-                        self.system_logs.log_system_action("A user is logged in as an employee", "Employee")
-                        self.goto_result_prompt()
-                    else:
-                        QTimer.singleShot(2000, self.start_fingerprint_scanning)
-                        # Resume webcam feed if needed
-                        if not self.faceid_active:
-                            self.initialize_faceid()
-                            self.start_faceid_scanning()
+                    QTimer.singleShot(2000, self.start_fingerprint_scanning)
+                    # Resume webcam feed if needed
+                    if not self.faceid_active:
+                        self.initialize_faceid()
+                        self.start_faceid_scanning()
 
     def update_fingerprint_display(self, image_data):
         # Show fingerprint image, pause webcam feed
-        if self.faceid_timer:
-            self.faceid_timer.stop()
+        self.faceid_pipeline.stop()
         width, height = 300, 400
         img = PILImage.frombytes('L', (width, height), image_data)
         img = img.resize((200, 200))
@@ -3243,9 +4698,7 @@ class Home:
         current_hour = current_time.hour
 
         
-        cursor = self.db.execute_query("SELECT time, remarks FROM attendance_logs WHERE employee_id = ? AND date = ?", 
-                                       (hr_data["employee_id"], current_date))
-        attendance = cursor.fetchone() if cursor else None
+        attendance = AttendanceDayCache.shared(self.db).logs(hr_data["employee_id"], current_date)
 
         if attendance:
             
@@ -3314,8 +4767,8 @@ class Home:
                         self.show_error("Invalid credentials", "Please enter valid admin ID and password")
                     return
 
-            cursor = self.db.execute_query("SELECT * FROM Employee WHERE employee_id = ?", (user_id,))
-            employee_result = cursor.fetchone() if cursor else None
+            employees = EmployeeRepository.shared(self.db)
+            employee_result = employees.get(user_id)
 
             if employee_result:
                 if self.has_biometric_devices_available():
@@ -3328,28 +4781,14 @@ class Home:
                         self.show_warning("Biometric Login Required", "Please use the biometric login option. Traditional login is disabled when biometric devices are available.")
                         return 
                     
-                if employee_result[10] == "Inactive":
+                if employee_result.status == "Inactive":
                     self.show_error("Invalid credentials", "Please enter valid employee ID and password")
                     self.system_logs.log_system_action("An inactive employee attempted to log in.", "Employee")
                     return
                     
-                employee_data = {
-                    "employee_id": employee_result[0],
-                    "first_name": employee_result[1],
-                    "last_name": employee_result[2],
-                    "middle_initial": employee_result[3],
-                    "birthday": employee_result[4],
-                    "gender": employee_result[5],
-                    "department": employee_result[6],
-                    "position": employee_result[7],
-                    "schedule": employee_result[8],
-                    "is_hr": employee_result[9],
-                    "password_changed": employee_result[12],
-                    "profile_picture": employee_result[13],
-                    "email": employee_result[14],
-                }
+                employee_data = employee_result._asdict()
                 
-                db_password = employee_result[11]
+                db_password = employees.password_hash(user_id)
                 try:
                     PASSWORD_HASHER.verify(db_password, password)
                     if not employee_data["password_changed"]:
@@ -3508,41 +4947,31 @@ class Home:
         current_time = datetime.now()
         current_date = current_time.strftime("%Y-%m-%d")
         current_hour = current_time.hour
-
-        cursor = self.db.execute_query(
-            "SELECT attedance_count FROM Employee WHERE employee_id = ?",
-            (self.employee_data["employee_id"],)
-        )
-        if cursor:
-            result = cursor.fetchone()
-            attendance_count = int(result[0]) if result and result[0] else 0
-        else:
-            attendance_count = 0
+        day_cache = AttendanceDayCache.shared(self.db)
+        today_logs = day_cache.logs(self.employee_data["employee_id"], current_date)
 
         if self.employee_data["schedule"] == "10pm to 6am":
+            cursor = self.db.execute_query(
+                "SELECT attedance_count FROM Employee WHERE employee_id = ?",
+                (self.employee_data["employee_id"],)
+            )
+            if cursor:
+                result = cursor.fetchone()
+                attendance_count = int(result[0]) if result and result[0] else 0
+            else:
+                attendance_count = 0
+
             if current_hour >= 22:
-                cursor = self.db.execute_query(
-                    "SELECT COUNT(*) FROM attendance_logs WHERE employee_id = ? AND date = ? AND time >= '22:00:00'",
-                    (self.employee_data["employee_id"], current_date)
-                )
-                night_logs = cursor.fetchone()[0] if cursor else 0
+                night_logs = sum(1 for log_time, _ in today_logs if log_time >= '22:00:00')
                 if night_logs >= 2:
                     self.show_warning("Attendance Error", "You have already completed your attendance for tonight's shift.")
                     QTimer.singleShot(2000, self.clear_bio_page_employee_info)
                     return False
             elif current_hour < 6:
                 previous_date = (current_time - timedelta(days=1)).strftime("%Y-%m-%d")
-                cursor = self.db.execute_query(
-                    "SELECT COUNT(*) FROM attendance_logs WHERE employee_id = ? AND date = ? AND time >= '22:00:00'",
-                    (self.employee_data["employee_id"], previous_date)
-                )
-                previous_night_logs = cursor.fetchone()[0] if cursor else 0
-                
-                cursor = self.db.execute_query(
-                    "SELECT COUNT(*) FROM attendance_logs WHERE employee_id = ? AND date = ? AND time <= '06:00:00'",
-                    (self.employee_data["employee_id"], current_date)
-                )
-                early_morning_logs = cursor.fetchone()[0] if cursor else 0
+                previous_logs = day_cache.logs(self.employee_data["employee_id"], previous_date)
+                previous_night_logs = sum(1 for log_time, _ in previous_logs if log_time >= '22:00:00')
+                early_morning_logs = sum(1 for log_time, _ in today_logs if log_time <= '06:00:00')
                 
                 total_logs = previous_night_logs + early_morning_logs
                 if total_logs >= 2:
@@ -3550,22 +4979,14 @@ class Home:
                     QTimer.singleShot(2000, self.clear_bio_page_employee_info)
                     return False
         else:
-            cursor = self.db.execute_query(
-                "SELECT COUNT(*) FROM attendance_logs WHERE employee_id = ? AND date = ?",
-                (self.employee_data["employee_id"], current_date)
-            )
-            attendance_count = cursor.fetchone()[0] if cursor else 0
+            attendance_count = len(today_logs)
             
             if attendance_count >= 2:
                 self.show_warning("Attendance Error", "You have already logged your attendance twice today.")
                 QTimer.singleShot(2000, self.clear_bio_page_employee_info)
                 return False
 
-        cursor = self.db.execute_query(
-            "SELECT time, remarks FROM attendance_logs WHERE employee_id = ? AND date = ?",
-            (self.employee_data["employee_id"], current_date)
-        )
-        attendance = cursor.fetchone() if cursor else None
+        attendance = today_logs[0] if today_logs else None
 
         if attendance:
             log_time_str = attendance[0]
@@ -3607,23 +5028,8 @@ class Home:
             self.employee_data["is_late"] = is_late
             self.employee_data["was_late"] = is_late
 
-            if is_late:
-                cursor = self.db.execute_query(
-                    "SELECT late_count FROM Employee WHERE employee_id = ?",
-                    (self.employee_data["employee_id"],)
-                )
-                late_count = int(cursor.fetchone()[0] or 0) if cursor else 0
-                late_count += 1
-                self.db.execute_query(
-                    "UPDATE Employee SET late_count = ? WHERE employee_id = ?",
-                    (late_count, self.employee_data["employee_id"])
-                )
-
-        new_count = attendance_count + 1
-        self.db.execute_query(
-            "UPDATE Employee SET attedance_count = ? WHERE employee_id = ?",
-            (new_count, self.employee_data["employee_id"])
-        )
+        # The counters are written by goto_result_prompt in the same transaction as the attendance log
+        self.employee_data["attendance_count"] = attendance_count + 1
 
         return True
 
@@ -3633,6 +5039,7 @@ class Home:
         current_date = current_time.strftime("%Y-%m-%d")
         self.db.execute_query("INSERT INTO attendance_logs (employee_id, date, time, remarks) VALUES (?, ?, ?, ?)",
                               (hr_data["employee_id"], current_date, current_time.strftime("%H:%M:%S"), hr_data.get("remarks", "Clock In")))
+        APP_EVENTS.attendance_logged.emit(hr_data["employee_id"], current_date, current_time.strftime("%H:%M:%S"), hr_data.get("remarks", "Clock In"), False)
         global_home_ui.close()
         self.hr = HR(self.db, hr_data)
         self.hr.hr_ui.showMaximized()
@@ -3742,6 +5149,50 @@ class Home:
         self.home_ui.bio_employee_shift.setText(f"<b>Shift:</b>")
         self.home_ui.bio_note_lbl.setText("Sensor ready. Please tap your finger.")
 
+    def load_result_history_page(self, employee_id, cursor_key=None):
+        """Append the next RESULT_HISTORY_PAGE attendance logs, newest first, after cursor_key; returns the page's
+        (date, time, remarks, is_late, log_id) rows"""
+        query = "SELECT date, time, remarks, is_late, log_id FROM attendance_logs WHERE employee_id = ?"
+        params = [employee_id]
+        if cursor_key:
+            query += " AND (date, time, log_id) < (?, ?, ?)"
+            params.extend(cursor_key)
+        query += " ORDER BY date DESC, time DESC, log_id DESC LIMIT ?"
+        params.append(self.RESULT_HISTORY_PAGE)
+        try:
+            cursor = self.db.execute_query(query, params)
+            logs = cursor.fetchall() if cursor else []
+        except sqlite3.Error as e:
+            print(f"Database error while loading attendance logs: {e}")
+            self.result_history_cursor = None
+            return []
+
+        table = self.home_ui.result_employee_attendance_tbl
+        for log in logs:
+            row_position = table.rowCount()
+            table.insertRow(row_position)
+            for column, value in enumerate((log[2], log[0], log[1])):
+                item = QTableWidgetItem(value)
+                item.setFlags(item.flags() & ~Qt.ItemIsEditable)
+                table.setItem(row_position, column, item)
+        if cursor_key is None:
+            table.resizeColumnsToContents()
+
+        self.result_history_employee = employee_id
+        self.result_history_cursor = (logs[-1][0], logs[-1][1], logs[-1][4]) if len(logs) == self.RESULT_HISTORY_PAGE else None
+        return logs
+
+    def fill_result_history_view(self):
+        """Load further pages while the rows still fit in the table: without a scroll bar there is no end to scroll to"""
+        table = self.home_ui.result_employee_attendance_tbl
+        while self.result_history_cursor and table.verticalHeader().length() <= table.viewport().height():
+            self.load_result_history_page(self.result_history_employee, self.result_history_cursor)
+
+    def handle_result_history_scroll(self, value):
+        scroll_bar = self.home_ui.result_employee_attendance_tbl.verticalScrollBar()
+        if value == scroll_bar.maximum() and self.result_history_cursor:
+            self.load_result_history_page(self.result_history_employee, self.result_history_cursor)
+
     def goto_result_prompt(self):
         if self.employee_data:
             current_time = datetime.now()
@@ -3750,10 +5201,26 @@ class Home:
             self.system_logs.log_system_action("A user logged.", "AttendanceLog")
             remarks = self.employee_data.get("remarks", "Clock In")
             is_late = self.employee_data.get("is_late", False)
-            self.db.execute_query(
-                "INSERT INTO attendance_logs (employee_id, date, time, remarks, is_late) VALUES (?, ?, ?, ?, ?)", 
-                (self.employee_data["employee_id"], current_date, current_time.strftime("%H:%M:%S"), remarks, is_late)
-            )
+            employee_id = self.employee_data["employee_id"]
+            try:
+                with self.db.transaction() as transaction:
+                    if remarks == "Clock In" and is_late:
+                        transaction.execute(
+                            "UPDATE Employee SET late_count = CAST(COALESCE(late_count, 0) AS INTEGER) + 1 WHERE employee_id = ?",
+                            (employee_id,)
+                        )
+                    if "attendance_count" in self.employee_data:
+                        transaction.execute(
+                            "UPDATE Employee SET attedance_count = ? WHERE employee_id = ?",
+                            (self.employee_data["attendance_count"], employee_id)
+                        )
+                    self.system_logs.attendance_summary.insert_log(
+                        transaction, employee_id, current_date, current_time.strftime("%H:%M:%S"), remarks, is_late
+                    )
+            except sqlite3.Error as e:
+                print(f"Database error while recording attendance: {e}")
+            else:
+                APP_EVENTS.attendance_logged.emit(employee_id, current_date, current_time.strftime("%H:%M:%S"), remarks, bool(is_late))
 
             if self.check_internet_connection():
                 self.show_success("Email Notification", "Attendance email notification is being sent.")
@@ -3781,21 +5248,16 @@ class Home:
                     "You are making a difference every day!",
                     "Thank you for your hard work and commitment!"
                 ]
-                cursor = self.db.execute_query(
-                    "SELECT is_late FROM attendance_logs WHERE employee_id = ? ORDER BY date DESC, time DESC LIMIT 1",
-                    (self.employee_data["employee_id"],)
-                )
-                was_late = False
-                if cursor:
-                    result = cursor.fetchone()
-                    was_late = bool(result[0]) if result and result[0] is not None else False
+                # The newest history page also feeds the late notice and the worked hours below
+                self.result_history_cursor = None  # Clearing the table must not page in the previous employee's history
+                self.home_ui.result_employee_attendance_tbl.setRowCount(0)
+                history = self.load_result_history_page(self.employee_data["employee_id"])
+                self.fill_result_history_view()
+                was_late = bool(history[0][3]) if history and history[0][3] is not None else False
                 if was_late:
                     messages.insert(0, "You were late for your shift today. Please be punctual next time.")
-                    
-                cursor = self.db.execute_query("SELECT date, time, remarks FROM attendance_logs WHERE employee_id = ? ORDER BY date DESC, time DESC LIMIT 10",
-                (self.employee_data["employee_id"],)
-                )
-                logs = cursor.fetchall() if cursor else []
+
+                logs = history[:10]
 
                 clock_in_time = None
                 clock_out_time = None
@@ -3827,34 +5289,6 @@ class Home:
                 random_message = random.choice(messages)
                 self.home_ui.result_message_lbl.setText(random_message)
 
-                try:
-                    cursor = self.db.execute_query(
-                        "SELECT remarks, date, time FROM attendance_logs WHERE employee_id = ?", 
-                        (self.employee_data["employee_id"],)
-                    )
-                    logs = cursor.fetchall() if cursor else []
-
-                    self.home_ui.result_employee_attendance_tbl.setRowCount(0)
-                    for log in logs:
-                        row_position = self.home_ui.result_employee_attendance_tbl.rowCount()
-                        self.home_ui.result_employee_attendance_tbl.insertRow(row_position)
-
-                        remarks_item = QTableWidgetItem(log[0])
-                        date_item = QTableWidgetItem(log[1])
-                        time_item = QTableWidgetItem(log[2])
-
-                        remarks_item.setFlags(remarks_item.flags() & ~Qt.ItemIsEditable)
-                        date_item.setFlags(date_item.flags() & ~Qt.ItemIsEditable)
-                        time_item.setFlags(time_item.flags() & ~Qt.ItemIsEditable)
-
-                        self.home_ui.result_employee_attendance_tbl.setItem(row_position, 0, remarks_item)
-                        self.home_ui.result_employee_attendance_tbl.setItem(row_position, 1, date_item)
-                        self.home_ui.result_employee_attendance_tbl.setItem(row_position, 2, time_item)
-
-                    self.home_ui.result_employee_attendance_tbl.resizeColumnsToContents()
-                except sqlite3.Error as e:
-                    print(f"Database error while loading attendance logs: {e}")
-
             result_prompt = self.home_ui.main_page.indexOf(self.home_ui.result_page)
             self.home_ui.main_page.setCurrentIndex(result_prompt)
 
@@ -4063,8 +5497,8 @@ class Admin:
         self.admin_ui.is_hr_yes.toggled.connect(self.toggle_hr_fields)
         self.admin_ui.is_hr_no.toggled.connect(self.toggle_hr_fields)
 
-        self.admin_ui.employee_search_box.textChanged.connect(self.filter_employee_table)
-        self.admin_ui.hr_search_box.textChanged.connect(self.filter_hr_table)
+        self.employee_filter = TableFilter(self.admin_ui.employee_list_tbl, self.admin_ui.employee_search_box)
+        self.hr_filter = TableFilter(self.admin_ui.hr_list_tbl, self.admin_ui.hr_search_box)
         
         self.admin_ui.employee_sort_box.currentIndexChanged.connect(self.sort_employee_table)
         self.admin_ui.hr_sort_box.currentIndexChanged.connect(self.sort_hr_table)
@@ -4079,10 +5513,12 @@ class Admin:
         self.admin_ui.employee_picture_btn.clicked.connect(self.handle_enroll_picture)
         self.admin_ui.change_employee_picture.clicked.connect(self.handle_edit_picture)
 
+        self.attendance_logs_model = AttendanceLogModel(db, parent=self.admin_ui.admin_attedance_logs_tbl)
+        self.admin_ui.admin_attedance_logs_tbl.setModel(self.attendance_logs_model)
         self.admin_ui.admin_attedance_logs_tbl.setSelectionBehavior(QAbstractItemView.SelectRows)
         self.admin_ui.admin_attedance_logs_tbl.setSelectionMode(QAbstractItemView.SingleSelection)
 
-        self.admin_ui.admin_attedance_logs_search.textChanged.connect(self.filter_attendance_logs_table)
+        self.attendance_logs_search = DebouncedSearch(self.admin_ui.admin_attedance_logs_search, self.attendance_logs_model.set_search_text)
         self.admin_ui.admin_attedance_logs_sort.currentIndexChanged.connect(self.sort_attendance_logs_table)
 
         self.load_attendance_logs_table()
@@ -4123,10 +5559,15 @@ class Admin:
         if hasattr(self.admin_ui, "chart_layout3") and self.pie_chart_view:
             self.admin_ui.chart_layout3.addWidget(self.pie_chart_view, 0, 0)
 
+        # Live KPIs: the shared DashboardMetrics connects first, so these slots redraw from its updated cache
+        DashboardMetrics.shared(self.db)
+        APP_EVENTS.attendance_logged.connect(self.on_attendance_logged)
+        APP_EVENTS.employee_changed.connect(self.on_employee_changed)
+
         self.fingerprint_logic = FingerprintLogic(db)
         self.admin_ui.fp_device_rescan_btn.clicked.connect(self.handle_fp_device_rescan)
         # --- FaceIdLogic integration ---
-        self.faceid_logic = FaceIdLogic(success_callback=self.show_success_for_pose)
+        self.faceid_logic = FaceIdLogic(success_callback=self.show_success_for_pose, db=self.db)
         self.webcam_timer = None
         self.webcam_countdown_timer = None
         self.webcam_countdown_value = 3
@@ -4137,6 +5578,9 @@ class Admin:
         self.admin_ui.faceid_btn.toggled.connect(self.toggle_faceid_settings)
         self.admin_ui.fingerid_btn.toggled.connect(self.toggle_fingerid_settings)
         self.admin_ui.save_bio_config_btn.clicked.connect(self.save_biometric_configuration)
+        # Smaller detection sizes trade accuracy for frame rate on low-end kiosk PCs
+        for det_size in (640, 480, 320):
+            self.admin_ui.faceid_det_size_box.addItem(f"{det_size} x {det_size}", det_size)
         
         # Initialize peripheral settings
         self.load_biometric_configuration()
@@ -4527,65 +5971,25 @@ class Admin:
         )
 
     def save_face_models_to_db(self):
-        # Save all enrolled face images as template paths
+        # Each captured pose was already written to face_embeddings by FaceIdLogic.capture_enroll_image
         employee_id = self.current_employee_data["employee_id"]
-        face_dir = self.faceid_logic.face_templates_dir
-        template_paths = []
-        
-        # Look for files that match the actual naming pattern from FaceIdLogic
-        # The files are saved as: {employee_id}_{pose_name}.jpg and {employee_id}_{pose_name}.npy
         try:
-            for filename in os.listdir(face_dir):
-                if filename.startswith(f"{employee_id}_") and (filename.lower().endswith('.jpg') or filename.lower().endswith('.npy')):
-                    file_path = os.path.join(face_dir, filename)
-                    if os.path.exists(file_path):
-                        template_paths.append(file_path)
-            
-            if template_paths:
-                # Join all template paths with comma separator
-                template_path_str = ",".join(template_paths)
-                
-                # Check if face model record already exists for this employee
-                cursor = self.db.execute_query(
-                    "SELECT id FROM face_models WHERE employee_id = ?", (employee_id,)
-                )
-                existing_record = cursor.fetchone()
-                
-                if existing_record:
-                    # Update existing record
-                    self.db.execute_query(
-                        "UPDATE face_models SET template_path = ? WHERE employee_id = ?",
-                        (template_path_str, employee_id)
-                    )
-                    print(f"Updated face models for employee {employee_id}")
-                else:
-                    # Insert new record
-                    self.db.execute_query(
-                        "INSERT INTO face_models (employee_id, template_path) VALUES (?, ?)",
-                        (employee_id, template_path_str)
-                    )
-                    print(f"Inserted new face models for employee {employee_id}")
-                
-                self.webcam_enrolled_paths = template_paths
-                print(f"Successfully saved {len(template_paths)} face template paths to database")
+            pose_count = self.faceid_logic.face_gallery.store.count(employee_id)
+            if pose_count:
+                self.faceid_logic.face_gallery.refresh_employee(employee_id)
+                APP_EVENTS.biometric_enrolled.emit(employee_id, "face")
+                print(f"Successfully saved {pose_count} face templates to database")
                 self.admin_ui.webcam_enroll_frame_lbl.setStyleSheet("background-color: rgb(8, 132, 60); color: white; font-weight: bold; border-radius: 5px;")
                 self.admin_ui.webcam_enroll_frame_lbl.setText("SUCCESSFUL ENROLLMENT")
                 self.admin_ui.webcam_enrollment_note_lbl.setText("Face enrollment completed successfully!")
             else:
-                print(f"No face template files found for employee {employee_id}")
+                print(f"No face templates found for employee {employee_id}")
                 
         except Exception as e:
             print(f"Error saving face models to database: {e}")
 
     def is_face_enrolled(self, employee_id):
-        cursor = self.db.execute_query(
-            "SELECT template_path FROM face_models WHERE employee_id = ?", (employee_id,)
-        )
-        result = cursor.fetchone()
-        if result and result[0]:
-            paths = [p for p in result[0].split(",") if os.path.exists(p)]
-            return len(paths) >= self.faceid_logic.enroll_max
-        return False
+        return self.faceid_logic.face_gallery.store.count(employee_id) >= self.faceid_logic.enroll_max
 
     def handle_employee_enroll_back2_with_webcam(self):
         # Terminate webcam device on back
@@ -4633,26 +6037,9 @@ class Admin:
             
             # Fetch the complete employee data from database
             try:
-                cursor = self.db.execute_query("SELECT * FROM Employee WHERE employee_id = ?", (employee_id,))
-                employee_record = cursor.fetchone()
+                employee_record = EmployeeRepository.shared(self.db).get(employee_id)
                 if employee_record:
-                    self.current_employee_data = {
-                        "employee_id": employee_record[0],
-                        "first_name": employee_record[1],
-                        "last_name": employee_record[2],
-                        "middle_initial": employee_record[3],
-                        "birthday": employee_record[4],
-                        "gender": employee_record[5],
-                        "department": employee_record[6],
-                        "position": employee_record[7],
-                        "schedule": employee_record[8],
-                        "is_hr": employee_record[9],
-                        "status": employee_record[10],
-                        "password": employee_record[11],
-                        "password_changed": employee_record[12],
-                        "profile_picture": employee_record[13],
-                        "email": employee_record[14]
-                    }
+                    self.current_employee_data = employee_record._asdict()
                 else:
                     self.show_error("Re-enrollment Error", "Employee data not found.")
                     self.cancel_reenrollment()
@@ -4669,46 +6056,6 @@ class Admin:
             # Regular enrollment - finalize normally
             self.finalize_employee_enrollment()
 
-    def filter_employee_table(self):
-        search_text = self.admin_ui.employee_search_box.text().lower()
-        
-        for row in range(self.admin_ui.employee_list_tbl.rowCount()):
-            self.admin_ui.employee_list_tbl.setRowHidden(row, False)
-        
-        if not search_text:
-            return
-        
-        for row in range(self.admin_ui.employee_list_tbl.rowCount()):
-            match_found = False
-            
-            for col in range(self.admin_ui.employee_list_tbl.columnCount()):
-                item = self.admin_ui.employee_list_tbl.item(row, col)
-                if item and search_text in item.text().lower():
-                    match_found = True
-                    break
-                    
-            self.admin_ui.employee_list_tbl.setRowHidden(row, not match_found)
-
-    def filter_hr_table(self):
-        search_text = self.admin_ui.hr_search_box.text().lower()
-        
-        for row in range(self.admin_ui.hr_list_tbl.rowCount()):
-            self.admin_ui.hr_list_tbl.setRowHidden(row, False)
-        
-        if not search_text:
-            return
-        
-        for row in range(self.admin_ui.hr_list_tbl.rowCount()):
-            match_found = False
-            
-            for col in range(self.admin_ui.hr_list_tbl.columnCount()):
-                item = self.admin_ui.hr_list_tbl.item(row, col)
-                if item and search_text in item.text().lower():
-                    match_found = True
-                    break
-                    
-            self.admin_ui.hr_list_tbl.setRowHidden(row, not match_found)
-
     def sort_employee_table(self):
         sort_option = self.admin_ui.employee_sort_box.currentText()
 
@@ -5124,10 +6471,6 @@ class Admin:
             return
 
         try:
-            # Handle re-enrollment data if exists
-            if self.reenrollment_in_progress and self.temp_enrollment_data:
-                self.apply_reenrollment_changes()
-            
             # ...existing save code...
             current_admin = self.get_current_admin()
             current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
@@ -5140,19 +6483,33 @@ class Admin:
             else:
                 result['profile_picture'] = self.current_employee_data.get('profile_picture', '')
 
-            self.db.execute_query('''
-                UPDATE Employee
-                SET first_name = ?, last_name = ?, middle_initial = ?, birthday = ?, gender = ?,
-                    department = ?, position = ?, schedule = ?, is_hr = ?, status = ?, 
-                    profile_picture = ?, email = ?, last_modified_by = ?, last_modified_at = ?
-                WHERE employee_id = ?
-            ''', (
-                result['first_name'], result['last_name'], result['middle_initial'], result['birthday'],
-                result['gender'], result['department'], result['position'], result['schedule'],
-                result['is_hr'], result['status'], result['profile_picture'],
-                result['email'], current_admin, current_time,  
-                result['employee_id']
-            ))
+            reenrolled = self.reenrollment_in_progress and self.temp_enrollment_data
+            # Re-enrollment records and the employee row are committed together; the template files follow the commit
+            with self.db.transaction() as transaction:
+                if reenrolled:
+                    self.write_reenrollment_rows(transaction)
+
+                transaction.execute('''
+                    UPDATE Employee
+                    SET first_name = ?, last_name = ?, middle_initial = ?, birthday = ?, gender = ?,
+                        department = ?, position = ?, schedule = ?, is_hr = ?, status = ?, 
+                        profile_picture = ?, email = ?, last_modified_by = ?, last_modified_at = ?
+                    WHERE employee_id = ?
+                ''', (
+                    result['first_name'], result['last_name'], result['middle_initial'], result['birthday'],
+                    result['gender'], result['department'], result['position'], result['schedule'],
+                    result['is_hr'], result['status'], result['profile_picture'],
+                    result['email'], current_admin, current_time,  
+                    result['employee_id']
+                ))
+                self.system_logs.attendance_summary.rebuild(datetime.now().strftime('%Y-%m-%d'))
+            if reenrolled:
+                self.install_reenrollment_files()
+            APP_EVENTS.employee_changed.emit(result['employee_id'], "updated")
+            if reenrolled:
+                for kind in ("fingerprint", "face"):
+                    if self.temp_enrollment_data.get(f"{kind}_completed"):
+                        APP_EVENTS.biometric_enrolled.emit(result['employee_id'], kind)
 
             self.system_logs.log_system_action(f"Employee {result['employee_id']} was modified by {current_admin}", "Employee")
             self.show_success("Employee Updated", f"Employee {result['first_name']} {result['last_name']} has been updated.")
@@ -5184,7 +6541,10 @@ class Admin:
                 status_column = 2 
 
             new_status = "Inactive" if employee["status"] == "Active" else "Active"
-            self.db.execute_query("UPDATE Employee SET status = ? WHERE employee_id = ?", (new_status, employee["employee_id"]))
+            with self.db.transaction() as transaction:
+                transaction.execute("UPDATE Employee SET status = ? WHERE employee_id = ?", (new_status, employee["employee_id"]))
+                self.system_logs.attendance_summary.rebuild(datetime.now().strftime('%Y-%m-%d'))
+            APP_EVENTS.employee_changed.emit(employee["employee_id"], "status")
             employee["status"] = new_status
 
             status_item = QTableWidgetItem(new_status)
@@ -5392,29 +6752,12 @@ class Admin:
     def load_employee_table(self):
         self.system_logs.log_system_action("Loading all employees to the employee table.", "Employee")
         try:
-            cursor = self.db.execute_query("SELECT * FROM Employee WHERE is_hr = 0")
-            employees = cursor.fetchall() if cursor else []
+            employees = EmployeeRepository.shared(self.db).list(is_hr=False)
 
             self.employees = []
             self.admin_ui.employee_list_tbl.setRowCount(0)
             for employee in employees:
-                employee_data = {
-                    "employee_id": employee[0],
-                    "first_name": employee[1],
-                    "last_name": employee[2],
-                    "middle_initial": employee[3],
-                    "birthday": employee[4],
-                    "gender": employee[5],
-                    "department": employee[6],
-                    "position": employee[7],
-                    "schedule": employee[8],
-                    "is_hr": employee[9],
-                    "status": employee[10],
-                    "password": employee[11],
-                    "password_changed": employee[12],  
-                    "profile_picture": employee[13],
-                    "email": employee[14]
-                }
+                employee_data = employee._asdict()
                 self.employees.append(employee_data)
                 self.add_employee_to_table(employee_data)
 
@@ -5426,29 +6769,12 @@ class Admin:
     def load_hr_table(self):
         self.system_logs.log_system_action("Loading all HR employees to the HR table.", "Employee")
         try:
-            cursor = self.db.execute_query("SELECT * FROM Employee WHERE is_hr = 1")
-            hr_employees = cursor.fetchall() if cursor else []
+            hr_employees = EmployeeRepository.shared(self.db).list(is_hr=True)
 
             self.hr_employees = []
             self.admin_ui.hr_list_tbl.setRowCount(0)
             for hr_employee in hr_employees:
-                hr_data = {
-                    "employee_id": hr_employee[0],
-                    "first_name": hr_employee[1],
-                    "last_name": hr_employee[2],
-                    "middle_initial": hr_employee[3],
-                    "birthday": hr_employee[4],
-                    "gender": hr_employee[5],
-                    "department": hr_employee[6],
-                    "position": hr_employee[7],
-                    "schedule": hr_employee[8],
-                    "is_hr": hr_employee[9],
-                    "status": hr_employee[10],
-                    "password": hr_employee[11],
-                    "password_changed": hr_employee[12],  
-                    "profile_picture": hr_employee[13],
-                    "email": hr_employee[14]
-                }
+                hr_data = hr_employee._asdict()
                 self.hr_employees.append(hr_data)
                 self.add_hr_to_table(hr_data)
 
@@ -5526,33 +6852,32 @@ class Admin:
 
         if confirm_msg.exec() == QMessageBox.Yes:
             try:
-                # Delete attendance logs
-                self.db.execute_query("DELETE FROM attendance_logs WHERE employee_id = ?", (employee_data['employee_id'],))
-                # Delete feedback
-                self.db.execute_query("DELETE FROM feedback WHERE created_by = ?", (employee_data['employee_id'],))
-                # Delete fingerprint data and files
-                cursor = self.db.execute_query("SELECT template_path FROM fingerprints WHERE employee_id = ?", (employee_data['employee_id'],))
-                if cursor:
-                    for row in cursor.fetchall():
-                        fp_path = row[0]
-                        if fp_path and os.path.exists(fp_path):
-                            os.remove(fp_path)
-                self.db.execute_query("DELETE FROM fingerprints WHERE employee_id = ?", (employee_data['employee_id'],))
-                # Delete face model data and files
-                cursor = self.db.execute_query("SELECT template_path FROM face_models WHERE employee_id = ?", (employee_data['employee_id'],))
-                if cursor:
-                    for row in cursor.fetchall():
-                        face_paths = row[0].split(",") if row[0] else []
-                        for face_path in face_paths:
-                            face_path = face_path.strip()
-                            if face_path and os.path.exists(face_path):
-                                os.remove(face_path)
-                self.db.execute_query("DELETE FROM face_models WHERE employee_id = ?", (employee_data['employee_id'],))
-                # Delete profile picture
-                if employee_data['profile_picture'] and os.path.exists(employee_data['profile_picture']):
-                    os.remove(employee_data['profile_picture'])
-                # Delete from Employee table
-                self.db.execute_query("DELETE FROM Employee WHERE employee_id = ?", (employee_data['employee_id'],))
+                employee_id = employee_data['employee_id']
+                # All rows go in one transaction; files are only removed once it has committed
+                with self.db.transaction() as transaction:
+                    fp_paths = [row[0] for row in transaction.execute(
+                        "SELECT template_path FROM fingerprints WHERE employee_id = ?", (employee_id,)).fetchall()]
+                    # face_models only lists the template files of installations from before face_embeddings
+                    face_paths = []
+                    for row in transaction.execute("SELECT template_path FROM face_models WHERE employee_id = ?", (employee_id,)).fetchall():
+                        face_paths.extend(face_path.strip() for face_path in (row[0].split(",") if row[0] else []))
+
+                    transaction.execute("DELETE FROM attendance_logs WHERE employee_id = ?", (employee_id,))
+                    transaction.execute("DELETE FROM feedback WHERE created_by = ?", (employee_id,))
+                    transaction.execute("DELETE FROM fingerprints WHERE employee_id = ?", (employee_id,))
+                    transaction.execute("DELETE FROM face_models WHERE employee_id = ?", (employee_id,))
+                    transaction.execute("DELETE FROM face_embeddings WHERE employee_id = ?", (employee_id,))
+                    transaction.execute("DELETE FROM Employee WHERE employee_id = ?", (employee_id,))
+                    self.system_logs.attendance_summary.rebuild(datetime.now().strftime('%Y-%m-%d'))
+                # In-memory galleries follow only once the rows are gone for good
+                self.faceid_logic.face_gallery.remove_employee(employee_id, from_store=False)
+                self.fingerprint_logic.gallery.remove_employee(employee_id)
+                APP_EVENTS.employee_changed.emit(employee_id, "deleted")
+
+                # Delete fingerprint, face model and profile picture files
+                for path in fp_paths + face_paths + [employee_data['profile_picture']]:
+                    if path and os.path.exists(path):
+                        os.remove(path)
 
                 self.system_logs.log_system_action(
                     f"{employee_type} {employee_data['employee_id']} has been deleted by {self.get_current_admin()}",
@@ -5562,7 +6887,6 @@ class Admin:
 
                 self.load_employee_table()
                 self.load_hr_table()
-                self.update_dashboard_labels()
 
             except sqlite3.Error as e:
                 print(f"Database error while deleting employee: {e}")
@@ -5640,6 +6964,8 @@ class Admin:
                 ))
                 self.system_logs.log_system_action(f"New employee {employee_data['employee_id']} created by {current_admin}", "Employee")
 
+            self.system_logs.attendance_summary.rebuild(current_time[:10])
+            APP_EVENTS.employee_changed.emit(employee_data['employee_id'], "updated" if result else "added")
             return True
 
         except sqlite3.Error as e:
@@ -5774,120 +7100,33 @@ class Admin:
             self.admin_ui.employee_department_box.setCurrentText("Human Resources")
             self.admin_ui.employee_position_box.setCurrentText("HR Staff")
 
-    def update_dashboard_labels(self):
-        try:
-            cursor = self.db.execute_query("SELECT COUNT(*) FROM Employee")
-            total_employees = cursor.fetchone()[0] if cursor else 0
-
-            cursor = self.db.execute_query("SELECT COUNT(*) FROM Employee WHERE status = 'Active'")
-            active_employees = cursor.fetchone()[0] if cursor else 0
-
-            today_date = datetime.now().strftime("%Y-%m-%d")
-            cursor = self.db.execute_query(
-                "SELECT COUNT(DISTINCT employee_id) FROM attendance_logs "
-                "WHERE date = ? AND employee_id IN (SELECT employee_id FROM Employee WHERE is_hr = 0)", 
-                (today_date,)
-            )
-            logged_employees = cursor.fetchone()[0] if cursor else 0
-
-            cursor = self.db.execute_query(
-                "SELECT COUNT(DISTINCT employee_id) FROM attendance_logs "
-                "WHERE date = ? AND is_late = 1 AND employee_id IN (SELECT employee_id FROM Employee WHERE is_hr = 0)", 
-                (today_date,)
-            )
-            late_employees = cursor.fetchone()[0] if cursor else 0
-
-            cursor = self.db.execute_query(
-                "SELECT COUNT(*) FROM Employee WHERE is_hr = 0 AND status = 'Active' AND employee_id NOT IN ("
-                "SELECT DISTINCT employee_id FROM attendance_logs WHERE date = ?)", 
-                (today_date,)
-            )
-            absent_employees = cursor.fetchone()[0] if cursor else 0
-
-            cursor = self.db.execute_query(
-                "SELECT COUNT(*) FROM Employee WHERE is_hr = 0 AND status = 'Active' AND schedule = '6am to 2pm'"
-            )
-            morning_total = cursor.fetchone()[0] if cursor else 0
-            cursor = self.db.execute_query(
-                "SELECT COUNT(DISTINCT e.employee_id) FROM Employee e "
-                "JOIN attendance_logs a ON e.employee_id = a.employee_id "
-                "WHERE e.is_hr = 0 AND e.status = 'Active' AND e.schedule = '6am to 2pm' AND a.date = ? AND a.remarks = 'Clock In'",
-                (today_date,)
-            )
-            morning_present = cursor.fetchone()[0] if cursor else 0
-
-            cursor = self.db.execute_query(
-                "SELECT COUNT(*) FROM Employee WHERE is_hr = 0 AND status = 'Active' AND schedule = '2pm to 10pm'"
-            )
-            afternoon_total = cursor.fetchone()[0] if cursor else 0
-            cursor = self.db.execute_query(
-                "SELECT COUNT(DISTINCT e.employee_id) FROM Employee e "
-                "JOIN attendance_logs a ON e.employee_id = a.employee_id "
-                "WHERE e.is_hr = 0 AND e.status = 'Active' AND e.schedule = '2pm to 10pm' AND a.date = ? AND a.remarks = 'Clock In'",
-                (today_date,)
-            )
-            afternoon_present = cursor.fetchone()[0] if cursor else 0
-
-            cursor = self.db.execute_query(
-                "SELECT COUNT(*) FROM Employee WHERE is_hr = 0 AND status = 'Active' AND schedule = '10pm to 6am'"
-            )
-            night_total = cursor.fetchone()[0] if cursor else 0
-            cursor = self.db.execute_query(
-                "SELECT COUNT(DISTINCT e.employee_id) FROM Employee e "
-                "JOIN attendance_logs a ON e.employee_id = a.employee_id "
-                "WHERE e.is_hr = 0 AND e.status = 'Active' AND e.schedule = '10pm to 6am' AND a.date = ? AND a.remarks = 'Clock In'",
-                (today_date,)
-            )
-            night_present = cursor.fetchone()[0] if cursor else 0
+    def on_attendance_logged(self, employee_id, date_str, time_str, remarks, is_late):
+        self.update_dashboard_labels()
+        self.update_attendance_pie_chart()
+        self.update_attendance_area_chart()
+        if remarks == "Clock Out":
+            self.update_avg_work_hours_line_chart()
 
-            cursor = self.db.execute_query(
-                "SELECT employee_id FROM attendance_logs WHERE date = ? AND remarks = 'Clock In' AND employee_id IN (SELECT employee_id FROM Employee WHERE is_hr = 0)",
-                (today_date,)
-            )
-            employee_ids = [row[0] for row in cursor.fetchall()] if cursor else []
-            total_overtime = 0
-            overtime_count = 0
-            for emp_id in employee_ids:
-                cur = self.db.execute_query(
-                    "SELECT time, remarks FROM attendance_logs WHERE employee_id = ? AND date = ? ORDER BY time ASC",
-                    (emp_id, today_date)
-                )
-                logs = cur.fetchall() if cur else []
-                clock_in_time = None
-                clock_out_time = None
-                for log in logs:
-                    if log[1] == "Clock In" and not clock_in_time:
-                        clock_in_time = log[0]
-                    elif log[1] == "Clock Out":
-                        clock_out_time = log[0]
-                if clock_in_time and clock_out_time:
-                    try:
-                        t1 = datetime.strptime(f"{today_date} {clock_in_time}", "%Y-%m-%d %H:%M:%S")
-                        t2 = datetime.strptime(f"{today_date} {clock_out_time}", "%Y-%m-%d %H:%M:%S")
-                        worked_hours = (t2 - t1).total_seconds() / 3600
-                        overtime = worked_hours - 8
-                        if overtime > 0:
-                            total_overtime += overtime
-                            overtime_count += 1
-                    except Exception:
-                        continue
-            ave_overtime = round(total_overtime / overtime_count, 2) if overtime_count > 0 else 0
+    def on_employee_changed(self, employee_id, change):
+        self.update_dashboard_labels()
+        self.update_attendance_pie_chart()
+        self.update_attendance_area_chart()
 
+    def update_dashboard_labels(self):
+        try:
+            metrics = DashboardMetrics.shared(self.db).get()
             self.system_logs.log_system_action("Dashboard labels have been updated.", "SystemSettings")
-            self.admin_ui.total_employee_lbl.setText(f"{total_employees}/{total_employees}")
-            self.admin_ui.active_employee_lbl.setText(str(active_employees))
-            self.admin_ui.logged_employee_lbl.setText(str(logged_employees))
-            self.admin_ui.late_employee_lbl.setText(str(late_employees))
-            self.admin_ui.absent_employee_lbl.setText(str(absent_employees))
-
-            if hasattr(self.admin_ui, "morning_shift_lbl"):
-                self.admin_ui.morning_shift_lbl.setText(f"{morning_present}/{morning_total}")
-            if hasattr(self.admin_ui, "afternoon_shift_lbl"):
-                self.admin_ui.afternoon_shift_lbl.setText(f"{afternoon_present}/{afternoon_total}")
-            if hasattr(self.admin_ui, "night_shift_lbl"):
-                self.admin_ui.night_shift_lbl.setText(f"{night_present}/{night_total}")
+            self.admin_ui.total_employee_lbl.setText(f"{metrics['total_employees']}/{metrics['total_employees']}")
+            self.admin_ui.active_employee_lbl.setText(str(metrics['active_employees']))
+            self.admin_ui.logged_employee_lbl.setText(str(metrics['logged_employees']))
+            self.admin_ui.late_employee_lbl.setText(str(metrics['late_employees']))
+            self.admin_ui.absent_employee_lbl.setText(str(metrics['absent_employees']))
+
+            for shift in DashboardMetrics.SHIFTS:
+                if hasattr(self.admin_ui, f"{shift}_shift_lbl"):
+                    getattr(self.admin_ui, f"{shift}_shift_lbl").setText(f"{metrics[shift + '_present']}/{metrics[shift + '_total']}")
             if hasattr(self.admin_ui, "ave_overtime_lbl"):
-                self.admin_ui.ave_overtime_lbl.setText(str(ave_overtime))
+                self.admin_ui.ave_overtime_lbl.setText(str(metrics['ave_overtime']))
 
         except sqlite3.Error as e:
             print(f"Database error while updating dashboard labels: {e}")
@@ -5963,76 +7202,14 @@ class Admin:
     def load_attendance_logs_table(self):
 
         try:
-            cursor = self.db.execute_query("SELECT employee_id, remarks, date, time FROM attendance_logs")
-            logs = cursor.fetchall() if cursor else []
-
-            self.admin_ui.admin_attedance_logs_tbl.setRowCount(0)
-            for log in logs:
-                self.add_attendance_log_to_table(log)
+            self.attendance_logs_model.reload()
+            self.admin_ui.admin_attedance_logs_tbl.resizeColumnsToContents()
         except sqlite3.Error as e:
             print(f"Database error while loading attendance logs: {e}")
 
-    def add_attendance_log_to_table(self, log):
-        row_position = self.admin_ui.admin_attedance_logs_tbl.rowCount()
-        self.admin_ui.admin_attedance_logs_tbl.insertRow(row_position)
-
-        account_id_item = QTableWidgetItem(log[0])
-        remarks_item = QTableWidgetItem(log[1])
-        date_item = QTableWidgetItem(log[2])
-        time_item = QTableWidgetItem(log[3])
-
-        account_id_item.setFlags(account_id_item.flags() & ~Qt.ItemIsEditable)
-        remarks_item.setFlags(remarks_item.flags() & ~Qt.ItemIsEditable)
-        date_item.setFlags(date_item.flags() & ~Qt.ItemIsEditable)
-        time_item.setFlags(time_item.flags() & ~Qt.ItemIsEditable)
-
-        self.admin_ui.admin_attedance_logs_tbl.setItem(row_position, 0, account_id_item)
-        self.admin_ui.admin_attedance_logs_tbl.setItem(row_position, 1, remarks_item)
-        self.admin_ui.admin_attedance_logs_tbl.setItem(row_position, 2, date_item)
-        self.admin_ui.admin_attedance_logs_tbl.setItem(row_position, 3, time_item)
-
-        self.admin_ui.admin_attedance_logs_tbl.resizeColumnsToContents()
-
-    def filter_attendance_logs_table(self):
-        search_text = self.admin_ui.admin_attedance_logs_search.text().lower()
-        for row in range(self.admin_ui.admin_attedance_logs_tbl.rowCount()):
-            self.admin_ui.admin_attedance_logs_tbl.setRowHidden(row, False)
-
-        if not search_text:
-            return
-
-        for row in range(self.admin_ui.admin_attedance_logs_tbl.rowCount()):
-            match_found = False
-            for col in range(self.admin_ui.admin_attedance_logs_tbl.columnCount()):
-                item = self.admin_ui.admin_attedance_logs_tbl.item(row, col)
-                if item and search_text in item.text().lower():
-                    match_found = True
-                    break
-            self.admin_ui.admin_attedance_logs_tbl.setRowHidden(row, not match_found)
-
     def sort_attendance_logs_table(self):
         sort_option = self.admin_ui.admin_attedance_logs_sort.currentText()
-
-        logs = []
-        for row in range(self.admin_ui.admin_attedance_logs_tbl.rowCount()):
-            log = [
-                self.admin_ui.admin_attedance_logs_tbl.item(row, col).text()
-                for col in range(self.admin_ui.admin_attedance_logs_tbl.columnCount())
-            ]
-            logs.append(log)
-
-        if sort_option == "By Date:":
-            logs.sort(key=lambda x: x[2])  
-        elif sort_option == "By Time:":
-            logs.sort(key=lambda x: x[3]) 
-        elif sort_option == "By Account ID:":
-            logs.sort(key=lambda x: x[0]) 
-        elif sort_option == "By Remarks:":
-            logs.sort(key=lambda x: x[1]) 
-
-        self.admin_ui.admin_attedance_logs_tbl.setRowCount(0)
-        for log in logs:
-            self.add_attendance_log_to_table(log)
+        self.attendance_logs_model.sort(AttendanceLogModel.SORT_OPTIONS.get(sort_option))
 
     def load_employee_attendance_logs(self, employee_id):
         try:
@@ -6150,7 +7327,7 @@ class Admin:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             backup_file = os.path.join(backup_dir, f"backup_{timestamp}.db")
 
-            shutil.copy(self.db.db_name, backup_file)
+            self.db.backup_to(backup_file)
             self.system_logs.log_system_action(f"Database backup created by {current_admin}: {backup_file}", "SystemSettings")
 
             self.show_success("Backup", f"Backup created successfully: {backup_file}")
@@ -6208,7 +7385,7 @@ class Admin:
         backup_path = os.path.join("resources/backups", backup_file)
 
         try:
-            shutil.copy(backup_path, self.db.db_name)
+            self.db.restore_from(backup_path)
             QMessageBox.information(None, "Restore", "Database restored successfully. The application will now restart.")
 
             QProcess.startDetached(sys.executable, sys.argv)
@@ -6234,7 +7411,7 @@ class Admin:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             backup_file = os.path.join(backup_dir, f"backup_{timestamp}.db")
 
-            shutil.copy(self.db.db_name, backup_file)
+            self.db.backup_to(backup_file)
             QMessageBox.information(None, "Backup", f"Backup created successfully: {backup_file}")
 
             if retention_enabled:
@@ -6420,10 +7597,10 @@ class Admin:
         try:
             cursor = self.db.execute_query(
                 """
-                SELECT date(created_at) as log_date, present_count, absent_count
-                FROM system_logs
-                WHERE date(created_at) >= date('now', '-6 days')
-                ORDER BY date(created_at)
+                SELECT date, present_count, absent_count
+                FROM daily_attendance_summary
+                WHERE date >= date('now', '-6 days')
+                ORDER BY date
                 """
             )
             data = cursor.fetchall() if cursor else []
@@ -6529,10 +7706,10 @@ class Admin:
         try:
             cursor = self.db.execute_query(
                 """
-                SELECT date(created_at) as log_date, average_work_hours
-                FROM system_logs
-                WHERE date(created_at) >= date('now', '-6 days')
-                ORDER BY date(created_at)
+                SELECT date, CASE WHEN worked_count > 0 THEN ROUND(total_work_hours / worked_count, 2) ELSE 0 END
+                FROM daily_attendance_summary
+                WHERE date >= date('now', '-6 days')
+                ORDER BY date
                 """
             )
             data = cursor.fetchall() if cursor else []
@@ -6592,18 +7769,9 @@ class Admin:
     def update_attendance_pie_chart(self):
         self.pie_series.clear()
         try:
-            today_date = datetime.now().strftime("%Y-%m-%d")
-            cursor = self.db.execute_query(
-                "SELECT COUNT(DISTINCT employee_id) FROM attendance_logs WHERE date = ? AND employee_id IN (SELECT employee_id FROM Employee WHERE is_hr = 0)",
-                (today_date,)
-            )
-            present = cursor.fetchone()[0] if cursor else 0
-
-            cursor = self.db.execute_query(
-                "SELECT COUNT(*) FROM Employee WHERE is_hr = 0 AND status = 'Active' AND employee_id NOT IN (SELECT DISTINCT employee_id FROM attendance_logs WHERE date = ?)",
-                (today_date,)
-            )
-            absent = cursor.fetchone()[0] if cursor else 0
+            metrics = DashboardMetrics.shared(self.db).get()
+            present = metrics["logged_employees"]
+            absent = metrics["absent_employees"]
 
             total = present + absent
             if total == 0:
@@ -6648,6 +7816,8 @@ class Admin:
         # Enable/disable related UI elements if they exist
         if hasattr(self.admin_ui, 'faceid_device_combo'):
             self.admin_ui.faceid_device_combo.setEnabled(enabled)
+        self.admin_ui.faceid_det_size_box.setEnabled(enabled)
+        self.admin_ui.faceid_roi_btn.setEnabled(enabled)
 
     def toggle_fingerid_settings(self):
         """Toggle fingerprint ID settings UI elements"""
@@ -6661,13 +7831,15 @@ class Admin:
         try:
             faceid_enabled = self.admin_ui.faceid_btn.isChecked()
             fingerid_enabled = self.admin_ui.fingerid_btn.isChecked()
+            det_size = self.admin_ui.faceid_det_size_box.currentData() or 640
+            roi_enabled = self.admin_ui.faceid_roi_btn.isChecked()
             
             current_admin = self.get_current_admin()
             current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             
             # Get current settings to detect changes
             cursor = self.db.execute_query(
-                "SELECT is_faceid_on, is_fingerprintid_on FROM system_settings LIMIT 1"
+                "SELECT is_faceid_on, is_fingerprintid_on, faceid_det_size, faceid_roi_enabled FROM system_settings LIMIT 1"
             )
             current_settings = cursor.fetchone()
             
@@ -6675,7 +7847,7 @@ class Admin:
             change_details = []
             
             if current_settings:
-                current_faceid, current_fingerid = current_settings
+                current_faceid, current_fingerid, current_det_size, current_roi = current_settings
                 
                 # Detect changes
                 if bool(current_faceid) != faceid_enabled:
@@ -6685,6 +7857,14 @@ class Admin:
                 if bool(current_fingerid) != fingerid_enabled:
                     changes_made = True
                     change_details.append(f"Fingerprint: {'Enabled' if fingerid_enabled else 'Disabled'}")
+
+                if (current_det_size or 640) != det_size:
+                    changes_made = True
+                    change_details.append(f"Face detection size: {det_size} x {det_size}")
+
+                if bool(current_roi) != roi_enabled:
+                    changes_made = True
+                    change_details.append(f"Face detection zone: {'Center only' if roi_enabled else 'Full frame'}")
             else:
                 # No existing settings, consider this as initial setup
                 changes_made = True
@@ -6701,19 +7881,20 @@ class Admin:
                     self.db.execute_query('''
                         UPDATE system_settings 
                         SET is_faceid_on = ?, is_fingerprintid_on = ?,
+                            faceid_det_size = ?, faceid_roi_enabled = ?,
                             last_modified_by = ?, last_modified_at = ?
                         WHERE id = 1
-                    ''', (faceid_enabled, fingerid_enabled, current_admin, current_time))
+                    ''', (faceid_enabled, fingerid_enabled, det_size, roi_enabled, current_admin, current_time))
                     
                     action_type = "updated"
                 else:
                     # Insert new configuration
                     self.db.execute_query('''
                         INSERT INTO system_settings (
-                            is_faceid_on, is_fingerprintid_on,
+                            is_faceid_on, is_fingerprintid_on, faceid_det_size, faceid_roi_enabled,
                             created_by, created_at, last_modified_by, last_modified_at
-                        ) VALUES (?, ?, ?, ?, ?, ?)
-                    ''', (faceid_enabled, fingerid_enabled, current_admin, current_time, current_admin, current_time))
+                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    ''', (faceid_enabled, fingerid_enabled, det_size, roi_enabled, current_admin, current_time, current_admin, current_time))
                     
                     action_type = "created"
                 
@@ -6774,14 +7955,17 @@ class Admin:
         """Load biometric configuration from database"""
         try:
             cursor = self.db.execute_query(
-                "SELECT is_faceid_on, is_fingerprintid_on FROM system_settings LIMIT 1"
+                "SELECT is_faceid_on, is_fingerprintid_on, faceid_det_size, faceid_roi_enabled FROM system_settings LIMIT 1"
             )
             result = cursor.fetchone()
             
             if result:
-                is_faceid_on, is_fingerprintid_on = result
+                is_faceid_on, is_fingerprintid_on, det_size, roi_enabled = result
                 self.admin_ui.faceid_btn.setChecked(bool(is_faceid_on))
                 self.admin_ui.fingerid_btn.setChecked(bool(is_fingerprintid_on))
+                index = self.admin_ui.faceid_det_size_box.findData(det_size or 640)
+                self.admin_ui.faceid_det_size_box.setCurrentIndex(max(0, index))
+                self.admin_ui.faceid_roi_btn.setChecked(bool(roi_enabled))
             else:
                 # Default settings if no configuration exists
                 self.admin_ui.faceid_btn.setChecked(True)
@@ -6800,7 +7984,7 @@ class Admin:
             fingerprint_available = False
             try:
                 temp_fp = FingerprintLogic(self.db)
-                fingerprint_available = temp_fp.initialize_device()
+                fingerprint_available = temp_fp.initialize_device(load_gallery=False)
                 if fingerprint_available:
                     temp_fp.terminate_device()
             except Exception as e:
@@ -6868,7 +8052,7 @@ class Admin:
             "fingerprint_completed": False,
             "face_completed": False,
             "temp_fingerprint_path": None,
-            "temp_face_paths": [],
+            "temp_face_templates": [],
             "original_fingerprint_path": None,
             "original_face_paths": []
         }
@@ -6911,7 +8095,7 @@ class Admin:
                         self.temp_enrollment_data["original_fingerprint_id"] = fingerprint_id
                         print(f"Using expected fingerprint path: {expected_path}")
             
-            # Store original face paths
+            # Template files of installations from before face_embeddings, removed once the re-enrollment is applied
             cursor = self.db.execute_query(
                 "SELECT template_path FROM face_models WHERE employee_id = ?", 
                 (employee_id,)
@@ -7099,31 +8283,14 @@ class Admin:
             print(f"Error in update_temp_webcam_enroll_frame: {e}")
 
     def save_temp_face_models(self):
-        """Save face models to temporary location with thread safety"""
+        """Keep the captured face poses with the re-enrollment until it is applied"""
         try:
-            employee_id = self.temp_enrollment_data["employee_id"]
-            face_dir = self.faceid_logic.face_templates_dir
-            temp_dir = "resources/temp"
-            temp_face_paths = []
-            
-            # Look for temp files and move them to temp directory
-            for filename in os.listdir(face_dir):
-                if filename.startswith(f"temp_{employee_id}_"):
-                    source_path = os.path.join(face_dir, filename)
-                    # Create new filename without "temp_" prefix for final use
-                    final_filename = filename.replace(f"temp_{employee_id}_", f"{employee_id}_")
-                    temp_path = os.path.join(temp_dir, final_filename)
-                    
-                    # Copy to temp directory
-                    shutil.copy2(source_path, temp_path)
-                    temp_face_paths.append(temp_path)
-                    
-                    # Remove the temporary file from face_templates
-                    os.remove(source_path)
+            staged_templates = list(self.faceid_logic.staged_templates)
+            self.faceid_logic.staged_templates = []
             
-            if temp_face_paths:
+            if staged_templates:
                 self.temp_enrollment_data["face_completed"] = True
-                self.temp_enrollment_data["temp_face_paths"] = temp_face_paths
+                self.temp_enrollment_data["temp_face_templates"] = staged_templates
                 
                 # Update UI on main thread
                 self.admin_ui.webcam_enroll_frame_lbl.setStyleSheet("background-color: rgb(8, 132, 60); color: white; font-weight: bold; border-radius: 5px;")
@@ -7170,89 +8337,77 @@ class Admin:
         # Return to edit page
         self.goto_employee_edit()
 
-    def apply_reenrollment_changes(self):
-        """Apply re-enrollment changes to actual files"""
+    def reenrolled_fingerprint_target(self):
+        """(temp path, final path, fingerprints row id to repoint or None) of a pending fingerprint re-enrollment"""
+        temp_fp_path = self.temp_enrollment_data.get("temp_fingerprint_path")
+        if not (self.temp_enrollment_data.get("fingerprint_completed") and temp_fp_path and os.path.exists(temp_fp_path)):
+            return None
+        original_fp_path = self.temp_enrollment_data.get("original_fingerprint_path")
+        original_fp_id = self.temp_enrollment_data.get("original_fingerprint_id")
+        if original_fp_path and os.path.exists(original_fp_path):
+            return temp_fp_path, original_fp_path, None
+        if original_fp_id:
+            # The original file is gone: write a new one named after the row and point the row at it
+            return temp_fp_path, os.path.join("resources/registered_fingerprint", f"template_{original_fp_id}.tpl"), original_fp_id
+        return temp_fp_path, None, None
+
+    def reenrolled_face_templates(self):
+        """(pose, embedding, face image) captures of a pending face re-enrollment"""
+        if not self.temp_enrollment_data.get("face_completed"):
+            return []
+        return self.temp_enrollment_data.get("temp_face_templates", [])
+
+    def write_reenrollment_rows(self, transaction):
+        """Write the re-enrolled fingerprint and face embedding rows; no file or gallery is touched"""
+        employee_id = self.temp_enrollment_data["employee_id"]
+
+        fingerprint = self.reenrolled_fingerprint_target()
+        if fingerprint and fingerprint[2]:
+            transaction.execute("UPDATE fingerprints SET template_path = ? WHERE id = ?", (fingerprint[1], fingerprint[2]))
+
+        face_templates = self.reenrolled_face_templates()
+        if face_templates:
+            self.faceid_logic.face_gallery.store.replace_employee(transaction, employee_id, face_templates)
+            # The legacy template files it lists are removed by install_reenrollment_files
+            transaction.execute("DELETE FROM face_models WHERE employee_id = ?", (employee_id,))
+
+    def install_reenrollment_files(self):
+        """Move the re-enrolled fingerprint file into place and refresh the galleries, once their rows have committed"""
+        employee_id = self.temp_enrollment_data["employee_id"]
         try:
-            employee_id = self.temp_enrollment_data["employee_id"]
-            
-            # Handle fingerprint re-enrollment
-            if self.temp_enrollment_data.get("fingerprint_completed") and self.temp_enrollment_data.get("temp_fingerprint_path"):
-                temp_fp_path = self.temp_enrollment_data["temp_fingerprint_path"]
-                original_fp_path = self.temp_enrollment_data.get("original_fingerprint_path")
-                original_fp_id = self.temp_enrollment_data.get("original_fingerprint_id")
-                print(f"DEBUG: temp_fp_path={temp_fp_path}, original_fp_path={original_fp_path}, original_fp_id={original_fp_id}")
-                
-                if original_fp_path and os.path.exists(original_fp_path) and os.path.exists(temp_fp_path):
-                    # Backup original file first
-                    backup_path = f"{original_fp_path}.backup"
-                    shutil.copy2(original_fp_path, backup_path)
-                    
-                    # Replace original file with new one
-                    shutil.copy2(temp_fp_path, original_fp_path)
-                    os.remove(temp_fp_path)  # Remove temp file
-                    os.remove(backup_path)   # Remove backup if successful
-                    
-                    print(f"Successfully replaced fingerprint file: {original_fp_path}")
-                    
-                elif original_fp_id and os.path.exists(temp_fp_path):
-                    # Update existing record with new file
-                    fingerprint_dir = "resources/registered_fingerprint"
-                    if not os.path.exists(fingerprint_dir):
-                        os.makedirs(fingerprint_dir)
-                    
-                    final_fp_path = os.path.join(fingerprint_dir, f"template_{original_fp_id}.tpl")
+            fingerprint = self.reenrolled_fingerprint_target()
+            if fingerprint:
+                temp_fp_path, final_fp_path, _ = fingerprint
+                if final_fp_path:
+                    os.makedirs(os.path.dirname(final_fp_path), exist_ok=True)
                     shutil.copy2(temp_fp_path, final_fp_path)
                     os.remove(temp_fp_path)
-                    
-                    # Update database with correct path
-                    self.db.execute_query("UPDATE fingerprints SET template_path = ? WHERE id = ?", (final_fp_path, original_fp_id))
-                    print(f"Updated fingerprint file: {final_fp_path}")
-                    
                 else:
-                    print(f"Could not find original fingerprint file or temp file doesn't exist")
-                    print(f"Original path exists: {os.path.exists(original_fp_path) if original_fp_path else 'No path'}")
-                    print(f"Temp path exists: {os.path.exists(temp_fp_path) if temp_fp_path else 'No path'}")
-            
-            # Handle face re-enrollment
-            if self.temp_enrollment_data.get("face_completed") and self.temp_enrollment_data.get("temp_face_paths"):
-                temp_face_paths = self.temp_enrollment_data["temp_face_paths"]
-                original_face_paths = self.temp_enrollment_data.get("original_face_paths", [])
-                
-                face_dir = self.faceid_logic.face_templates_dir
-                final_face_paths = []
-                
-                for i, temp_path in enumerate(temp_face_paths):
-                    filename = os.path.basename(temp_path)
-                    final_path = os.path.join(face_dir, filename)
-                    
-                    # Copy temp file to final location
-                    shutil.copy2(temp_path, final_path)
-                    final_face_paths.append(final_path)
-                    
-                    # Remove temp file
-                    os.remove(temp_path)
-                
-                # Remove old face files
-                for old_path in original_face_paths:
+                    self.system_logs.log_system_action(f"No fingerprint record to replace for employee {employee_id}", "Employee")
+                self.fingerprint_logic.gallery.refresh_employee(employee_id)
+
+            face_templates = self.reenrolled_face_templates()
+            if face_templates:
+                for old_path in self.temp_enrollment_data.get("original_face_paths", []):
                     if os.path.exists(old_path):
                         os.remove(old_path)
-                
-                # Update database
-                if final_face_paths:
-                    template_path_str = ",".join(final_face_paths)
-                    cursor = self.db.execute_query("SELECT id FROM face_models WHERE employee_id = ?", (employee_id,))
-                    existing_record = cursor.fetchone()
-                    
-                    if existing_record:
-                        self.db.execute_query("UPDATE face_models SET template_path = ? WHERE employee_id = ?", (template_path_str, employee_id))
-                    else:
-                        self.db.execute_query("INSERT INTO face_models (employee_id, template_path) VALUES (?, ?)", (employee_id, template_path_str))
-            
-            self.system_logs.log_system_action(f"Biometric re-enrollment applied for employee {employee_id}", "Employee")
-            
+                self.faceid_logic.face_gallery.refresh_employee(employee_id)
+
+            if fingerprint or face_templates:
+                self.system_logs.log_system_action(f"Biometric re-enrollment applied for employee {employee_id}", "Employee")
+        except Exception as e:
+            print(f"Error installing re-enrolled biometric files: {e}")
+
+    def apply_reenrollment_changes(self):
+        """Apply re-enrollment changes: the rows commit first, then the files and galleries follow"""
+        try:
+            with self.db.transaction() as transaction:
+                self.write_reenrollment_rows(transaction)
         except Exception as e:
             print(f"Error applying re-enrollment changes: {e}")
             self.restore_original_biometric_data()
+            return
+        self.install_reenrollment_files()
 
     def cancel_reenrollment(self):
         """Cancel re-enrollment and clean up temporary data"""
@@ -7289,18 +8444,8 @@ class Admin:
                 if os.path.exists(temp_fp_path):
                     os.remove(temp_fp_path)
             
-            # Clean up temp face files
-            if self.temp_enrollment_data.get("temp_face_paths"):
-                for temp_path in self.temp_enrollment_data["temp_face_paths"]:
-                    if os.path.exists(temp_path):
-                        os.remove(temp_path)
-            
-            # Clean up any remaining temp files in face templates directory
-            face_dir = self.faceid_logic.face_templates_dir
-            if os.path.exists(face_dir):
-                for filename in os.listdir(face_dir):
-                    if filename.startswith("temp_"):
-                        os.remove(os.path.join(face_dir, filename))
+            # Drop face poses captured but not yet handed to the re-enrollment
+            self.faceid_logic.staged_templates = []
             
             # Clean up temp directory if empty
             temp_dir = "resources/temp"
@@ -7327,6 +8472,13 @@ class Admin:
             print(f"Error restoring original biometric data: {e}")
 
 class Announcement:
+    # ORDER BY for each scheduled email sort option
+    SCHED_EMAIL_ORDER = {
+        "By Subject:": "subject COLLATE NOCASE",
+        "By Created Date:": "created_at DESC",
+        "By Frequency:": "schedule_frequency COLLATE NOCASE",
+    }
+
     def __init__(self, db, hr_data, hr_ui):
         self.db = db
         self.hr_data = hr_data
@@ -7338,7 +8490,8 @@ class Announcement:
 
         self.hr_ui.employee_send_all_btn.toggled.connect(self.toggle_send_all)
         self.hr_ui.employee_choose_btn.toggled.connect(self.toggle_choose_employee)
-        self.hr_ui.email_employee_search_box.textChanged.connect(self.filter_employee_table)
+        # Column 0 holds the selection radio buttons
+        self.employee_filter = TableFilter(self.hr_ui.selectable_employee_list_tbl, self.hr_ui.email_employee_search_box, skip_columns=(0,))
         self.hr_ui.email_employee_sort_box.currentIndexChanged.connect(self.sort_employee_table)
         self.hr_ui.save_as_template_btn.clicked.connect(self.save_as_template)
         self.hr_ui.import_btn.clicked.connect(self.import_template)
@@ -7362,7 +8515,7 @@ class Announcement:
         self.toggle_send_all()  # Set initial state
 
         # --- Scheduled emails UI connections ---
-        self.hr_ui.sched_email_search_box.textChanged.connect(self.filter_sched_email_table)
+        self.sched_email_filter = TableFilter(self.hr_ui.sched_email_list_tbl, self.hr_ui.sched_email_search_box)
         self.hr_ui.sched_email_sort_box.currentIndexChanged.connect(self.sort_sched_email_table)
         self.load_sched_email_table()
     
@@ -7487,11 +8640,11 @@ class Announcement:
             for radio in self.radio_buttons:
                 radio.setChecked(False)
 
-    def load_sched_email_table(self):
+    def load_sched_email_table(self, order_by="created_at DESC"):
         tbl = self.hr_ui.sched_email_list_tbl
         tbl.setRowCount(0)
         cursor = self.db.execute_query(
-            "SELECT subject, created_at, schedule_frequency FROM announcements WHERE schedule_enabled = 1 ORDER BY created_at DESC"
+            f"SELECT subject, created_at, schedule_frequency FROM announcements WHERE schedule_enabled = 1 ORDER BY {order_by}"
         )
         self.sched_email_entries = cursor.fetchall() if cursor else []
         for entry in self.sched_email_entries:
@@ -7501,41 +8654,10 @@ class Announcement:
             tbl.setItem(row, 1, QTableWidgetItem(str(entry[1])))  # Created at
             tbl.setItem(row, 2, QTableWidgetItem(str(entry[2])))  # Frequency
 
-    def filter_sched_email_table(self):
-        search_text = self.hr_ui.sched_email_search_box.text().lower()
-        tbl = self.hr_ui.sched_email_list_tbl
-        for row in range(tbl.rowCount()):
-            show = False
-            for col in range(tbl.columnCount()):
-                item = tbl.item(row, col)
-                if item and search_text in item.text().lower():
-                    show = True
-                    break
-            tbl.setRowHidden(row, not show)
-
     def sort_sched_email_table(self):
         sort_option = self.hr_ui.sched_email_sort_box.currentText()
-        tbl = self.hr_ui.sched_email_list_tbl
-        # Gather all rows
-        rows = []
-        for row in range(tbl.rowCount()):
-            row_data = [tbl.item(row, col).text() if tbl.item(row, col) else "" for col in range(tbl.columnCount())]
-            rows.append(row_data)
-        # Sort
-        if sort_option == "By Subject:":
-            rows.sort(key=lambda x: x[0].lower())
-        elif sort_option == "By Created Date:":
-            rows.sort(key=lambda x: x[1], reverse=True)
-        elif sort_option == "By Frequency:":
-            rows.sort(key=lambda x: x[2].lower())
-        # Repopulate
-        tbl.setRowCount(0)
-        for row_data in rows:
-            row = tbl.rowCount()
-            tbl.insertRow(row)
-            for col, val in enumerate(row_data):
-                tbl.setItem(row, col, QTableWidgetItem(val))
-        tbl.resizeColumnsToContents()
+        self.load_sched_email_table(self.SCHED_EMAIL_ORDER.get(sort_option, "created_at DESC"))
+        self.hr_ui.sched_email_list_tbl.resizeColumnsToContents()
     
     def load_employee_table(self):
         cursor = self.db.execute_query("SELECT employee_id, first_name, last_name, middle_initial, department, position FROM Employee WHERE is_hr = 0 AND status = 'Active'")
@@ -7577,18 +8699,6 @@ class Announcement:
                 if idx != row:
                     radio.setChecked(False)
 
-    def filter_employee_table(self):
-        search_text = self.hr_ui.email_employee_search_box.text().lower()
-        tbl = self.hr_ui.selectable_employee_list_tbl
-        for row in range(tbl.rowCount()):
-            show = False
-            for col in range(1, tbl.columnCount()):
-                item = tbl.item(row, col)
-                if item and search_text in item.text().lower():
-                    show = True
-                    break
-            tbl.setRowHidden(row, not show)
-
     def sort_employee_table(self):
         sort_option = self.hr_ui.email_employee_sort_box.currentText()
         if sort_option == "By Name:":
@@ -8419,9 +9529,9 @@ class ReportGeneration:
 
     def create_work_hours_chart(self):
         cursor = self.db.execute_query("""
-            SELECT DATE(created_at) as date, average_work_hours
-            FROM system_logs
-            WHERE strftime('%Y-%m', created_at) = strftime('%Y-%m', 'now')
+            SELECT date, CASE WHEN worked_count > 0 THEN ROUND(total_work_hours / worked_count, 2) ELSE 0 END
+            FROM daily_attendance_summary
+            WHERE strftime('%Y-%m', date) = strftime('%Y-%m', 'now')
             ORDER BY date
         """)
         
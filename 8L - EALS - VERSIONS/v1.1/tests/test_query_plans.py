@@ -0,0 +1,24 @@
+"""Query-plan regression test: every DatabaseConnection.HOT_QUERIES entry must be answered from an index"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import DatabaseConnection
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = DatabaseConnection(str(tmp_path / "eals_test.db"))
+    db.connect()
+    yield db
+    db.close()
+
+
+@pytest.mark.parametrize("query, params", DatabaseConnection.HOT_QUERIES)
+def test_hot_query_uses_an_index(db, query, params):
+    plan = [row[3] for row in db.connection.execute(f"EXPLAIN QUERY PLAN {query}", params)]
+    # A full scan of a table (or of a whole index) and a sort in a temp B-tree are both regressions
+    assert not [detail for detail in plan if detail.startswith("SCAN ") or "USE TEMP B-TREE" in detail], plan